@@ -0,0 +1,6 @@
+"""
+Código compartilhado pelos projetos do repositório (projadocato, projleilao e projsala).
+
+Instalado em cada ambiente como pacote (pip install -e comum, a partir da raiz do repositório; no
+deploy, pelo requirements_render.txt), o que permite importar daqui com `from comum.<módulo> import ...`.
+"""
@@ -0,0 +1,131 @@
+"""
+Orçamento de consultas por requisição e detector de N+1.
+
+Compartilhado pelos três projetos. Ativação (opt-in): ORCAMENTO_CONSULTAS=1 no ambiente, que faz
+as configurações de cada projeto incluírem 'comum.orcamento_consultas.OrcamentoConsultasMiddleware'
+em MIDDLEWARE, ou o middleware incluído com override_settings nos testes.
+
+Para cada requisição o middleware registra as consultas executadas em todas as conexões,
+agrupa as que têm o mesmo formato de SQL (os parâmetros ficam de fora) e informa:
+- nos cabeçalhos da resposta: X-Consultas (total), X-Consultas-Tempo (ms) e
+  X-Consultas-Repetidas (formatos executados ORCAMENTO_CONSULTAS_REPETICOES vezes ou mais: N+1);
+- no log 'consultas': uma linha por requisição, em WARNING quando há N+1 ou o orçamento é excedido.
+
+O orçamento de uma view é declarado no atributo `orcamento_consultas` da classe (CBV) ou com o
+decorador @orcamento_consultas(n) (FBV); sem ele vale ORCAMENTO_CONSULTAS_PADRAO (None = sem limite).
+Com ORCAMENTO_CONSULTAS_FALHAR = True (ou ORCAMENTO_CONSULTAS_FALHAR=1 no ambiente), exceder o
+orçamento ou repetir consultas lança OrcamentoConsultasExcedido, o que faz o teste que chamou a view falhar.
+
+Configurações (todas opcionais): ORCAMENTO_CONSULTAS_PADRAO, ORCAMENTO_CONSULTAS_REPETICOES
+(padrão: 3) e ORCAMENTO_CONSULTAS_FALHAR.
+"""
+import logging
+import os
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger('consultas')
+
+REPETICOES_PADRAO = 3
+
+
+class OrcamentoConsultasExcedido(AssertionError):
+    """Lançada quando ORCAMENTO_CONSULTAS_FALHAR está ativo e a view ultrapassa o orçamento."""
+
+
+def orcamento_consultas(limite):
+    """Decorador que declara o número máximo de consultas de uma function-based view."""
+    def decorador(view):
+        view.orcamento_consultas = limite
+        return view
+    return decorador
+
+
+class RegistroConsultas:
+    """Registra as consultas executadas; usado como execute_wrapper das conexões."""
+
+    # Listas de parâmetros (IN (%s, %s, ...)) e literais não mudam o formato da consulta
+    LISTA_PARAMETROS = re.compile(r'\((?:\s*%s\s*,)+\s*%s\s*\)')
+    LITERAIS = re.compile(r"'(?:[^']|'')*'|\b\d+\b")
+
+    def __init__(self):
+        self.formatos = Counter()
+        self.tempo = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.tempo += time.perf_counter() - inicio
+            self.formatos[self.formato(sql)] += 1
+
+    @classmethod
+    def formato(cls, sql):
+        sql = cls.LISTA_PARAMETROS.sub('(...)', sql)
+        return cls.LITERAIS.sub('?', sql)
+
+    @property
+    def total(self):
+        return sum(self.formatos.values())
+
+    def repetidas(self, minimo):
+        """Formatos executados `minimo` vezes ou mais, do mais para o menos frequente."""
+        return [(sql, vezes) for sql, vezes in self.formatos.most_common() if vezes >= minimo]
+
+
+class OrcamentoConsultasMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        # As configurações são lidas a cada requisição para respeitar override_settings nos testes
+        repeticoes = getattr(settings, 'ORCAMENTO_CONSULTAS_REPETICOES', REPETICOES_PADRAO)
+        falhar = getattr(settings, 'ORCAMENTO_CONSULTAS_FALHAR', os.environ.get('ORCAMENTO_CONSULTAS_FALHAR') == '1')
+        registro = RegistroConsultas()
+        request.orcamento_consultas = getattr(settings, 'ORCAMENTO_CONSULTAS_PADRAO', None)
+        with ExitStack() as pilha:
+            for conexao in connections.all():
+                pilha.enter_context(conexao.execute_wrapper(registro))
+            # Inclui as consultas feitas ao renderizar o template (TemplateResponse é renderizada antes de voltar)
+            response = self.get_response(request)
+
+        repetidas = registro.repetidas(repeticoes)
+        orcamento = request.orcamento_consultas
+        excedeu = orcamento is not None and registro.total > orcamento
+
+        response['X-Consultas'] = str(registro.total)
+        response['X-Consultas-Tempo'] = f'{registro.tempo * 1000:.1f}'
+        response['X-Consultas-Repetidas'] = str(len(repetidas))
+        if orcamento is not None:
+            response['X-Consultas-Orcamento'] = str(orcamento)
+
+        nivel = logging.WARNING if repetidas or excedeu else logging.INFO
+        logger.log(
+            nivel, '%s %s: %d consultas em %.1f ms (orçamento: %s, repetidas: %d)',
+            request.method, request.path, registro.total, registro.tempo * 1000,
+            orcamento if orcamento is not None else '-', len(repetidas),
+        )
+        for sql, vezes in repetidas:
+            logger.warning('Possível N+1 em %s: %dx %s', request.path, vezes, sql)
+
+        if falhar and (excedeu or repetidas):
+            detalhes = '\n'.join(f'{vezes}x {sql}' for sql, vezes in repetidas)
+            raise OrcamentoConsultasExcedido(
+                f'{request.path}: {registro.total} consultas (orçamento: {orcamento}), '
+                f'{len(repetidas)} formato(s) repetido(s)\n{detalhes}'
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        # Orçamento declarado na CBV (atributo da classe) ou pelo decorador @orcamento_consultas
+        view_class = getattr(view_func, 'view_class', None)
+        orcamento = getattr(view_class, 'orcamento_consultas', getattr(view_func, 'orcamento_consultas', None))
+        if orcamento is not None:
+            request.orcamento_consultas = orcamento
+        return None
@@ -2,10 +2,25 @@ from django.contrib import admin
 from .models import Raca, Gato, Coordenador,Adotante,Solicitacao,Avaliacao,Documento
 # Register your models here.
 
+# Os __str__ abaixo usam relacionamentos; list_select_related os carrega no mesmo SELECT
+# da listagem, em vez de uma consulta por linha (N+1)
+
+class GatoAdmin(admin.ModelAdmin):
+    list_select_related = ['raca']
+
+class SolicitacaoAdmin(admin.ModelAdmin):
+    list_select_related = ['adotante', 'gato']
+
+class AvaliacaoAdmin(admin.ModelAdmin):
+    list_select_related = ['coordenador', 'solicitacao__gato']
+
+class DocumentoAdmin(admin.ModelAdmin):
+    list_select_related = ['solicitacao__adotante']
+
 admin.site.register(Raca)
-admin.site.register(Gato)
+admin.site.register(Gato, GatoAdmin)
 admin.site.register(Coordenador)
 admin.site.register(Adotante)
-admin.site.register(Solicitacao)
-admin.site.register(Avaliacao)
-admin.site.register(Documento)
+admin.site.register(Solicitacao, SolicitacaoAdmin)
+admin.site.register(Avaliacao, AvaliacaoAdmin)
+admin.site.register(Documento, DocumentoAdmin)
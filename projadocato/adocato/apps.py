@@ -1,6 +1,22 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_migrate, post_save
 
 
 class AdocatoConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "adocato"
+
+    def ready(self):
+        from django.contrib.auth.models import User
+
+        from .busca import preparar_busca_sqlite
+        from .models import Adotante, Coordenador
+        from .utils import GerenciadorCacheUsuario
+
+        # Índices de busca textual do SQLite (FTS5); no PostgreSQL eles vêm da migração 0009
+        post_migrate.connect(preparar_busca_sqlite, sender=self)
+
+        # Perfil do usuário em cache: invalidado em toda gravação, inclusive pelo admin
+        for modelo in (User, Adotante, Coordenador):
+            post_save.connect(GerenciadorCacheUsuario.invalidar_ao_gravar, sender=modelo)
+            post_delete.connect(GerenciadorCacheUsuario.invalidar_ao_gravar, sender=modelo)
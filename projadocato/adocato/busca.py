@@ -0,0 +1,172 @@
+"""
+Busca textual usada pelos serviços (CasoUso*) no lugar de __icontains.
+
+O LIKE '%termo%' gerado pelo __icontains não usa índice e obriga o banco a ler a tabela inteira.
+Aqui a busca é delegada a um índice próprio de cada banco:
+
+- PostgreSQL (produção): índices GIN com pg_trgm sobre adocato_normalizar(coluna), que converte
+  para minúsculas e remove acentos (criados na migração 0009).
+- SQLite (desenvolvimento): tabelas FTS5 de conteúdo externo ("<tabela>_busca") com o tokenizador
+  trigram, mantidas por gatilhos e criadas após o migrate por preparar_busca_sqlite. Como o
+  icontains, encontram trechos no meio das palavras ("ode" encontra "Bigode").
+- Outros bancos, campos sem índice, SQLite sem o tokenizador trigram (< 3.34) ou termos com menos
+  de três caracteres: __icontains, como antes.
+
+No PostgreSQL e no SQLite >= 3.45 a busca ignora também os acentos ("jose" encontra "José").
+"""
+from django.db import OperationalError, connection, connections
+from django.db.models import F, Func, Q, Value
+from django.db.models.expressions import RawSQL
+from django.db.models.lookups import Contains
+
+# Tabela -> (coluna da chave primária, colunas indexadas para busca)
+TABELAS_INDEXADAS = {
+    'adocato_gato': ('id', ['nome']),
+    'adocato_raca': ('id', ['nome']),
+    'adocato_adotante': ('user_ptr_id', ['nome', 'cidade']),
+    'adocato_coordenador': ('user_ptr_id', ['nome']),
+}
+
+# Tokenizadores FTS5 em ordem de preferência: remove_diacritics só existe no SQLite >= 3.45.
+# Não há alternativa sem trigram: o unicode61 só busca por prefixo de palavra ("ode" não encontraria
+# "Bigode") e trocaria a semântica do icontains.
+TOKENIZADORES_SQLITE = ['trigram remove_diacritics 1', 'trigram']
+TAMANHO_MINIMO_TRIGRAMA = 3
+
+
+class Normalizar(Func):
+    """Aplica a função adocato_normalizar (minúsculas e sem acentos) do PostgreSQL."""
+    function = 'adocato_normalizar'
+
+
+class BuscaTextual:
+    _tokenizadores = None  # Cache por processo: tabela FTS -> tokenizador usado na criação
+
+    @staticmethod
+    def condicao(modelo, campo, termo):
+        """
+        Retorna um Q que filtra `modelo` pelos registros cujo `campo` contém `termo`.
+        `campo` aceita caminhos por relacionamento, como 'raca__nome' ou 'gato__nome'.
+        Por ser um Q, pode ser combinado com | e & em uma única consulta.
+        """
+        termo = (termo or '').strip()
+        if not termo:
+            return Q()
+
+        caminho, tabela, coluna = BuscaTextual._resolver_campo(modelo, campo)
+        if coluna in TABELAS_INDEXADAS.get(tabela, (None, []))[1]:
+            if connection.vendor == 'postgresql':
+                return Q(Contains(Normalizar(F(campo)), Normalizar(Value(termo))))
+            if connection.vendor == 'sqlite':
+                consulta = BuscaTextual._consulta_fts(tabela, coluna, termo)
+                if consulta:
+                    ids = RawSQL(f'SELECT rowid FROM "{tabela}_busca" WHERE "{tabela}_busca" MATCH %s', [consulta])
+                    return Q(**{f"{'__'.join(caminho) or 'pk'}__in": ids})
+        return Q(**{f'{campo}__icontains': termo})
+
+    @staticmethod
+    def filtrar(queryset, campo, termo):
+        """Filtra o queryset pelo termo, mantendo a ordenação (da qual depende a paginação por cursor)."""
+        termo = (termo or '').strip()
+        if not termo:
+            return queryset
+        return queryset.filter(BuscaTextual.condicao(queryset.model, campo, termo))
+
+    @staticmethod
+    def _resolver_campo(modelo, campo):
+        """Retorna (caminho do relacionamento, tabela e coluna) de um campo como 'gato__raca__nome'."""
+        *caminho, nome_campo = campo.split('__')
+        for parte in caminho:
+            modelo = modelo._meta.get_field(parte).related_model
+        campo_modelo = modelo._meta.get_field(nome_campo)
+        # Em herança multi-tabela o campo pode pertencer à tabela do modelo pai
+        return caminho, campo_modelo.model._meta.db_table, campo_modelo.column
+
+    @staticmethod
+    def _consulta_fts(tabela, coluna, termo):
+        """Monta a expressão MATCH do FTS5, ou None se a tabela não existir ou o termo não puder usá-la."""
+        tokenizador = BuscaTextual._tokenizador_sqlite(tabela)
+        if tokenizador is None or len(termo) < TAMANHO_MINIMO_TRIGRAMA:
+            return None
+        # Frase entre aspas: o termo inteiro, com espaços, como um trecho contínuo (igual ao icontains)
+        return f'{coluna} : "{termo.replace(chr(34), chr(34) * 2)}"'
+
+    @staticmethod
+    def _tokenizador_sqlite(tabela):
+        if BuscaTextual._tokenizadores is None:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT name, sql FROM sqlite_master WHERE type = 'table' AND name IN (%s)"
+                    % ', '.join(['%s'] * len(TABELAS_INDEXADAS)),
+                    [f'{nome}_busca' for nome in TABELAS_INDEXADAS]
+                )
+                # Tabelas criadas com outro tokenizador (versões anteriores usavam o unicode61) não são usadas
+                BuscaTextual._tokenizadores = {
+                    nome: next((t for t in TOKENIZADORES_SQLITE if f"tokenize='{t}'" in sql), None)
+                    for nome, sql in cursor.fetchall()
+                }
+        return BuscaTextual._tokenizadores.get(f'{tabela}_busca')
+
+
+def preparar_busca_sqlite(using='default', **kwargs):
+    """
+    Cria (se necessário) as tabelas FTS5 e os gatilhos que as mantêm sincronizadas.
+    Executada após cada migrate: o SQLite recria a tabela quando uma migração altera colunas,
+    o que apaga os gatilhos; nesse caso eles são recriados e o índice é reconstruído. Tabelas
+    criadas com um tokenizador que não é o trigram (o unicode61 de versões anteriores) são recriadas.
+    """
+    conexao = connections[using]
+    if conexao.vendor != 'sqlite':
+        return
+    with conexao.cursor() as cursor:
+        tabelas_existentes = set(conexao.introspection.table_names(cursor))
+        for tabela, (pk, colunas) in TABELAS_INDEXADAS.items():
+            if tabela not in tabelas_existentes:
+                continue
+            fts = f'{tabela}_busca'
+            gatilhos = [f'{fts}_ai', f'{fts}_ad', f'{fts}_au']
+            if fts in tabelas_existentes:
+                cursor.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = %s", [fts])
+                sql = cursor.fetchone()[0]
+                if not any(f"tokenize='{t}'" in sql for t in TOKENIZADORES_SQLITE):
+                    for gatilho in gatilhos:
+                        cursor.execute(f'DROP TRIGGER IF EXISTS "{gatilho}"')
+                    cursor.execute(f'DROP TABLE "{fts}"')
+                    tabelas_existentes.discard(fts)
+            if fts not in tabelas_existentes:
+                for tokenizador in TOKENIZADORES_SQLITE:
+                    try:
+                        cursor.execute(
+                            f"CREATE VIRTUAL TABLE \"{fts}\" USING fts5({', '.join(colunas)}, "
+                            f"content='{tabela}', content_rowid='{pk}', tokenize='{tokenizador}')"
+                        )
+                        break
+                    except OperationalError:
+                        continue
+                else:
+                    continue  # FTS5 ou trigram indisponível: a busca usa __icontains
+
+            cursor.execute(
+                "SELECT COUNT(*) FROM sqlite_master WHERE type = 'trigger' AND name IN (%s, %s, %s)", gatilhos
+            )
+            if cursor.fetchone()[0] == len(gatilhos):
+                continue
+
+            lista = ', '.join(colunas)
+            novos = ', '.join(f'new.{c}' for c in colunas)
+            antigos = ', '.join(f'old.{c}' for c in colunas)
+            cursor.execute(
+                f'CREATE TRIGGER IF NOT EXISTS "{fts}_ai" AFTER INSERT ON "{tabela}" BEGIN '
+                f'INSERT INTO "{fts}"(rowid, {lista}) VALUES (new.{pk}, {novos}); END'
+            )
+            cursor.execute(
+                f'CREATE TRIGGER IF NOT EXISTS "{fts}_ad" AFTER DELETE ON "{tabela}" BEGIN '
+                f'INSERT INTO "{fts}"("{fts}", rowid, {lista}) VALUES (\'delete\', old.{pk}, {antigos}); END'
+            )
+            cursor.execute(
+                f'CREATE TRIGGER IF NOT EXISTS "{fts}_au" AFTER UPDATE ON "{tabela}" BEGIN '
+                f'INSERT INTO "{fts}"("{fts}", rowid, {lista}) VALUES (\'delete\', old.{pk}, {antigos}); '
+                f'INSERT INTO "{fts}"(rowid, {lista}) VALUES (new.{pk}, {novos}); END'
+            )
+            cursor.execute(f'INSERT INTO "{fts}"("{fts}") VALUES (\'rebuild\')')
+    BuscaTextual._tokenizadores = None
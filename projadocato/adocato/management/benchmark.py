@@ -0,0 +1,19 @@
+"""Utilitários de medição usados pelos comandos benchmark_*."""
+import math
+import statistics
+import time
+
+
+def medir(funcao, repeticoes=20):
+    """Executa `funcao` várias vezes e retorna a latência média e o p95, em milissegundos."""
+    funcao()  # Aquecimento (cache de consultas, conexões, etc.)
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    tempos.sort()
+    return {
+        'media': statistics.mean(tempos),
+        'p95': tempos[math.ceil(len(tempos) * 0.95) - 1],
+    }
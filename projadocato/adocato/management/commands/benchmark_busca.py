@@ -0,0 +1,59 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from adocato.busca import BuscaTextual
+from adocato.management.benchmark import medir
+from adocato.management.massadados import GeradorMassaDados, analisar_tabelas
+from adocato.models import Gato, Adotante
+
+
+class _Rollback(Exception):
+    """Usada para desfazer os dados de teste ao final do benchmark."""
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara a latência da busca com __icontains e com a BuscaTextual (trigram/FTS5) "
+        "sobre uma massa de gatos e adotantes gerada dentro de uma transação (desfeita ao final)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--gatos', type=int, default=100000, help="Quantidade de gatos (padrão: 100000).")
+        parser.add_argument('--adotantes', type=int, default=100000, help="Quantidade de adotantes (padrão: 100000).")
+        parser.add_argument('--repeticoes', type=int, default=20, help="Execuções por consulta (padrão: 20).")
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.stdout.write(f"Gerando {options['gatos']} gatos e {options['adotantes']} adotantes...")
+                gerador = GeradorMassaDados()
+                gerador.gerar_gatos(options['gatos'], gerador.gerar_racas())
+                gerador.gerar_adotantes(options['adotantes'])
+                analisar_tabelas()
+                self._comparar(options['repeticoes'])
+                raise _Rollback()
+        except _Rollback:
+            pass
+
+    def _comparar(self, repeticoes):
+        # Cada caso: (descrição, queryset base, campo, termo digitado pelo usuário)
+        casos = [
+            ("Gato.nome 'paçoca'", Gato.objects.order_by('nome'), 'nome', 'paçoca'),
+            ("Gato.nome 'pacoca' (sem acento)", Gato.objects.order_by('nome'), 'nome', 'pacoca'),
+            ("Adotante.nome 'conceição'", Adotante.objects.order_by('nome'), 'nome', 'conceição'),
+            ("Adotante.nome 'jose araujo'", Adotante.objects.order_by('nome'), 'nome', 'jose araujo'),
+            ("Adotante.cidade 'mossoro'", Adotante.objects.order_by('nome'), 'cidade', 'mossoro'),
+        ]
+        self.stdout.write(f"{'Consulta':<36} {'Método':<12} {'Resultados':>10} {'Média (ms)':>11} {'p95 (ms)':>9}")
+        for descricao, queryset, campo, termo in casos:
+            metodos = {
+                'icontains': lambda: queryset.filter(**{f'{campo}__icontains': termo}),
+                'busca': lambda: BuscaTextual.filtrar(queryset, campo, termo),
+            }
+            for metodo, consulta in metodos.items():
+                # Mede a contagem e a primeira página, como faz a ListView paginada
+                total = consulta().count()
+                tempos = medir(lambda: (consulta().count(), list(consulta()[:10])), repeticoes)
+                self.stdout.write(
+                    f"{descricao:<36} {metodo:<12} {total:>10} {tempos['media']:>11.2f} {tempos['p95']:>9.2f}"
+                )
@@ -0,0 +1,85 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.core.paginator import Paginator
+from django.db import transaction
+
+from adocato.management.benchmark import medir
+from adocato.management.massadados import GeradorMassaDados, analisar_tabelas
+from adocato.models import Solicitacao
+from adocato.paginacao import PaginadorCursor
+from adocato.services.casousosolicitacao import CasoUsoSolicitacao
+
+
+class _Rollback(Exception):
+    """Usada para desfazer os dados de teste ao final do benchmark."""
+
+
+class Command(BaseCommand):
+    help = (
+        "Mede a latência (média e p95) da listagem de solicitações pendentes, comparando a busca antiga "
+        "(união de querysets + paginação por OFFSET) com a atual (um único Q + paginação por cursor). "
+        "Com --limite-p95, falha se alguma consulta atual ultrapassar o limite (teste de regressão)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--solicitacoes', type=int, default=50000, help="Quantidade de solicitações (padrão: 50000).")
+        parser.add_argument('--repeticoes', type=int, default=20, help="Execuções por consulta (padrão: 20).")
+        parser.add_argument('--por-pagina', type=int, default=10, help="Itens por página (padrão: 10, como na view).")
+        parser.add_argument('--limite-p95', type=float, help="p95 máximo, em ms, aceito para as consultas atuais.")
+
+    def handle(self, *args, **options):
+        excedidos = []
+        try:
+            with transaction.atomic():
+                self.stdout.write(f"Gerando {options['solicitacoes']} solicitações...")
+                gerador = GeradorMassaDados()
+                gatos = gerador.gerar_gatos(options['solicitacoes'], gerador.gerar_racas(), proporcao_disponiveis=0)
+                gerador.gerar_solicitacoes(gatos, gerador.gerar_adotantes(500))
+                analisar_tabelas()
+                excedidos = self._comparar(options['repeticoes'], options['por_pagina'], options['limite_p95'])
+                raise _Rollback()
+        except _Rollback:
+            pass
+
+        if excedidos:
+            raise CommandError(f"p95 acima de {options['limite_p95']} ms: {', '.join(excedidos)}")
+
+    @staticmethod
+    def _busca_antiga(filtros):
+        """Reprodução da implementação anterior de buscar_solicitacoes_com_relacionamentos."""
+        query = Solicitacao.objects.select_related('gato', 'gato__raca', 'adotante')
+        if filtros.get('status'):
+            query = query.filter(status=filtros['status'])
+        if filtros.get('busca'):
+            query = query.filter(gato__nome__icontains=filtros['busca']) | query.filter(adotante__nome__icontains=filtros['busca'])
+        return query.order_by('dataSolicitacao')
+
+    def _comparar(self, repeticoes, por_pagina, limite_p95):
+        casos = [
+            ("Em análise", {'status': 'Em_Analise'}),
+            ("Todas, busca 'mimi'", {'busca': 'mimi'}),
+            ("Em análise, busca 'conceição'", {'status': 'Em_Analise', 'busca': 'conceição'}),
+        ]
+        excedidos = []
+        self.stdout.write(f"{'Consulta':<32} {'Página':>7} {'Método':<16} {'Média (ms)':>11} {'p95 (ms)':>9}")
+        for descricao, filtros in casos:
+            antiga = self._busca_antiga(filtros)
+            atual = CasoUsoSolicitacao.buscar_solicitacoes_com_relacionamentos(filtros)
+            total_paginas = Paginator(atual, por_pagina).num_pages
+            for numero in sorted({1, max(1, total_paginas // 2), total_paginas}):
+                # Cursor equivalente à página `numero`: começa após o último item da página anterior
+                paginador = PaginadorCursor(atual, por_pagina)
+                cursor = None
+                if numero > 1:
+                    cursor = paginador.cursor_apos(atual[(numero - 1) * por_pagina - 1])
+                metodos = {
+                    'OFFSET (antigo)': lambda: list(Paginator(antiga, por_pagina).page(numero)),
+                    'cursor (atual)': lambda: list(paginador.pagina(cursor)),
+                }
+                for metodo, consulta in metodos.items():
+                    tempos = medir(consulta, repeticoes)
+                    self.stdout.write(
+                        f"{descricao:<32} {numero:>7} {metodo:<16} {tempos['media']:>11.2f} {tempos['p95']:>9.2f}"
+                    )
+                    if metodo.startswith('cursor') and limite_p95 is not None and tempos['p95'] > limite_p95:
+                        excedidos.append(f"{descricao} (página {numero})")
+        return excedidos
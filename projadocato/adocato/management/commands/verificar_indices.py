@@ -0,0 +1,90 @@
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from adocato.management.massadados import GeradorMassaDados, analisar_tabelas
+from adocato.models import Gato, Adotante, Solicitacao
+from adocato.services.casousogato import CasoUsoGato
+from adocato.services.casousosolicitacao import CasoUsoSolicitacao
+from adocato.services.casousodocumento import CasoUsoDocumento
+
+
+class _Rollback(Exception):
+    """Usada para desfazer os dados de teste ao final da verificação."""
+
+
+class Command(BaseCommand):
+    help = (
+        "Executa EXPLAIN nas consultas mais frequentes dos serviços (CasoUso*) sobre uma massa de dados "
+        "gerada dentro de uma transação (desfeita ao final) e falha se alguma delas fizer varredura sequencial."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--gatos', type=int, default=20000, help="Quantidade de gatos a gerar (padrão: 20000).")
+        parser.add_argument('--adotantes', type=int, default=50, help="Quantidade de adotantes a gerar (padrão: 50).")
+        parser.add_argument('--sem-dados', action='store_true', help="Usa os dados já existentes no banco, sem gerar massa de teste.")
+
+    def handle(self, *args, **options):
+        falhas = []
+        try:
+            with transaction.atomic():
+                if not options['sem_dados']:
+                    self._popular(options['gatos'], options['adotantes'])
+                analisar_tabelas()
+                falhas = self._verificar_consultas()
+                raise _Rollback()
+        except _Rollback:
+            pass
+
+        if falhas:
+            raise CommandError(f"{len(falhas)} consulta(s) com varredura sequencial: {', '.join(falhas)}")
+        self.stdout.write(self.style.SUCCESS("Todas as consultas verificadas usam índices."))
+
+    def _consultas(self, gato_id, adotante_id, solicitacao_id):
+        """Consultas dos serviços que devem ser atendidas por índice (as listagens já vêm paginadas)."""
+        return {
+            'CasoUsoGato.buscar_gatos_disponiveis': CasoUsoGato.buscar_gatos_disponiveis()[:10],
+            'CasoUsoSolicitacao.buscar_solicitacoes(status)': CasoUsoSolicitacao.buscar_solicitacoes(status='Em_Analise')[:10],
+            'CasoUsoSolicitacao.buscar_solicitacoes_atrasadas': CasoUsoSolicitacao.buscar_solicitacoes_atrasadas()[:10],
+            'CasoUsoSolicitacao.criar_solicitacao (solicitação ativa)': Solicitacao.objects.ativas().filter(gato_id=gato_id),
+            'CasoUsoSolicitacao.buscar_solicitacoes_adotante_com_relacionamentos': (
+                CasoUsoSolicitacao.buscar_solicitacoes_adotante_com_relacionamentos(adotante_id)[:10]
+            ),
+            'CasoUsoDocumento.listar_documentos_solicitacao': CasoUsoDocumento.listar_documentos_solicitacao(solicitacao_id),
+        }
+
+    def _verificar_consultas(self):
+        gato = Gato.objects.order_by('id').only('id').first()
+        adotante = Adotante.objects.order_by('id').only('id').first()
+        solicitacao = Solicitacao.objects.order_by('id').only('id').first()
+        if not (gato and adotante and solicitacao):
+            raise CommandError("Não há dados suficientes para a verificação. Remova a opção --sem-dados.")
+
+        falhas = []
+        for nome, queryset in self._consultas(gato.id, adotante.id, solicitacao.id).items():
+            plano = queryset.explain()
+            tabelas = self._tabelas_varridas(plano)
+            if tabelas:
+                falhas.append(nome)
+                self.stdout.write(self.style.ERROR(f"[SEQ SCAN] {nome}: {', '.join(tabelas)}"))
+                self.stdout.write(plano)
+            else:
+                self.stdout.write(self.style.SUCCESS(f"[OK] {nome}"))
+        return falhas
+
+    @staticmethod
+    def _tabelas_varridas(plano):
+        """Retorna as tabelas percorridas sequencialmente segundo o plano (PostgreSQL ou SQLite)."""
+        if connection.vendor == 'postgresql':
+            return re.findall(r'Seq Scan on (\w+)', plano)
+        # No SQLite, "SCAN tabela" sem "USING ... INDEX" indica leitura completa da tabela
+        return re.findall(r'\bSCAN (\w+)(?!\w| USING)', plano)
+
+    def _popular(self, total_gatos, total_adotantes):
+        """Gera uma massa de dados proporcional à de produção: muitos gatos e solicitações, poucos adotantes."""
+        self.stdout.write(f"Gerando {total_gatos} gatos e {total_adotantes} adotantes...")
+        gerador = GeradorMassaDados()
+        gatos = gerador.gerar_gatos(total_gatos, gerador.gerar_racas())
+        solicitacoes = gerador.gerar_solicitacoes(gatos, gerador.gerar_adotantes(total_adotantes))
+        gerador.gerar_documentos(solicitacoes)
@@ -0,0 +1,116 @@
+"""
+Geração de massa de dados para os comandos de verificação e benchmark.
+Usa bulk_create em lotes para gerar dezenas de milhares de registros em poucos segundos.
+"""
+import random
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.utils import timezone
+
+from adocato.models import Raca, Gato, Adotante, Solicitacao, Documento
+
+TAMANHO_LOTE = 1000
+
+NOMES = [
+    'José', 'João', 'Antônio', 'Conceição', 'Márcia', 'Luís', 'Inês', 'Sebastião', 'Cecília', 'Vitória',
+    'André', 'Mônica', 'Júlia', 'Fábio', 'Patrícia', 'Flávio', 'Lúcia', 'Estêvão', 'Helena', 'Tomás',
+]
+SOBRENOMES = [
+    'Araújo', 'Conceição', 'Gonçalves', 'Simões', 'Magalhães', 'Brandão', 'Assunção', 'Falcão', 'Guimarães', 'Lemos',
+    'Peçanha', 'Galvão', 'Nogueira', 'Romão', 'Sampaio', 'Teixeira', 'Damião', 'Estevão', 'Leão', 'Melo',
+]
+NOMES_GATOS = [
+    'Mimi', 'Frajola', 'Tigrão', 'Pérola', 'Fumaça', 'Bolinha', 'Salém', 'Paçoca', 'Café', 'Chicória',
+    'Pipoca', 'Nino', 'Luna', 'Jabuticaba', 'Açúcar', 'Canela', 'Sushi', 'Melão', 'Bóris', 'Félix',
+]
+CIDADES = ['São Paulo', 'Natal', 'Mossoró', 'Caicó', 'João Pessoa', 'Maceió', 'Belém', 'Goiânia', 'Vitória', 'Macaé']
+
+
+class GeradorMassaDados:
+    def __init__(self, semente=42):
+        self.aleatorio = random.Random(semente)
+
+    def nome_pessoa(self):
+        return f"{self.aleatorio.choice(NOMES)} {self.aleatorio.choice(SOBRENOMES)} {self.aleatorio.choice(SOBRENOMES)}"
+
+    def gerar_racas(self, total=20):
+        return Raca.objects.bulk_create([Raca(nome=f"Raça de teste {i:03d}") for i in range(total)])
+
+    def gerar_gatos(self, total, racas, proporcao_disponiveis=0.1):
+        gatos = []
+        for inicio in range(0, total, TAMANHO_LOTE):
+            gatos += Gato.objects.bulk_create([
+                Gato(
+                    nome=f"{self.aleatorio.choice(NOMES_GATOS)} {i:06d}",
+                    sexo=self.aleatorio.choice('MF'),
+                    cor='Preto',
+                    dataNascimento=date(2020, 1, 1),
+                    disponivel=self.aleatorio.random() < proporcao_disponiveis,
+                    raca=racas[i % len(racas)],
+                )
+                for i in range(inicio, min(inicio + TAMANHO_LOTE, total))
+            ])
+        return gatos
+
+    def gerar_adotantes(self, total):
+        """
+        Adotante usa herança multi-tabela, o que impede o bulk_create. Os usuários são criados
+        em lote e as linhas da tabela filha são inseridas diretamente (executemany).
+        """
+        tabela = Adotante._meta.db_table
+        colunas = ['user_ptr_id', 'nome', 'telefone', 'dataNascimento', 'cpf', 'cidade', 'estado']
+        sql = (
+            f'INSERT INTO "{tabela}" ({", ".join(connection.ops.quote_name(c) for c in colunas)}) '
+            f'VALUES ({", ".join(["%s"] * len(colunas))})'
+        )
+        ids = []
+        for inicio in range(0, total, TAMANHO_LOTE):
+            usuarios = User.objects.bulk_create([
+                User(username=f"adotante_massa_{i}", password='!')
+                for i in range(inicio, min(inicio + TAMANHO_LOTE, total))
+            ])
+            with connection.cursor() as cursor:
+                cursor.executemany(sql, [
+                    (u.id, self.nome_pessoa(), '84999999999', date(1990, 1, 1), f"{80000000000 + inicio + n}",
+                     self.aleatorio.choice(CIDADES), 'RN')
+                    for n, u in enumerate(usuarios)
+                ])
+            ids += [u.id for u in usuarios]
+        return ids
+
+    def gerar_solicitacoes(self, gatos, adotantes_ids):
+        """Cria uma solicitação por gato indisponível, com datas espalhadas ao longo do tempo."""
+        status = ['Em_Edicao', 'Em_Analise', 'Aprovada', 'Reprovada', 'Em_Recurso']
+        indisponiveis = [g for g in gatos if not g.disponivel]
+        agora = timezone.now()
+        solicitacoes = []
+        for inicio in range(0, len(indisponiveis), TAMANHO_LOTE):
+            lote = Solicitacao.objects.bulk_create([
+                Solicitacao(
+                    adotante_id=self.aleatorio.choice(adotantes_ids),
+                    gato=gato,
+                    status=status[i % len(status)],
+                    recurso="Motivo do recurso de teste" if status[i % len(status)] == 'Em_Recurso' else None,
+                )
+                for i, gato in enumerate(indisponiveis[inicio:inicio + TAMANHO_LOTE], start=inicio)
+            ])
+            # dataSolicitacao usa auto_now; as datas são espalhadas depois para simular o histórico
+            for i, solicitacao in enumerate(lote, start=inicio):
+                solicitacao.dataSolicitacao = agora - timedelta(hours=i)
+            Solicitacao.objects.bulk_update(lote, ['dataSolicitacao'])
+            solicitacoes += lote
+        return solicitacoes
+
+    def gerar_documentos(self, solicitacoes):
+        return Documento.objects.bulk_create([
+            Documento(solicitacao=s, arquivo=f"documentos/teste_{s.id}.pdf", descricao="Documento de teste")
+            for s in solicitacoes
+        ], batch_size=TAMANHO_LOTE)
+
+
+def analisar_tabelas():
+    """Atualiza as estatísticas do banco para que o otimizador considere o volume gerado."""
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
@@ -0,0 +1,17 @@
+# Generated by Django 5.2 on 2026-10-18 14:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("adocato", "0006_alter_solicitacao_status"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="solicitacao",
+            index=models.Index(fields=["status", "dataSolicitacao"], name="solicitacao_status_data_idx"),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2 on 2026-10-18 14:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("adocato", "0007_solicitacao_status_data_idx"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="documento",
+            index=models.Index(
+                fields=["solicitacao", "-enviado_em"],
+                name="documento_solicitacao_data_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="gato",
+            index=models.Index(
+                condition=models.Q(("disponivel", True)),
+                fields=["nome"],
+                name="gato_disponivel_nome_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="solicitacao",
+            index=models.Index(
+                fields=["gato", "status"], name="solicitacao_gato_status_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="solicitacao",
+            index=models.Index(
+                fields=["adotante", "-dataSolicitacao"],
+                name="solicitacao_adotante_data_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,49 @@
+from django.db import migrations
+
+# Tabela -> colunas com índice trigram (ver adocato/busca.py)
+COLUNAS_BUSCA = {
+    "adocato_gato": ["nome"],
+    "adocato_raca": ["nome"],
+    "adocato_adotante": ["nome", "cidade"],
+    "adocato_coordenador": ["nome"],
+}
+
+
+def criar_indices_busca(apps, schema_editor):
+    """Cria as extensões, a função de normalização e os índices GIN trigram (apenas PostgreSQL)."""
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS unaccent")
+    # unaccent() não é IMMUTABLE e por isso não pode ser usada em índices; o wrapper fixa o dicionário
+    schema_editor.execute(
+        "CREATE OR REPLACE FUNCTION adocato_normalizar(text) RETURNS text AS "
+        "$$ SELECT lower(public.unaccent('public.unaccent'::regdictionary, $1)) $$ "
+        "LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT"
+    )
+    for tabela, colunas in COLUNAS_BUSCA.items():
+        for coluna in colunas:
+            schema_editor.execute(
+                f'CREATE INDEX IF NOT EXISTS "{tabela}_{coluna}_trgm_idx" '
+                f'ON "{tabela}" USING gin (adocato_normalizar("{coluna}") gin_trgm_ops)'
+            )
+
+
+def remover_indices_busca(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for tabela, colunas in COLUNAS_BUSCA.items():
+        for coluna in colunas:
+            schema_editor.execute(f'DROP INDEX IF EXISTS "{tabela}_{coluna}_trgm_idx"')
+    schema_editor.execute("DROP FUNCTION IF EXISTS adocato_normalizar(text)")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("adocato", "0008_indices_consultas_frequentes"),
+    ]
+
+    operations = [
+        migrations.RunPython(criar_indices_busca, remover_indices_busca),
+    ]
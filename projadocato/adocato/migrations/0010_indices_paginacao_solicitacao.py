@@ -0,0 +1,30 @@
+# Generated by Django 5.2 on 2026-10-18 14:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("adocato", "0009_indices_busca_textual"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="solicitacao",
+            name="solicitacao_status_data_idx",
+        ),
+        migrations.AddIndex(
+            model_name="solicitacao",
+            index=models.Index(
+                fields=["status", "dataSolicitacao", "id"],
+                name="solicitacao_status_data_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="solicitacao",
+            index=models.Index(
+                fields=["dataSolicitacao", "id"], name="solicitacao_data_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2 on 2026-10-18 14:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("adocato", "0010_indices_paginacao_solicitacao"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="gato",
+            name="gato_disponivel_nome_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="solicitacao",
+            name="solicitacao_adotante_data_idx",
+        ),
+        migrations.AddIndex(
+            model_name="gato",
+            index=models.Index(
+                condition=models.Q(("disponivel", True)),
+                fields=["nome", "id"],
+                name="gato_disponivel_nome_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="gato",
+            index=models.Index(fields=["nome", "id"], name="gato_nome_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="solicitacao",
+            index=models.Index(
+                fields=["adotante", "-dataSolicitacao", "-id"],
+                name="solicitacao_adotante_data_idx",
+            ),
+        ),
+    ]
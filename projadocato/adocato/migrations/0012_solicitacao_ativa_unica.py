@@ -0,0 +1,52 @@
+# Generated by Django 5.2 on 2026-10-18 14:49
+
+from django.db import migrations, models
+from django.db.models import Count
+
+STATUS_ATIVOS = ["Em_Edicao", "Em_Analise", "Em_Recurso"]
+# Entre as solicitações ativas de um gato, continua a mais adiantada no processo (e, empatando, a mais antiga)
+PRIORIDADE = {"Em_Recurso": 0, "Em_Analise": 1, "Em_Edicao": 2}
+
+
+def reprovar_solicitacoes_duplicadas(apps, schema_editor):
+    """Deixa uma única solicitação ativa por gato; as demais são reprovadas, para que a restrição possa ser criada."""
+    Solicitacao = apps.get_model("adocato", "Solicitacao")
+    ativas = Solicitacao.objects.filter(status__in=STATUS_ATIVOS)
+    gatos = (
+        ativas.values("gato")
+        .annotate(total=Count("id"))
+        .filter(total__gt=1)
+        .values_list("gato", flat=True)
+    )
+    duplicadas = []
+    for gato_id in gatos:
+        solicitacoes = sorted(
+            ativas.filter(gato_id=gato_id),
+            key=lambda s: (PRIORIDADE[s.status], s.dataSolicitacao, s.id),
+        )
+        duplicadas += [s.id for s in solicitacoes[1:]]
+    Solicitacao.objects.filter(id__in=duplicadas).update(status="Reprovada")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("adocato", "0011_indices_paginacao_cursor"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            reprovar_solicitacoes_duplicadas, migrations.RunPython.noop
+        ),
+        migrations.AddConstraint(
+            model_name="solicitacao",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(
+                    ("status__in", ["Em_Edicao", "Em_Analise", "Em_Recurso"])
+                ),
+                fields=("gato",),
+                name="solicitacao_ativa_por_gato_unica",
+                violation_error_message="Já existe uma solicitação ativa para este gato.",
+            ),
+        ),
+    ]
@@ -106,6 +106,12 @@ class Gato(models.Model):
         verbose_name_plural = "Gatos"
         verbose_name = "Gato"
         ordering = ['nome']
+        indexes = [
+            # Índice parcial: a listagem de gatos disponíveis filtra disponivel=True e ordena por nome
+            # (o id é o desempate da paginação por cursor)
+            models.Index(fields=['nome', 'id'], condition=models.Q(disponivel=True), name='gato_disponivel_nome_idx'),
+            models.Index(fields=['nome', 'id'], name='gato_nome_idx'),
+        ]
         permissions=[
             ("pode_deletar_gato", "Pode deletar gato"),
         ]
@@ -193,6 +199,40 @@ class Coordenador(User):
         verbose_name = "Coordenador"
         ordering = ['nome']
 
+class SolicitacaoQuerySet(models.QuerySet):
+    """
+    QuerySet com consultas de prazo feitas pelo banco.
+    O atraso é expresso como comparação de dataSolicitacao com um limite calculado uma única vez,
+    o que permite usar o índice (status, dataSolicitacao) em vez de avaliar cada linha em Python.
+    """
+    STATUS_EM_ABERTO = ['Em_Analise', 'Em_Recurso']
+    STATUS_ATIVOS = ['Em_Edicao', 'Em_Analise', 'Em_Recurso']  # No máximo uma solicitação ativa por gato
+
+    @staticmethod
+    def filtro_atrasadas():
+        """Retorna o filtro (Q) que identifica solicitações atrasadas."""
+        limite = timezone.now() - Solicitacao.PRAZO_ANALISE
+        return models.Q(status__in=SolicitacaoQuerySet.STATUS_EM_ABERTO, dataSolicitacao__lt=limite)
+
+    def ativas(self):
+        """Solicitações que ainda reservam o gato (em edição, em análise ou em recurso)."""
+        return self.filter(status__in=self.STATUS_ATIVOS)
+
+    def em_aberto(self):
+        """Solicitações em análise ou em recurso."""
+        return self.filter(status__in=self.STATUS_EM_ABERTO)
+
+    def atrasadas(self):
+        """Solicitações em aberto há mais tempo que o prazo de análise."""
+        return self.filter(self.filtro_atrasadas())
+
+    def com_atraso(self):
+        """Anota cada solicitação com o campo booleano 'atrasada', calculado no banco."""
+        return self.annotate(
+            atrasada=models.ExpressionWrapper(self.filtro_atrasadas(), output_field=models.BooleanField())
+        )
+
+
 class Solicitacao(models.Model):
     adotante = models.ForeignKey(Adotante, on_delete=models.CASCADE, related_name='solicitacoes_adotante')
     gato = models.ForeignKey(Gato, on_delete=models.CASCADE, related_name='solicitacoes_gato')
@@ -200,9 +240,14 @@ class Solicitacao(models.Model):
     status = models.CharField(max_length=20, choices=[('Em_Edicao','Em Edição'),('Em_Analise', 'Em Análise'), ('Aprovada', 'Aprovada'), ('Reprovada', 'Reprovada'),('Em_Recurso','Em Recurso')], default='Em_Edicao')
     recurso= models.TextField(blank=True, null=True, verbose_name="Motivo do Recurso")
     avaliadores = models.ManyToManyField(Coordenador, blank=True, related_name='avaliacoes_solicitadas',through='Avaliacao')
+    PRAZO_ANALISE = timedelta(days=7)  # Prazo para análise/recurso antes de a solicitação ser considerada atrasada
+    objects = SolicitacaoQuerySet.as_manager()
     def esta_atrasado(self):
         """Verifica se a solicitação está atrasada."""  
-        prazo = self.dataSolicitacao + timedelta(days=7) #Nesse caso, seria necessário atualizar a data da solicitação para o dia atual quando o status for 'Em Recurso'
+        if hasattr(self, 'atrasada'):
+            # Valor já calculado pelo banco via Solicitacao.objects.com_atraso()
+            return self.atrasada
+        prazo = self.dataSolicitacao + self.PRAZO_ANALISE #Nesse caso, seria necessário atualizar a data da solicitação para o dia atual quando o status for 'Em Recurso'
         return (self.status == 'Em_Analise' or self.status == 'Em_Recurso') and timezone.now() > prazo 
     
     def clean(self):
@@ -227,6 +272,21 @@ class Solicitacao(models.Model):
         verbose_name_plural = "Solicitações"
         verbose_name = "Solicitação"
         ordering = ['-dataSolicitacao']
+        indexes = [
+            models.Index(fields=['status', 'dataSolicitacao', 'id'], name='solicitacao_status_data_idx'),
+            models.Index(fields=['dataSolicitacao', 'id'], name='solicitacao_data_idx'),
+            models.Index(fields=['gato', 'status'], name='solicitacao_gato_status_idx'),
+            models.Index(fields=['adotante', '-dataSolicitacao', '-id'], name='solicitacao_adotante_data_idx'),
+        ]
+        constraints = [
+            # Garantia no banco de que duas adoções simultâneas não reservam o mesmo gato
+            models.UniqueConstraint(
+                fields=['gato'],
+                condition=models.Q(status__in=SolicitacaoQuerySet.STATUS_ATIVOS),
+                name='solicitacao_ativa_por_gato_unica',
+                violation_error_message="Já existe uma solicitação ativa para este gato.",
+            ),
+        ]
 
 class Avaliacao(models.Model):
     solicitacao = models.ForeignKey(Solicitacao, on_delete=models.CASCADE, related_name='avaliacoes')
@@ -279,4 +339,7 @@ class Documento(models.Model):
     class Meta:
         verbose_name_plural = "Documentos"
         verbose_name = "Documento"
-        ordering = ['solicitacao__adotante__nome']
\ No newline at end of file
+        ordering = ['solicitacao__adotante__nome']
+        indexes = [
+            models.Index(fields=['solicitacao', '-enviado_em'], name='documento_solicitacao_data_idx'),
+        ]
\ No newline at end of file
@@ -0,0 +1,176 @@
+"""
+Paginação por cursor (keyset pagination).
+
+O Paginator do Django usa COUNT(*) e OFFSET n: quanto mais funda a página, mais linhas o banco
+precisa ler e descartar. Aqui cada página é buscada a partir dos valores de ordenação do último
+(ou primeiro) item da página anterior, com uma condição do tipo
+    (data > d) OR (data = d AND id > i)
+que o banco resolve com um índice sobre as colunas de ordenação, em tempo constante por página.
+
+O cursor é opaco para o usuário: um JSON com a direção e os valores de ordenação, em base64.
+Os campos de ordenação devem ser não nulos; a chave primária é usada como desempate quando
+nenhum deles é único.
+
+Sem o COUNT(*) não há número de páginas; quando o total é útil, contagem_aproximada() o estima
+sem percorrer a listagem inteira.
+"""
+import base64
+import binascii
+import json
+from functools import reduce
+from operator import attrgetter
+
+from django.core.exceptions import ValidationError
+from django.db import connections
+from django.db.models import Q
+
+LIMITE_CONTAGEM = 1000
+
+
+class PaginaCursor:
+    """Página de resultados. Expõe a mesma interface usada pelos templates para o Page do Django."""
+
+    def __init__(self, object_list, cursor_anterior, cursor_proximo, paginador):
+        self.object_list = object_list
+        self.cursor_anterior = cursor_anterior
+        self.cursor_proximo = cursor_proximo
+        self.paginator = paginador
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.cursor_proximo is not None
+
+    def has_previous(self):
+        return self.cursor_anterior is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class PaginadorCursor:
+    PROXIMA = 'p'
+    ANTERIOR = 'a'
+
+    def __init__(self, queryset, por_pagina, ordenacao=None):
+        """
+        `ordenacao` segue a sintaxe do order_by ('nome', '-dataSolicitacao'). Se omitida, usa a
+        ordenação do queryset ou do modelo. A chave primária é acrescentada para desempate.
+        """
+        ordenacao = list(ordenacao or queryset.query.order_by or queryset.model._meta.ordering)
+        self.queryset = queryset
+        self.por_pagina = por_pagina
+        if not any(self._unico(campo) for campo in ordenacao):
+            ordenacao.append('-pk' if ordenacao and ordenacao[-1].startswith('-') else 'pk')
+        self.ordenacao = ordenacao
+
+    def pagina(self, cursor=None):
+        """Retorna a página indicada pelo cursor (a primeira, se o cursor for vazio ou inválido)."""
+        direcao, valores = self._decodificar(cursor)
+        queryset = self.queryset
+        ordenacao = self.ordenacao
+        if direcao == self.ANTERIOR:
+            # Para voltar, percorre-se a ordenação invertida e depois reordena a página
+            ordenacao = [campo[1:] if campo.startswith('-') else f'-{campo}' for campo in ordenacao]
+        if valores is not None:
+            queryset = queryset.filter(self._condicao_apos(ordenacao, valores))
+
+        itens = list(queryset.order_by(*ordenacao)[:self.por_pagina + 1])
+        ha_mais = len(itens) > self.por_pagina
+        itens = itens[:self.por_pagina]
+        if direcao == self.ANTERIOR:
+            itens.reverse()
+
+        tem_anterior = ha_mais if direcao == self.ANTERIOR else valores is not None
+        tem_proxima = ha_mais if direcao != self.ANTERIOR else True
+        return PaginaCursor(
+            itens,
+            self._codificar(self.ANTERIOR, itens[0]) if itens and tem_anterior else None,
+            self.cursor_apos(itens[-1]) if itens and tem_proxima else None,
+            self,
+        )
+
+    def contagem_aproximada(self, limite=LIMITE_CONTAGEM):
+        """
+        Estima o total de itens da listagem. No PostgreSQL a estimativa vem do plano do otimizador
+        (EXPLAIN, sem executar a consulta); nos demais bancos a contagem para em `limite` itens.
+        Retorna {'total': n, 'limitada': True se houver mais de n itens}.
+        """
+        queryset = self.queryset.order_by().values('pk')
+        conexao = connections[queryset.db]
+        if conexao.vendor == 'postgresql':
+            sql, parametros = queryset.query.sql_with_params()
+            with conexao.cursor() as cursor:
+                cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', parametros)
+                plano = cursor.fetchone()[0]
+            if isinstance(plano, str):
+                plano = json.loads(plano)
+            return {'total': int(plano[0]['Plan']['Plan Rows']), 'limitada': False}
+        total = queryset[:limite + 1].count()
+        return {'total': min(total, limite), 'limitada': total > limite}
+
+    def cursor_apos(self, objeto):
+        """Retorna o cursor da página que começa logo depois de `objeto`."""
+        return self._codificar(self.PROXIMA, objeto)
+
+    def _condicao_apos(self, ordenacao, valores):
+        """
+        Monta (c1 > v1) OR (c1 = v1 AND c2 > v2) OR ... respeitando o sentido de cada campo.
+        A condição redundante c1 >= v1 é acrescentada para que o banco percorra o índice como
+        um intervalo, em vez de avaliar o OR linha a linha.
+        """
+        condicoes = []
+        for i, campo in enumerate(ordenacao):
+            nome = campo.lstrip('-')
+            lookup = 'lt' if campo.startswith('-') else 'gt'
+            anteriores = {c.lstrip('-'): valores[j] for j, c in enumerate(ordenacao[:i])}
+            condicoes.append(Q(**anteriores, **{f'{nome}__{lookup}': valores[i]}))
+        primeiro = ordenacao[0]
+        limite = Q(**{f"{primeiro.lstrip('-')}__{'lte' if primeiro.startswith('-') else 'gte'}": valores[0]})
+        return limite & reduce(lambda a, b: a | b, condicoes)
+
+    def _valores(self, objeto):
+        return [
+            objeto.pk if campo.lstrip('-') == 'pk' else attrgetter(campo.lstrip('-').replace('__', '.'))(objeto)
+            for campo in self.ordenacao
+        ]
+
+    def _codificar(self, direcao, objeto):
+        # isoformat() preserva os microssegundos, que o DjangoJSONEncoder truncaria
+        dados = json.dumps(
+            [direcao, self._valores(objeto)],
+            default=lambda valor: valor.isoformat() if hasattr(valor, 'isoformat') else str(valor)
+        )
+        return base64.urlsafe_b64encode(dados.encode()).decode().rstrip('=')
+
+    def _decodificar(self, cursor):
+        if not cursor:
+            return self.PROXIMA, None
+        try:
+            dados = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            direcao, valores = json.loads(dados)
+            if direcao not in (self.PROXIMA, self.ANTERIOR) or len(valores) != len(self.ordenacao):
+                return self.PROXIMA, None
+            return direcao, [self._converter(campo, valor) for campo, valor in zip(self.ordenacao, valores)]
+        except (binascii.Error, ValueError, TypeError, ValidationError):
+            # Cursor adulterado ou de outra listagem: volta para a primeira página
+            return self.PROXIMA, None
+
+    def _campo_modelo(self, campo):
+        modelo = self.queryset.model
+        *caminho, nome = campo.lstrip('-').split('__')
+        for parte in caminho:
+            modelo = modelo._meta.get_field(parte).related_model
+        return modelo._meta.pk if nome == 'pk' else modelo._meta.get_field(nome)
+
+    def _unico(self, campo):
+        """Campos únicos do próprio modelo (como Raca.nome) dispensam a chave primária como desempate."""
+        return '__' not in campo and self._campo_modelo(campo).unique
+
+    def _converter(self, campo, valor):
+        """Converte o valor vindo do JSON para o tipo do campo do modelo (ex.: texto ISO -> datetime)."""
+        return self._campo_modelo(campo).to_python(valor)
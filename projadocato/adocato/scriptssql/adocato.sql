@@ -7,4 +7,6 @@ CREATE TABLE "adocato_gato" ("id" integer NOT NULL PRIMARY KEY AUTOINCREMENT,
 "disponivel" bool NOT NULL, 
 "raca_id" bigint NOT NULL REFERENCES "adocato_raca" ("id") DEFERRABLE INITIALLY DEFERRED);
 
-CREATE INDEX "adocato_gato_raca_id_ae5eeaf1" ON "adocato_gato" ("raca_id");
\ No newline at end of file
+CREATE INDEX "adocato_gato_raca_id_ae5eeaf1" ON "adocato_gato" ("raca_id");
+CREATE INDEX "gato_disponivel_nome_idx" ON "adocato_gato" ("nome", "id") WHERE "disponivel";
+CREATE INDEX "gato_nome_idx" ON "adocato_gato" ("nome", "id");
\ No newline at end of file
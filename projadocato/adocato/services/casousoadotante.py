@@ -1,5 +1,6 @@
 from adocato.models import Adotante
 from django.core.exceptions import ValidationError
+from adocato.busca import BuscaTextual
 
 
 class CasoUsoAdotante:
@@ -21,14 +22,12 @@ class CasoUsoAdotante:
         """Busca adotantes com filtros opcionais: nome, CPF, username, cidade ou estado."""
         query = Adotante.objects.all()
         
-        if nome:
-            query = query.filter(nome__icontains=nome)
+        query = BuscaTextual.filtrar(query, 'nome', nome)
         if cpf:
             query = query.filter(cpf__icontains=cpf)
         if username:
             query = query.filter(username__icontains=username)
-        if cidade:
-            query = query.filter(cidade__icontains=cidade)
+        query = BuscaTextual.filtrar(query, 'cidade', cidade)
         if estado:
             query = query.filter(estado__icontains=estado)
         
@@ -1,5 +1,6 @@
 from adocato.models import Coordenador
 from django.core.exceptions import ValidationError
+from adocato.busca import BuscaTextual
 
 
 class CasoUsoCoordenador:
@@ -21,8 +22,7 @@ class CasoUsoCoordenador:
         """Busca coordenadores com filtros opcionais: nome, CPF ou username."""
         query = Coordenador.objects.all()
         
-        if nome:
-            query = query.filter(nome__icontains=nome)
+        query = BuscaTextual.filtrar(query, 'nome', nome)
         if cpf:
             query = query.filter(cpf__icontains=cpf)
         if username:
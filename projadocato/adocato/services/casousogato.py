@@ -1,4 +1,5 @@
 from adocato.models import Gato, Raca 
+from adocato.busca import BuscaTextual
 from django.core.exceptions import ValidationError
 class CasoUsoGato:
     @staticmethod
@@ -20,19 +21,15 @@ class CasoUsoGato:
     def buscar_gatos_disponiveis(nome=None,raca_nome=None):
         """Lista todos os gatos disponíveis para adoção."""
         query=Gato.objects.filter(disponivel=True).order_by('nome')
-        if nome:
-            query = query.filter(nome__icontains=nome)
-        if raca_nome:
-            query=query.filter(raca__nome__icontains=raca_nome)
+        query = BuscaTextual.filtrar(query, 'nome', nome)
+        query = BuscaTextual.filtrar(query, 'raca__nome', raca_nome)
         return query
     @staticmethod
     def buscar_gatos(nome=None, raca_nome=None):
         """Aqui temos uma refatoração, incluindo uma busca genérica, com 2 parâmetros opcionais: nome e raça"""
         query = Gato.objects.select_related('raca').order_by('nome')
-        if nome:
-            query = query.filter(nome__icontains=nome)
-        if raca_nome:
-            query=query.filter(raca__nome__icontains=raca_nome)
+        query = BuscaTextual.filtrar(query, 'nome', nome)
+        query = BuscaTextual.filtrar(query, 'raca__nome', raca_nome)
         return query
     @staticmethod
     def cadastrar_gato(nome, sexo, cor, data_nascimento, descricao=None, disponivel=True, raca_id=None,foto=None):
@@ -1,4 +1,5 @@
 from adocato.models import Raca
+from adocato.busca import BuscaTextual
 from django.core.exceptions import ValidationError
 
 
@@ -19,12 +20,8 @@ class CasoUsoRaca:
     @staticmethod
     def buscar_racas(nome=None):
         """Busca raças com filtro opcional por nome."""
-        query = Raca.objects.all()
-        
-        if nome:
-            query = query.filter(nome__icontains=nome)
-        
-        return query.order_by('nome')
+        query = Raca.objects.all().order_by('nome')
+        return BuscaTextual.filtrar(query, 'nome', nome)
     
     @staticmethod
     def cadastrar_raca(nome):
@@ -1,6 +1,12 @@
-from adocato.models import Solicitacao, Gato, Adotante, Coordenador, Avaliacao
+from adocato.models import Solicitacao, SolicitacaoQuerySet, Gato, Adotante, Coordenador, Avaliacao
 from django.core.exceptions import ValidationError
-from django.db import transaction
+from django.db import IntegrityError, transaction
+from adocato.busca import BuscaTextual
+from django.db.models import Count, Q
+from django.core.cache import cache
+
+ESTATISTICAS_CACHE_KEY = 'adocato:estatisticas_solicitacoes'
+ESTATISTICAS_CACHE_TIMEOUT = 60  # segundos
 
 
 class CasoUsoSolicitacao:
@@ -21,7 +27,7 @@ class CasoUsoSolicitacao:
     def buscar_solicitacao_com_relacionamentos(solicitacao_id):
         """Busca uma solicitação com relacionamentos carregados."""
         try:
-            return Solicitacao.objects.select_related(
+            return Solicitacao.objects.com_atraso().select_related(
                 'gato', 'gato__raca', 'adotante'
             ).get(id=solicitacao_id)
         except Solicitacao.DoesNotExist:
@@ -44,25 +50,26 @@ class CasoUsoSolicitacao:
     @staticmethod
     def buscar_solicitacoes_com_relacionamentos(filtros=None):
         """Busca solicitações com relacionamentos carregados."""
-        query = Solicitacao.objects.select_related('gato', 'gato__raca', 'adotante')
+        query = Solicitacao.objects.com_atraso().select_related('gato', 'gato__raca', 'adotante')
         
         if filtros:
             if 'status' in filtros and filtros['status'] != 'todos':
                 query = query.filter(status=filtros['status'])
             if 'busca' in filtros and filtros['busca']:
                 busca = filtros['busca']
+                # Uma única condição OR, sem duplicar os JOINs como a união de dois querysets faria
                 query = query.filter(
-                    gato__nome__icontains=busca
-                ) | query.filter(
-                    adotante__nome__icontains=busca
+                    BuscaTextual.condicao(Solicitacao, 'gato__nome', busca) |
+                    BuscaTextual.condicao(Solicitacao, 'adotante__nome', busca)
                 )
         
-        return query.order_by('dataSolicitacao')
+        # O id desempata solicitações com a mesma data, o que a paginação por cursor exige
+        return query.order_by('dataSolicitacao', 'id')
     
     @staticmethod
     def buscar_solicitacoes_adotante_com_relacionamentos(adotante_id):
         """Busca solicitações de um adotante com relacionamentos carregados."""
-        return Solicitacao.objects.filter(
+        return Solicitacao.objects.com_atraso().filter(
             adotante_id=adotante_id
         ).select_related('gato', 'gato__raca').order_by('-dataSolicitacao')
     
@@ -84,37 +91,62 @@ class CasoUsoSolicitacao:
         """Busca todas as solicitações que um coordenador pode avaliar."""
         return Solicitacao.objects.filter(status__in=['Em_Analise'])
     
+    @staticmethod
+    def reservar_gato_disponivel(gato_id):
+        """
+        Busca o gato disponível com uma única consulta, bloqueando a linha (select_for_update)
+        até o fim da transação. Deve ser chamada dentro de transaction.atomic().
+        """
+        gato = Gato.objects.select_for_update().filter(id=gato_id, disponivel=True).first()
+        if not gato:
+            raise ValidationError("Gato não encontrado ou não disponível.", code='gato_indisponivel')
+        return gato
+
+    @staticmethod
+    @transaction.atomic
+    def iniciar_solicitacao(adotante_id, gato_id):
+        """
+        Inicia a adoção: reserva o gato e cria a solicitação na mesma transação,
+        reaproveitando a linha já bloqueada em vez de buscá-la novamente.
+        """
+        gato = CasoUsoSolicitacao.reservar_gato_disponivel(gato_id)
+        return CasoUsoSolicitacao._criar_solicitacao(adotante_id, gato=gato)
+
     @staticmethod
     @transaction.atomic
-    def criar_solicitacao(adotante_id, gato_id):
+    def criar_solicitacao(adotante_id, gato_id=None, gato=None):
         """
         Cria uma nova solicitação.
         Regras:
         - O gato deve estar disponível
         - O gato fica indisponível quando a solicitação é criada
         - Status inicial: Em_Edicao
+        Se `gato` for informado (já obtido por reservar_gato_disponivel), ele não é buscado novamente.
         """
+        return CasoUsoSolicitacao._criar_solicitacao(adotante_id, gato_id, gato)
+
+    @staticmethod
+    def _criar_solicitacao(adotante_id, gato_id=None, gato=None):
+        """Corpo de criar_solicitacao, sem abrir outro savepoint quando já se está na transação de iniciar_solicitacao."""
         # Busca o adotante
         try:
             adotante = Adotante.objects.get(id=adotante_id)
         except Adotante.DoesNotExist:
             raise ValidationError("Adotante não encontrado.")
         
-        # Busca o gato
-        try:
-            gato = Gato.objects.get(id=gato_id)
-        except Gato.DoesNotExist:
-            raise ValidationError("Gato não encontrado.")
+        # Busca o gato, bloqueando a linha até o fim da transação
+        if gato is None:
+            try:
+                gato = Gato.objects.select_for_update().get(id=gato_id)
+            except Gato.DoesNotExist:
+                raise ValidationError("Gato não encontrado.")
         
         # Verifica se o gato está disponível
         if not gato.disponivel:
             raise ValidationError("Este gato não está disponível para adoção.")
         
         # Verifica se já existe uma solicitação ativa para este gato
-        solicitacao_existente = Solicitacao.objects.filter(
-            gato=gato,
-            status__in=['Em_Edicao', 'Em_Analise', 'Em_Recurso']
-        ).first()
+        solicitacao_existente = Solicitacao.objects.ativas().filter(gato=gato).exists()
         
         if solicitacao_existente:
             raise ValidationError("Já existe uma solicitação ativa para este gato.")
@@ -127,14 +159,22 @@ class CasoUsoSolicitacao:
         )
         
         try:
-            solicitacao.full_clean()
+            # A restrição de solicitação ativa única já foi verificada acima, e o adotante e o gato
+            # acabaram de ser lidos: não há por que validar as chaves estrangeiras com outras consultas
+            solicitacao.full_clean(exclude=['adotante', 'gato'], validate_constraints=False)
         except ValidationError as e:
             raise e
         
-        # Salva a solicitação e torna o gato indisponível
-        solicitacao.save()
+        # Salva a solicitação e torna o gato indisponível.
+        # Se outra transação reservou o gato depois da verificação, a restrição do banco recusa a inserção.
+        # O savepoint próprio isola o erro: sem ele, a transação ficaria inutilizável (no PostgreSQL, abortada).
+        try:
+            with transaction.atomic():
+                solicitacao.save()
+        except IntegrityError:
+            raise ValidationError("Já existe uma solicitação ativa para este gato.")
         gato.disponivel = False
-        gato.save()
+        gato.save(update_fields=['disponivel'])
         
         return solicitacao
     
@@ -365,31 +405,38 @@ class CasoUsoSolicitacao:
     
     @staticmethod
     def buscar_solicitacoes_atrasadas():
-        """Busca solicitações que estão atrasadas (mais de 7 dias em análise ou recurso)."""
-        solicitacoes = Solicitacao.objects.filter(
-            status__in=['Em_Analise', 'Em_Recurso']
-        )
-        return [s for s in solicitacoes if s.esta_atrasado()]
+        """Busca solicitações que estão atrasadas (mais de 7 dias em análise ou recurso), das mais antigas para as mais recentes."""
+        return Solicitacao.objects.atrasadas().com_atraso().select_related(
+            'gato', 'gato__raca', 'adotante'
+        ).order_by('dataSolicitacao')
     
     @staticmethod
     def get_estatisticas():
-        """Retorna estatísticas gerais das solicitações."""
-        total = Solicitacao.objects.count()
-        em_edicao = Solicitacao.objects.filter(status='Em_Edicao').count()
-        em_analise = Solicitacao.objects.filter(status='Em_Analise').count()
-        aprovadas = Solicitacao.objects.filter(status='Aprovada').count()
-        reprovadas = Solicitacao.objects.filter(status='Reprovada').count()
-        em_recurso = Solicitacao.objects.filter(status='Em_Recurso').count()
-        
-        return {
-            'total': total,
-            'em_edicao': em_edicao,
-            'em_analise': em_analise,
-            'aprovadas': aprovadas,
-            'reprovadas': reprovadas,
-            'em_recurso': em_recurso,
-            'atrasadas': len(CasoUsoSolicitacao.buscar_solicitacoes_atrasadas())
-        }
+        """
+        Retorna estatísticas gerais das solicitações.
+        Todas as contagens (inclusive as atrasadas) são feitas em uma única consulta com agregação condicional.
+        """
+        return Solicitacao.objects.aggregate(
+            total=Count('id'),
+            em_edicao=Count('id', filter=Q(status='Em_Edicao')),
+            em_analise=Count('id', filter=Q(status='Em_Analise')),
+            aprovadas=Count('id', filter=Q(status='Aprovada')),
+            reprovadas=Count('id', filter=Q(status='Reprovada')),
+            em_recurso=Count('id', filter=Q(status='Em_Recurso')),
+            atrasadas=Count('id', filter=SolicitacaoQuerySet.filtro_atrasadas())
+        )
+    
+    @staticmethod
+    def get_estatisticas_em_cache(timeout=ESTATISTICAS_CACHE_TIMEOUT):
+        """
+        Retorna um retrato das estatísticas guardado no cache por `timeout` segundos.
+        Indicado para painéis, onde alguns segundos de defasagem são aceitáveis.
+        """
+        estatisticas = cache.get(ESTATISTICAS_CACHE_KEY)
+        if estatisticas is None:
+            estatisticas = CasoUsoSolicitacao.get_estatisticas()
+            cache.set(ESTATISTICAS_CACHE_KEY, estatisticas, timeout)
+        return estatisticas
     
     @staticmethod
     def estatisticas_solicitacoes():
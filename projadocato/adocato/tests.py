@@ -1,3 +1,281 @@
-from django.test import TestCase
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.http import HttpResponse
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import path, reverse
+
+from comum.orcamento_consultas import OrcamentoConsultasExcedido, orcamento_consultas
+from adocato.utils import GerenciadorCacheUsuario
+from adocato.models import Adotante, Coordenador, Gato, Raca, Solicitacao
+from adocato.services.casousoadotante import CasoUsoAdotante
+from adocato.services.casousocoordenador import CasoUsoCoordenador
+from adocato.services.casousogato import CasoUsoGato
+from adocato.services.casousosolicitacao import CasoUsoSolicitacao
+
+
+class BuscaTextualTests(TestCase):
+    """A busca indexada encontra os mesmos gatos que o __icontains que ela substituiu."""
+
+    @classmethod
+    def setUpTestData(cls):
+        raca = Raca.objects.create(nome='Siamês')
+        for nome in ['Bigode', 'Paçoca', 'Mimi', 'Tom Gato']:
+            Gato.objects.create(nome=nome, sexo='M', cor='Preto', dataNascimento=date(2020, 1, 1), raca=raca)
+
+    def test_trechos_no_meio_das_palavras(self):
+        casos = {
+            'ode': ['Bigode'], 'aço': ['Paçoca'], 'MI': ['Mimi'], 'm ga': ['Tom Gato'],
+            'o': ['Bigode', 'Paçoca', 'Tom Gato'],
+        }
+        for termo, nomes in casos.items():
+            with self.subTest(termo=termo):
+                self.assertEqual([gato.nome for gato in CasoUsoGato.buscar_gatos(nome=termo)], nomes)
+
+    def test_usa_o_indice_trigram_no_sqlite(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest("Índice FTS5 só existe no SQLite")
+        self.assertIn('MATCH', str(CasoUsoGato.buscar_gatos(nome='ode').query))
+        # Menos de três caracteres não formam um trigrama: volta ao icontains
+        self.assertNotIn('MATCH', str(CasoUsoGato.buscar_gatos(nome='od').query))
+
+    def test_palavras_na_ordem_digitada(self):
+        self.assertFalse(CasoUsoGato.buscar_gatos(nome='gato tom').exists())
+
+    def test_busca_pela_raca(self):
+        self.assertEqual(CasoUsoGato.buscar_gatos(raca_nome='amê').count(), 4)
+
+
+class GatosDisponiveisViewTests(TestCase):
+    """A listagem paginada faz o mesmo número de consultas na primeira página e nas mais fundas."""
+
+    CONSULTAS_POR_PAGINA = 2  # Página + contagem aproximada
+
+    @classmethod
+    def setUpTestData(cls):
+        raca = Raca.objects.create(nome='Persa')
+        Gato.objects.bulk_create(
+            Gato(nome=f'Gato {i:03d}', sexo='F', cor='Branco', dataNascimento=date(2020, 1, 1), raca=raca,
+                 disponivel=i % 4 != 0)
+            for i in range(200)
+        )
+
+    def _paginas(self, **parametros):
+        """Percorre a listagem pelos cursores, conferindo as consultas de cada página."""
+        url = reverse('adocato:gatos_disponiveis')
+        paginas = []
+        while True:
+            with self.assertNumQueries(self.CONSULTAS_POR_PAGINA):
+                resposta = self.client.get(url, parametros)
+            self.assertEqual(resposta.status_code, 200)
+            pagina = resposta.context['page_obj']
+            paginas.append([gato.nome for gato in pagina])
+            if not pagina.has_next():
+                return paginas
+            parametros = {**parametros, 'cursor': pagina.cursor_proximo}
+
+    def test_consultas_por_pagina(self):
+        paginas = self._paginas()
+        self.assertEqual(len(paginas), 25)  # 150 disponíveis, 6 por página
+        nomes = [nome for pagina in paginas for nome in pagina]
+        self.assertEqual(nomes, sorted(Gato.objects.filter(disponivel=True).values_list('nome', flat=True)))
+
+    def test_consultas_por_pagina_com_busca(self):
+        # A busca é aplicada antes da paginação: 'Gato 1' casa com 100 a 199, 75 deles disponíveis
+        paginas = self._paginas(busca='Gato 1')
+        self.assertEqual(len(paginas), 13)
+        self.assertTrue(all(nome.startswith('Gato 1') for pagina in paginas for nome in pagina))
+
+
+def criar_adotante(numero):
+    return Adotante.objects.create(
+        username=f'adotante{numero}', nome=f'Adotante {numero}', dataNascimento=date(1990, 1, 1),
+        cpf=f'{numero:011d}',
+    )
+
+
+class IniciarSolicitacaoTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.adotante = criar_adotante(1)
+        cls.gato = Gato.objects.create(
+            nome='Mimi', sexo='F', cor='Cinza', dataNascimento=date(2020, 1, 1), raca=Raca.objects.create(nome='Persa')
+        )
+
+    def test_consultas(self):
+        # Gato bloqueado, adotante, verificação de solicitação ativa, inserção e gato indisponível,
+        # mais o savepoint da transação e o da inserção (abertos e liberados)
+        with self.assertNumQueries(9):
+            solicitacao = CasoUsoSolicitacao.iniciar_solicitacao(self.adotante.id, self.gato.id)
+        self.assertEqual(solicitacao.status, 'Em_Edicao')
+        self.gato.refresh_from_db()
+        self.assertFalse(self.gato.disponivel)
+
+    def test_erro_de_negocio_nao_invalida_a_transacao_externa(self):
+        # O TestCase roda dentro de um atomic, como uma requisição com ATOMIC_REQUESTS
+        CasoUsoSolicitacao.iniciar_solicitacao(self.adotante.id, self.gato.id)
+        with self.assertRaises(ValidationError):
+            CasoUsoSolicitacao.iniciar_solicitacao(self.adotante.id, self.gato.id)
+        with self.assertRaises(ValidationError):
+            CasoUsoSolicitacao.criar_solicitacao(self.adotante.id, gato_id=self.gato.id)
+        # Sem o savepoint, esta consulta falharia com TransactionManagementError
+        self.assertEqual(Solicitacao.objects.filter(gato=self.gato).count(), 1)
+
+
+class PerfilUsuarioCacheTests(TestCase):
+    """O perfil fica no cache depois da primeira consulta e é invalidado por qualquer gravação do usuário."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.adotante = CasoUsoAdotante.cadastrar_adotante(
+            'Ana Souza', '12345678901', 'anasouza', 'senha123', date(1990, 1, 1), telefone='83999990000'
+        )
+        cls.coordenador = CasoUsoCoordenador.cadastrar_coordenador('Bruno Lima', '10987654321', 'brunolima', 'senha123')
+
+    def setUp(self):
+        cache.clear()
+
+    def _nome(self, usuario):
+        return GerenciadorCacheUsuario.obter_perfil(usuario)['usuario_nome']
+
+    def test_perfil_em_cache(self):
+        with self.assertNumQueries(1):
+            self.assertTrue(GerenciadorCacheUsuario.eh_adotante(self.adotante))
+        with self.assertNumQueries(0):
+            self.assertFalse(GerenciadorCacheUsuario.eh_coordenador(self.adotante))
+            self.assertEqual(self._nome(self.adotante), 'Ana Souza')
+
+    def test_casos_de_uso_invalidam(self):
+        for usuario in (self.adotante, self.coordenador):
+            self._nome(usuario)  # Perfis no cache
+        CasoUsoAdotante.atualizar_adotante(self.adotante.id, nome='Ana Maria')
+        CasoUsoCoordenador.atualizar_coordenador(self.coordenador.id, nome='Bruno Melo')
+        self.assertEqual((self._nome(self.adotante), self._nome(self.coordenador)), ('Ana Maria', 'Bruno Melo'))
+        CasoUsoCoordenador.excluir_coordenador(self.coordenador.id)
+        self.assertIsNone(cache.get(GerenciadorCacheUsuario.chave(self.coordenador.id)))
+
+    def test_gravacao_fora_dos_casos_de_uso_invalida(self):
+        # O admin grava com save() e exclui com delete(), sem passar pelos casos de uso
+        self._nome(self.adotante)
+        adotante = Adotante.objects.get(id=self.adotante.id)
+        adotante.nome = 'Ana Admin'
+        adotante.save()
+        self.assertEqual(self._nome(self.adotante), 'Ana Admin')
+        User.objects.get(id=self.adotante.id).save(update_fields=['email'])
+        self.assertIsNone(cache.get(GerenciadorCacheUsuario.chave(self.adotante.id)))
+
+    def test_exclusao_pelo_admin_invalida(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'senha123'))
+        self._nome(self.coordenador)
+        resposta = self.client.post(
+            reverse('admin:adocato_coordenador_delete', args=[self.coordenador.id]), {'post': 'yes'}
+        )
+        self.assertEqual(resposta.status_code, 302)
+        self.assertFalse(Coordenador.objects.exists())
+        self.assertIsNone(cache.get(GerenciadorCacheUsuario.chave(self.coordenador.id)))
+
+
+class SolicitacaoConcorrenteTests(TransactionTestCase):
+    """
+    Chamadas simultâneas a criar_solicitacao, cada uma na sua conexão: apenas uma solicitação
+    ativa por gato, e gatos distintos não bloqueiam uns aos outros.
+    """
+
+    TENTATIVAS = 300
+
+    def setUp(self):
+        if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+            self.skipTest("O SQLite em memória não aceita uma conexão por thread")
+        raca = Raca.objects.create(nome='Persa')
+        self.gatos = [
+            Gato.objects.create(nome=f'Gato {i}', sexo='F', cor='Preto', dataNascimento=date(2020, 1, 1), raca=raca)
+            for i in range(self.TENTATIVAS + 1)
+        ]
+        self.adotantes = [criar_adotante(i) for i in range(self.TENTATIVAS)]
+
+    def _disparar(self, chamadas):
+        def tentar(adotante, gato):
+            try:
+                CasoUsoSolicitacao.criar_solicitacao(adotante.id, gato_id=gato.id)
+                return True
+            except ValidationError:
+                return False
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            return list(executor.map(lambda chamada: tentar(*chamada), chamadas))
+
+    def test_mesmo_gato(self):
+        disputado = self.gatos[0]
+        resultados = self._disparar([(adotante, disputado) for adotante in self.adotantes])
+        self.assertEqual(resultados.count(True), 1)
+        self.assertEqual(Solicitacao.objects.ativas().filter(gato=disputado).count(), 1)
+
+    def test_gatos_distintos(self):
+        resultados = self._disparar(list(zip(self.adotantes, self.gatos[1:])))
+        self.assertTrue(all(resultados))
+        self.assertEqual(Solicitacao.objects.ativas().count(), self.TENTATIVAS)
+
+
+@orcamento_consultas(1)
+def view_racas_dos_gatos(request):
+    """Lê a raça de cada gato sem select_related: uma consulta por gato (N+1)."""
+    return HttpResponse(', '.join(gato.raca.nome for gato in Gato.objects.all()))
+
+
+@orcamento_consultas(1)
+def view_gatos_com_raca(request):
+    return HttpResponse(', '.join(gato.raca.nome for gato in Gato.objects.select_related('raca')))
+
+
+urlpatterns = [
+    path('racas-dos-gatos/', view_racas_dos_gatos),
+    path('gatos-com-raca/', view_gatos_com_raca),
+]
+
+
+@override_settings(
+    ROOT_URLCONF=__name__,
+    MIDDLEWARE=['comum.orcamento_consultas.OrcamentoConsultasMiddleware'],
+    ORCAMENTO_CONSULTAS_FALHAR=True,
+)
+class OrcamentoConsultasTests(TestCase):
+    """Com ORCAMENTO_CONSULTAS_FALHAR, exceder o orçamento ou repetir consultas faz o teste falhar."""
+
+    @classmethod
+    def setUpTestData(cls):
+        raca = Raca.objects.create(nome='Persa')
+        for nome in ['Mimi', 'Tom', 'Bigode']:
+            Gato.objects.create(nome=nome, sexo='F', cor='Preto', dataNascimento=date(2020, 1, 1), raca=raca)
+
+    def test_dentro_do_orcamento(self):
+        with self.assertLogs('consultas', 'INFO') as registro:
+            resposta = self.client.get('/gatos-com-raca/')
+        self.assertEqual(resposta['X-Consultas'], '1')
+        self.assertEqual(resposta['X-Consultas-Repetidas'], '0')
+        self.assertEqual([linha.levelname for linha in registro.records], ['INFO'])
+
+    def _falhar(self, url, mensagem):
+        with self.assertLogs('consultas', 'WARNING'), self.assertLogs('django.request', 'ERROR'):
+            with self.assertRaisesMessage(OrcamentoConsultasExcedido, mensagem):
+                self.client.get(url)
+
+    def test_n_mais_um(self):
+        self._falhar('/racas-dos-gatos/', '3x SELECT')
+
+    @override_settings(ORCAMENTO_CONSULTAS_REPETICOES=10)
+    def test_orcamento_excedido(self):
+        # Sem repetições suficientes para N+1, ainda falha pelo orçamento: 4 consultas para 1
+        self._falhar('/racas-dos-gatos/', '4 consultas (orçamento: 1)')
+
+    @override_settings(ORCAMENTO_CONSULTAS_FALHAR=False)
+    def test_sem_falhar_apenas_informa(self):
+        with self.assertLogs('consultas', 'WARNING'):
+            resposta = self.client.get('/racas-dos-gatos/')
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(resposta['X-Consultas-Repetidas'], '1')
@@ -1,14 +1,28 @@
 from django.contrib import messages
+from django.contrib.auth.models import User
+from django.core.cache import cache
 
 
-class GerenciadorSessaoUsuario:
+class GerenciadorCacheUsuario:
+    """
+    Resolve o perfil (adotante, coordenador ou administrador) de um usuário e o mantém no cache
+    compartilhado do Django. Assim, todos os workers reaproveitam o mesmo resultado e as
+    verificações de perfil deixam de consultar o banco após o primeiro acesso.
+    O perfil é invalidado a cada save() ou delete() de User, Adotante ou Coordenador (sinais ligados em
+    AdocatoConfig.ready), o que cobre os casos de uso e o admin. Alterações por queryset.update() não
+    disparam sinais: nesse caso o perfil antigo pode ser servido até expirar (TIMEOUT).
+    """
+    TIMEOUT = 60 * 60  # 1 hora
+
     @staticmethod
-    def determinar_tipo_usuario(request):
-        """
-        Determina o tipo de usuário (adotante ou coordenador) e armazena na sessão.
-        Retorna um dicionário com informações do usuário.
-        """
-        if not request.user.is_authenticated:
+    def chave(usuario_id):
+        """Retorna a chave de cache do perfil de um usuário."""
+        return f'adocato:perfil_usuario:{usuario_id}'
+
+    @staticmethod
+    def obter_perfil(usuario):
+        """Retorna o dicionário com o perfil do usuário, consultando o banco apenas se não estiver no cache."""
+        if not usuario.is_authenticated:
             return {
                 'tipo_usuario': 'anonimo',
                 'eh_adotante': False,
@@ -17,68 +31,85 @@ class GerenciadorSessaoUsuario:
                 'usuario_nome': None,
                 'usuario_id': None
             }
-        
-        # Verifica se já existe na sessão e se é para o mesmo usuário
-        sessao_key = f'tipo_usuario_{request.user.id}'
-        if sessao_key in request.session:
-            return request.session[sessao_key]
-        
-        # Importa aqui para evitar import circular
-        from .services.casousoadotante import CasoUsoAdotante
-        from .services.casousocoordenador import CasoUsoCoordenador
-        
-        # Verifica se é adotante
-        adotante = CasoUsoAdotante.buscar_adotante_por_id(request.user.id)
-        if adotante:
-            info_usuario = {
-                'tipo_usuario': 'adotante',
-                'eh_adotante': True,
-                'eh_coordenador': False,
-                'eh_administrador': False,
-                'usuario_nome': adotante.nome,
-                'usuario_id': adotante.id,
-                'usuario_email': adotante.email,
-                'usuario_username': adotante.username
-            }
+
+        chave = GerenciadorCacheUsuario.chave(usuario.id)
+        info_usuario = cache.get(chave)
+        if info_usuario is None:
+            info_usuario = GerenciadorCacheUsuario._resolver_perfil(usuario.id)
+            cache.set(chave, info_usuario, GerenciadorCacheUsuario.TIMEOUT)
+        return info_usuario
+
+    @staticmethod
+    def _resolver_perfil(usuario_id):
+        """
+        Resolve o perfil com uma única consulta: Adotante e Coordenador herdam de User
+        (herança multi-tabela), então basta um LEFT JOIN com as duas tabelas filhas.
+        """
+        dados = User.objects.filter(id=usuario_id).values(
+            'username', 'email', 'adotante__nome', 'coordenador__nome'
+        ).first() or {}
+
+        if dados.get('adotante__nome') is not None:
+            tipo, nome = 'adotante', dados['adotante__nome']
+        elif dados.get('coordenador__nome') is not None:
+            tipo, nome = 'coordenador', dados['coordenador__nome']
         else:
-            # Verifica se é coordenador
-            coordenador = CasoUsoCoordenador.buscar_coordenador_por_id(request.user.id)
-            if coordenador:
-                info_usuario = {
-                    'tipo_usuario': 'coordenador',
-                    'eh_adotante': False,
-                    'eh_coordenador': True,
-                    'eh_administrador': False,
-                    'usuario_nome': coordenador.nome,
-                    'usuario_id': coordenador.id,
-                    'usuario_email': coordenador.email,
-                    'usuario_username': coordenador.username
-                }
-            else:
-                # Usuário logado mas sem tipo específico
-                info_usuario = {
-                    'tipo_usuario': 'Administrador',
-                    'eh_adotante': False,
-                    'eh_coordenador': False,
-                    'eh_administrador': True,
-                    'usuario_nome': request.user.username,
-                    'usuario_id': request.user.id,
-                    'usuario_email': request.user.email,
-                    'usuario_username': request.user.username
-                }
-        
-        # Armazena na sessão
-        request.session[sessao_key] = info_usuario
-        request.session['usuario_nome'] = info_usuario['usuario_nome'] # Armazena o nome do usuário(login) na sessão
+            # Usuário logado mas sem tipo específico
+            tipo, nome = 'Administrador', dados.get('username')
+
+        return {
+            'tipo_usuario': tipo,
+            'eh_adotante': tipo == 'adotante',
+            'eh_coordenador': tipo == 'coordenador',
+            'eh_administrador': tipo == 'Administrador',
+            'usuario_nome': nome,
+            'usuario_id': usuario_id,
+            'usuario_email': dados.get('email'),
+            'usuario_username': dados.get('username')
+        }
+
+    @staticmethod
+    def eh_adotante(usuario):
+        return GerenciadorCacheUsuario.obter_perfil(usuario)['eh_adotante']
+
+    @staticmethod
+    def eh_coordenador(usuario):
+        return GerenciadorCacheUsuario.obter_perfil(usuario)['eh_coordenador']
+
+    @staticmethod
+    def invalidar(usuario_id):
+        """Remove o perfil de um usuário do cache."""
+        if usuario_id is not None:
+            cache.delete(GerenciadorCacheUsuario.chave(usuario_id))
+
+    @staticmethod
+    def invalidar_ao_gravar(sender, instance, **kwargs):
+        """Receptor de post_save e post_delete: o usuário gravado ou excluído volta a ser resolvido no banco."""
+        GerenciadorCacheUsuario.invalidar(instance.pk)
+
+
+class GerenciadorSessaoUsuario:
+    @staticmethod
+    def determinar_tipo_usuario(request):
+        """
+        Determina o tipo de usuário (adotante ou coordenador) a partir do cache compartilhado.
+        Retorna um dicionário com informações do usuário.
+        """
+        info_usuario = GerenciadorCacheUsuario.obter_perfil(request.user)
+        if not request.user.is_authenticated:
+            return info_usuario
+
+        # Armazena o nome do usuário(login) na sessão, gravando apenas quando ele muda
+        if request.session.get('usuario_nome') != info_usuario['usuario_nome']:
+            request.session['usuario_nome'] = info_usuario['usuario_nome']
         return info_usuario
     
     @staticmethod
     def limpar_sessao_usuario(request):
-        """Remove as informações do usuário da sessão."""
+        """Remove as informações do usuário da sessão e do cache."""
         if request.user.is_authenticated:
-            sessao_key = f'tipo_usuario_{request.user.id}'
-            if sessao_key in request.session:
-                del request.session[sessao_key]
+            GerenciadorCacheUsuario.invalidar(request.user.id)
+            request.session.pop('usuario_nome', None)
     
 
 
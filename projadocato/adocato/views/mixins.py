@@ -1,7 +1,6 @@
-from adocato.services.casousocoordenador import CasoUsoCoordenador
-from adocato.services.casousoadotante import CasoUsoAdotante
 from django.contrib.auth.mixins import UserPassesTestMixin
-from adocato.utils import GerenciadorMensagens  # Adicione o import correto aqui
+from adocato.utils import GerenciadorMensagens, GerenciadorCacheUsuario
+from adocato.paginacao import PaginadorCursor
 from django.core.exceptions import ValidationError
 
 """
@@ -20,23 +19,48 @@ class PerfilCoordenadorMixin(UserPassesTestMixin):
     """Mixin para verificar se o usuário é um coordenador."""
     #raise_exception=True #Nesse caso o mixin acaba oferecendo mais recursos do que o user_passes_test
     def test_func(self):
-        coordenador = CasoUsoCoordenador.buscar_coordenador_por_id(self.request.user.id)
-        if not coordenador:
+        # O perfil vem do cache compartilhado, evitando a consulta ao banco a cada requisição
+        eh_coordenador = GerenciadorCacheUsuario.eh_coordenador(self.request.user)
+        if not eh_coordenador:
             GerenciadorMensagens.processar_erros_validacao(self.request, ValidationError("Você não é um coordenador."))
             # O mixin já redireciona para a página de login com uma mensagem de
         #Como aqui você tem acesso ao request, você poderia registrar uma mensagem de erro como:
         #GerenciadorMensagens.processar_erros_validacao(self.request, ValidationError("Você não é um coordenador."))
      
-        return coordenador is not None
+        return eh_coordenador
 class PerfilAdotanteMixin(UserPassesTestMixin):
     """Mixin para verificar se o usuário é um adotante."""
     raise_exception=True #Nesse caso o mixin acaba oferecendo mais recursos do que o user_passes_test
     def test_func(self):
-        adotante = CasoUsoAdotante.buscar_adotante_por_id(self.request.user.id)
-        return adotante is not None
+        return GerenciadorCacheUsuario.eh_adotante(self.request.user)
 
 class PerfilAdministradorMixin(UserPassesTestMixin):
     """Mixin para verificar se o usuário é um administrador."""
     raise_exception=True #Nesse caso o mixin acaba oferecendo mais recursos do que o user_passes_test
     def test_func(self):
-        return self.request.user.is_superuser
\ No newline at end of file
+        return self.request.user.is_superuser
+
+class PaginacaoCursorMixin:
+    """
+    Mixin para ListViews: troca a paginação por OFFSET (?page=N) pela paginação por cursor (?cursor=...).
+    A ordenação é a do queryset (ou `ordenacao_cursor`), que deve ser atendida por um índice.
+    Com contagem_aproximada=True, o template recebe uma estimativa do total de itens.
+    """
+    ordenacao_cursor = None
+    contagem_aproximada = False
+    parametro_cursor = 'cursor'
+
+    def paginate_queryset(self, queryset, page_size):
+        paginador = PaginadorCursor(queryset, page_size, self.ordenacao_cursor)
+        pagina = paginador.pagina(self.request.GET.get(self.parametro_cursor))
+        return paginador, pagina, pagina.object_list, pagina.has_other_pages()
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        # Parâmetros da URL, sem o cursor, para manter os filtros nos links da paginação
+        parametros = self.request.GET.copy()
+        parametros.pop(self.parametro_cursor, None)
+        context['parametros_url'] = parametros.urlencode()
+        if self.contagem_aproximada and context.get('paginator'):
+            context['contagem_aproximada'] = context['paginator'].contagem_aproximada()
+        return context
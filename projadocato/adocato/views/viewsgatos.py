@@ -39,7 +39,7 @@ from adocato.services.casousoadotante import CasoUsoAdotante
 from adocato.services.casousocoordenador import CasoUsoCoordenador
 from adocato.utils import GerenciadorMensagens, Utilitaria
 from adocato.models import Gato
-from adocato.views.mixins import PerfilCoordenadorMixin
+from adocato.views.mixins import PerfilCoordenadorMixin, PaginacaoCursorMixin
 
 
 class SalvarGatoView(PerfilCoordenadorMixin, View):
@@ -176,7 +176,7 @@ class SalvarGatoView(PerfilCoordenadorMixin, View):
             return render(request, 'adocato/gato/form.html', context)
 
 
-class ListarGatosView(ListView):
+class ListarGatosView(PaginacaoCursorMixin, ListView):
     """
     EXEMPLO DE VIEW BASEADA EM CLASSE USANDO 'ListView' GENÉRICA
     
@@ -196,6 +196,11 @@ class ListarGatosView(ListView):
     - context_object_name: Nome da variável no template (padrão seria 'object_list')
     - model: Modelo a ser listado (alternativa ao get_queryset)
     - paginate_by: Número de itens por página
+
+    PAGINAÇÃO POR CURSOR (PaginacaoCursorMixin):
+    - Substitui o ?page=N (COUNT(*) + OFFSET) por um cursor opaco (?cursor=...)
+    - Cada página é buscada a partir do último nome exibido, com custo constante
+    - contagem_aproximada = True exibe uma estimativa do total no lugar do número de páginas
     
     MÉTODOS QUE PODEM SER SOBRESCRITOS:
     - get_queryset(): Customiza quais objetos serão listados
@@ -210,6 +215,8 @@ class ListarGatosView(ListView):
     context_object_name = 'gatos'
 
     paginate_by = 2  # Define o número de gatos por página
+    contagem_aproximada = True
+    orcamento_consultas = 8  # Máximo de consultas por requisição (OrcamentoConsultasMiddleware)
     
     def get_queryset(self):
         """
@@ -230,7 +237,7 @@ class ListarGatosView(ListView):
         return CasoUsoGato.buscar_gatos(nome=nome, raca_nome=raca_nome)
 
 
-class ListarGatosDisponiveisView(ListView):
+class ListarGatosDisponiveisView(PaginacaoCursorMixin, ListView):
     """
     SEGUNDA ListView - DEMONSTRA REUTILIZAÇÃO E ESPECIALIZAÇÃO
     
@@ -247,6 +254,8 @@ class ListarGatosDisponiveisView(ListView):
     
     template_name = 'adocato/gato/lista_disponiveis.html'
     context_object_name = 'gatos'
+    paginate_by = 2
+    orcamento_consultas = 8
     
     def get_queryset(self):
         """
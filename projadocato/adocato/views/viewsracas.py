@@ -1,13 +1,14 @@
-from adocato.views.mixins import PerfilCoordenadorMixin
+from adocato.views.mixins import PerfilCoordenadorMixin, PaginacaoCursorMixin
 from adocato.services.casousoraca import CasoUsoRaca
 from django.views.generic import ListView
 
-class RacaListView(PerfilCoordenadorMixin, ListView):
+class RacaListView(PerfilCoordenadorMixin, PaginacaoCursorMixin, ListView):
     """View para listar as raças de gatos."""
     
     template_name = 'adocato/raca/lista.html'
     context_object_name = 'racas'
     paginate_by = 2  # Define o número de raças por página
+    orcamento_consultas = 6  # Máximo de consultas por requisição (OrcamentoConsultasMiddleware)
     
     def get_queryset(self):
         raca_nome = self.request.GET.get('raca')
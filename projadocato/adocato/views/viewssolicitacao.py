@@ -10,33 +10,32 @@ from adocato.services.casousodocumento import CasoUsoDocumento
 from adocato.services.casousogato import CasoUsoGato
 from adocato.services.casousoadotante import CasoUsoAdotante
 from adocato.services.casousocoordenador import CasoUsoCoordenador
-from adocato.views.mixins import PerfilAdotanteMixin, PerfilCoordenadorMixin
+from adocato.views.mixins import PerfilAdotanteMixin, PerfilCoordenadorMixin, PaginacaoCursorMixin
 from adocato.models import Gato, Solicitacao, Avaliacao, Documento
 from adocato.forms import AvaliacaoSolicitacaoForm, RecursoForm, DocumentoForm
 
 
-class GatosDisponiveisView(ListView):
+class GatosDisponiveisView(PaginacaoCursorMixin, ListView):
     """View para listar gatos disponíveis para adoção."""
     
     template_name = 'adocato/solicitacao/gatos_disponiveis.html'
     context_object_name = 'gatos'
     paginate_by = 6  # 6 gatos por página em formato de cards
+    contagem_aproximada = True
+    orcamento_consultas = 6  # Máximo de consultas por requisição (OrcamentoConsultasMiddleware)
+    # Campos exibidos nos cards: as demais colunas do gato não são carregadas
+    campos_card = ['nome', 'sexo', 'cor', 'dataNascimento', 'descricao', 'foto', 'raca__nome']
     
     def get_queryset(self):
-        """Retorna apenas gatos disponíveis."""
-        return CasoUsoGato.buscar_gatos_disponiveis()
+        """Retorna apenas gatos disponíveis, já filtrados pela busca para que a paginação considere o filtro."""
+        busca = self.request.GET.get('busca', '')
+        return CasoUsoGato.buscar_gatos_disponiveis(nome=busca).select_related('raca').only(*self.campos_card)
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        
-        # Buscar parâmetros de filtro
-        busca = self.request.GET.get('busca', '')
-        if busca:
-            context['busca'] = busca
-            # Filtrar por busca se fornecida
-            gatos = self.get_queryset().filter(nome__icontains=busca)
-            context['object_list'] = gatos
-        
+        context['busca'] = self.request.GET.get('busca', '')
+        contagem = context.get('contagem_aproximada')
+        context['total_gatos'] = contagem['total'] if contagem else len(context['gatos'])
         return context
 
 
@@ -77,26 +76,12 @@ class IniciarSolicitacaoView(LoginRequiredMixin, PerfilAdotanteMixin, View):
     
     def post(self, request, gato_id):
         try:
-            # Verificar se o gato existe e está disponível via serviço de gatos
-            gatos_disponiveis = CasoUsoGato.buscar_gatos_disponiveis()
-            gato = None
-            for g in gatos_disponiveis:
-                if g.id == gato_id:
-                    gato = g
-                    break
-            
-            if not gato:
-                GerenciadorMensagens.processar_erros_validacao(
-                    request, 
-                    ValidationError("Gato não encontrado ou não disponível.")
-                )
-                return redirect('adocato:gatos_disponiveis')
-            
-            # Criar solicitação via serviço
-            solicitacao = CasoUsoSolicitacao.criar_solicitacao(
+            # Reserva o gato (uma consulta com bloqueio da linha) e cria a solicitação via serviço
+            solicitacao = CasoUsoSolicitacao.iniciar_solicitacao(
                 adotante_id=request.user.id,
                 gato_id=gato_id
             )
+            gato = solicitacao.gato
             
             GerenciadorMensagens.processar_mensagem(
                 request, 
@@ -107,6 +92,8 @@ class IniciarSolicitacaoView(LoginRequiredMixin, PerfilAdotanteMixin, View):
             
         except ValidationError as e:
             GerenciadorMensagens.processar_erros_validacao(request, e)
+            if getattr(e, 'code', None) == 'gato_indisponivel':
+                return redirect('adocato:gatos_disponiveis')
             return redirect('adocato:gato_detalhes', gato_id=gato_id)
         except Exception as e:
             GerenciadorMensagens.processar_erros_validacao(request, ValidationError(str(e)))
@@ -369,12 +356,13 @@ class EditarSolicitacaoView(LoginRequiredMixin, PerfilAdotanteMixin, View):
             return redirect('adocato:editar_solicitacao', solicitacao_id=solicitacao.id)
 
 
-class MinhasSolicitacoesView(LoginRequiredMixin, PerfilAdotanteMixin, ListView):
+class MinhasSolicitacoesView(LoginRequiredMixin, PerfilAdotanteMixin, PaginacaoCursorMixin, ListView):
     """View para listar solicitações do adotante."""
     
     template_name = 'adocato/solicitacao/minhas_solicitacoes.html'
     context_object_name = 'solicitacoes'
     paginate_by = 10
+    orcamento_consultas = 6
     
     def get_queryset(self):
         return CasoUsoSolicitacao.buscar_solicitacoes_adotante_com_relacionamentos(
@@ -447,12 +435,14 @@ class ImpetrarRecursoView(LoginRequiredMixin, PerfilAdotanteMixin, View):
             return redirect('adocato:minhas_solicitacoes')
 
 
-class SolicitacoesPendentesView(LoginRequiredMixin, PerfilCoordenadorMixin, ListView):
+class SolicitacoesPendentesView(LoginRequiredMixin, PerfilCoordenadorMixin, PaginacaoCursorMixin, ListView):
     """View para coordenadores visualizarem solicitações pendentes."""
     
     template_name = 'adocato/solicitacao/pendentes.html'
     context_object_name = 'solicitacoes'
     paginate_by = 10
+    contagem_aproximada = True
+    orcamento_consultas = 8
     
     def get_queryset(self):
         # Buscar parâmetros de filtro
@@ -474,8 +464,8 @@ class SolicitacoesPendentesView(LoginRequiredMixin, PerfilCoordenadorMixin, List
         context['status_filtro'] = self.request.GET.get('status', 'Pendente')
         context['busca'] = self.request.GET.get('busca', '')
         
-        # Contar solicitações por status
-        estatisticas=CasoUsoSolicitacao.estatisticas_solicitacoes()
+        # Contar solicitações por status (retrato em cache para não agregar a tabela a cada acesso)
+        estatisticas=CasoUsoSolicitacao.get_estatisticas_em_cache()
         context['total_pendentes'] = estatisticas['em_analise']
         context['total_atrasadas'] = estatisticas['atrasadas']
 
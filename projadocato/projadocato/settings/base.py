@@ -31,6 +31,11 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",   
 ]
 
+# Orçamento de consultas e detector de N+1 (opt-in): ORCAMENTO_CONSULTAS=1 no ambiente (comum.orcamento_consultas).
+# A sessão e o usuário são carregados sob demanda pela view, então suas consultas também são contadas.
+if os.environ.get('ORCAMENTO_CONSULTAS') == '1':
+    MIDDLEWARE.append("comum.orcamento_consultas.OrcamentoConsultasMiddleware")
+
 ROOT_URLCONF = "projadocato.urls"
 
 TEMPLATES = [
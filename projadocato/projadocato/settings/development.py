@@ -28,6 +28,12 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        # BEGIN IMMEDIATE: transações que escrevem esperam a vez (até o timeout) em vez de falhar
+        # com "database is locked" ao tentar promover uma leitura a escrita
+        "OPTIONS": {"transaction_mode": "IMMEDIATE", "timeout": 20},
+        # Banco de testes em arquivo: o padrão em memória não aceita várias conexões, e os testes
+        # de concorrência (TransactionTestCase com threads) seriam ignorados
+        "TEST": {"NAME": BASE_DIR / "test_db.sqlite3"},
     }
 }
 
@@ -5,5 +5,25 @@ from .models import Participante, Leilao, ItemLeilao, Lance
 
 admin.site.register(Participante)
 admin.site.register(Leilao)
-admin.site.register(ItemLeilao)
-admin.site.register(Lance)
\ No newline at end of file
+
+@admin.register(ItemLeilao)
+class ItemLeilaoAdmin(admin.ModelAdmin):
+    """O resumo dos lances é mantido por LeilaoService.dar_lance (e corrigido por reconciliar_lances): só leitura."""
+    list_display = ['titulo', 'leilao', 'lanceMinimo', 'maiorLance', 'totalLances', 'participanteLider', 'arrematado']
+    list_select_related = ['participanteLider']
+    readonly_fields = ['maiorLance', 'totalLances', 'participanteLider']
+
+@admin.register(Lance)
+class LanceAdmin(admin.ModelAdmin):
+    """Somente leitura: lances são registrados por LeilaoService.dar_lance e nunca alterados."""
+    list_display = ['itemLeilao', 'seq', 'participante', 'valorLance', 'momento']
+    list_select_related = ['itemLeilao', 'participante']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
\ No newline at end of file
@@ -0,0 +1,148 @@
+"""
+Central de eventos de lances, usada pelo fluxo SSE (server-sent events) das páginas de leilão.
+
+Cada lance gravado por LeilaoService.dar_lance é publicado (após o commit) para quem acompanha o item
+ou o leilão, em vez de a página ser recarregada periodicamente.
+
+- Dentro de um processo, a CentralLances guarda uma fila asyncio por assinante e entrega cada
+  evento no loop do assinante (a publicação vem das threads das views síncronas).
+- Com vários processos (workers do servidor ASGI), defina LEILAO_EVENTOS_REDIS_URL: os eventos
+  passam a ser publicados num canal Redis, que cada processo escuta e repassa aos seus assinantes.
+  Requer o pacote `redis` (pip install redis).
+
+Um assinante lento não atrasa os demais: quando sua fila enche, os eventos mais antigos são
+descartados (o cliente pode recuperá-los reconectando com Last-Event-ID).
+"""
+import asyncio
+import json
+import logging
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+logger = logging.getLogger(__name__)
+
+CANAL_REDIS = 'leilao:lances'
+TAMANHO_FILA = 100
+
+
+class CentralLances:
+    def __init__(self):
+        self._assinantes = defaultdict(set)  # ('item' | 'leilao', id) -> {Assinatura}
+        self._trava = threading.Lock()
+        self._redis = None
+        self._escuta_redis = None
+
+    def publicar(self, evento):
+        """Publica um evento de lance (dicionário com ao menos 'item' e 'leilao'). Pode ser chamada de qualquer thread."""
+        url = getattr(settings, 'LEILAO_EVENTOS_REDIS_URL', None)
+        if url:
+            # A entrega local é feita pela escuta do canal, como nos demais processos
+            self._cliente_redis(url).publish(CANAL_REDIS, json.dumps(evento))
+        else:
+            self.entregar(evento)
+
+    def entregar(self, evento):
+        """Repassa o evento aos assinantes deste processo."""
+        with self._trava:
+            destinos = self._assinantes.get(('item', evento['item']), set()) | \
+                self._assinantes.get(('leilao', evento['leilao']), set())
+        for assinatura in destinos:
+            try:
+                assinatura.loop.call_soon_threadsafe(assinatura.enfileirar, evento)
+            except RuntimeError:
+                pass  # Loop já encerrado; a assinatura é removida quando o fluxo termina
+
+    def assinar(self, tipo, identificador):
+        """
+        Assinatura dos eventos de um item ('item') ou de um leilão ('leilao'), para uso com
+        `async with`: o registro vale enquanto o bloco estiver aberto, no loop que o abriu.
+        """
+        return Assinatura(self, (tipo, identificador))
+
+    @property
+    def total_assinantes(self):
+        with self._trava:
+            return sum(len(inscricoes) for inscricoes in self._assinantes.values())
+
+    def _registrar(self, assinatura):
+        with self._trava:
+            self._assinantes[assinatura.chave].add(assinatura)
+        self._iniciar_escuta_redis()
+
+    def _remover(self, assinatura):
+        with self._trava:
+            self._assinantes[assinatura.chave].discard(assinatura)
+            if not self._assinantes[assinatura.chave]:
+                del self._assinantes[assinatura.chave]
+
+    def _cliente_redis(self, url):
+        if self._redis is None:
+            self._redis = _importar_redis().Redis.from_url(url)
+        return self._redis
+
+    def _iniciar_escuta_redis(self):
+        # Uma escuta por processo, iniciada com a primeira assinatura e mantida enquanto o loop existir
+        url = getattr(settings, 'LEILAO_EVENTOS_REDIS_URL', None)
+        if url and (self._escuta_redis is None or self._escuta_redis.done()):
+            self._escuta_redis = asyncio.get_running_loop().create_task(self._escutar_redis(url))
+
+    async def _escutar_redis(self, url):
+        """Repassa aos assinantes locais os eventos publicados no canal por qualquer processo."""
+        cliente = _importar_redis().asyncio.Redis.from_url(url)
+        try:
+            async with cliente.pubsub() as pubsub:
+                await pubsub.subscribe(CANAL_REDIS)
+                while True:
+                    mensagem = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                    if mensagem:
+                        self.entregar(json.loads(mensagem['data']))
+        except Exception:
+            # A próxima assinatura tenta de novo; os clientes recuperam o que perderam pelo Last-Event-ID
+            logger.exception("Escuta do canal Redis de lances interrompida")
+        finally:
+            await cliente.aclose()
+
+
+class Assinatura:
+    def __init__(self, central, chave):
+        self.central = central
+        self.chave = chave
+        self.loop = None
+        self.fila = None
+
+    async def __aenter__(self):
+        self.loop = asyncio.get_running_loop()
+        self.fila = asyncio.Queue(getattr(settings, 'LEILAO_EVENTOS_FILA', TAMANHO_FILA))
+        self.central._registrar(self)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.central._remover(self)
+
+    async def proximo(self, espera=None):
+        """Próximo evento, ou None se nenhum chegar em `espera` segundos."""
+        try:
+            return await asyncio.wait_for(self.fila.get(), espera)
+        except asyncio.TimeoutError:
+            return None
+
+    def enfileirar(self, evento):
+        """Executada no loop da assinatura. Com a fila cheia, descarta o evento mais antigo."""
+        if self.fila.full():
+            self.fila.get_nowait()
+        self.fila.put_nowait(evento)
+
+
+def _importar_redis():
+    try:
+        import redis
+        import redis.asyncio  # noqa: F401
+    except ImportError:
+        raise ImproperlyConfigured("LEILAO_EVENTOS_REDIS_URL requer o pacote redis (pip install redis).")
+    return redis
+
+
+central_lances = CentralLances()
@@ -0,0 +1,92 @@
+import math
+import random
+import statistics
+import time
+from datetime import date, time as hora
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from leilao.models import Leilao, ItemLeilao, Participante
+from leilao.services import LeilaoService, ITENS_POR_PAGINA
+
+TAMANHO_LOTE = 1000
+
+
+class _Rollback(Exception):
+    """Usada para desfazer os dados de teste ao final do benchmark."""
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara idas ao banco e latência da listagem de itens de um leilão: o caminho antigo "
+        "(Leilao.objects.get + itensLeilao + item.lances.count por linha) e o atual (uma consulta paginada). "
+        "Os dados são gerados dentro de uma transação desfeita ao final."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--itens', type=int, default=500, help="Itens no leilão (padrão: 500).")
+        parser.add_argument('--lances', type=int, default=20000, help="Lances distribuídos entre os itens (padrão: 20000).")
+        parser.add_argument('--repeticoes', type=int, default=20, help="Execuções por caminho (padrão: 20).")
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                leilao = self._popular(options['itens'], options['lances'])
+                self._comparar(leilao.id, options['repeticoes'])
+                raise _Rollback()
+        except _Rollback:
+            pass
+
+    def _popular(self, total_itens, total_lances):
+        self.stdout.write(f"Gerando 1 leilão com {total_itens} itens e {total_lances} lances...")
+        aleatorio = random.Random(42)
+        leilao = Leilao.objects.create(
+            dataInicio=date.today(), dataTermino=date.today(), horaInicio=hora(0), horaTermino=hora(23, 59)
+        )
+        participantes = Participante.objects.bulk_create([
+            Participante(nome=f"Participante {i}", email=f"benchmark_{i}@leilao.test") for i in range(100)
+        ])
+        itens = ItemLeilao.objects.bulk_create([
+            ItemLeilao(titulo=f"Item {i:05d}", descricao="Item de teste", lanceMinimo=10, leilao=leilao)
+            for i in range(total_itens)
+        ], batch_size=TAMANHO_LOTE)
+        # A importação em lote numera os lances (seq) e preenche o resumo dos itens
+        LeilaoService.importar_lances(
+            {'item': aleatorio.choice(itens).id, 'participante': aleatorio.choice(participantes).id,
+             'valor': aleatorio.randint(10, 10000)}
+            for _ in range(total_lances)
+        )
+        return leilao
+
+    @staticmethod
+    def _caminho_antigo(leilao_id, titulo):
+        itens = Leilao.objects.get(id=leilao_id).itensLeilao.all()
+        if titulo:
+            itens = itens.filter(titulo__icontains=titulo)
+        # O template chamava item.lances.count para cada linha
+        return [(item.titulo, item.lances.count()) for item in itens]
+
+    @staticmethod
+    def _caminho_atual(leilao_id, titulo):
+        itens, _ = LeilaoService.paginar_itensLeilao(leilao_id, titulo)
+        return [(item.titulo, item.totalLances) for item in itens]
+
+    def _comparar(self, leilao_id, repeticoes):
+        self.stdout.write(f"Página atual: {ITENS_POR_PAGINA} itens; o caminho antigo listava todos.")
+        self.stdout.write(f"{'Caminho':<10} {'Busca':<10} {'Consultas':>9} {'Média (ms)':>11} {'p95 (ms)':>9}")
+        for titulo in ['', '0042']:
+            for nome, caminho in [('antigo', self._caminho_antigo), ('atual', self._caminho_atual)]:
+                consultas = []
+                with connection.execute_wrapper(lambda execute, *args: consultas.append(1) or execute(*args)):
+                    caminho(leilao_id, titulo)
+                tempos = []
+                for _ in range(repeticoes):
+                    inicio = time.perf_counter()
+                    caminho(leilao_id, titulo)
+                    tempos.append((time.perf_counter() - inicio) * 1000)
+                tempos.sort()
+                p95 = tempos[math.ceil(len(tempos) * 0.95) - 1]
+                self.stdout.write(
+                    f"{nome:<10} {titulo or '-':<10} {len(consultas):>9} {statistics.mean(tempos):>11.2f} {p95:>9.2f}"
+                )
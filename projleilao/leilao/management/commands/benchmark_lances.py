@@ -0,0 +1,131 @@
+import math
+import random
+import statistics
+import time
+from datetime import date, datetime, time as hora, timedelta, timezone as fuso
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from leilao.models import Leilao, ItemLeilao, Lance, Participante
+from leilao.services import LeilaoService, LANCES_POR_LOTE
+
+
+class _Rollback(Exception):
+    """Usada para desfazer os dados de teste ao final do benchmark."""
+
+
+class Command(BaseCommand):
+    help = (
+        "Reproduz um registro de lances (padrão: um milhão) com LeilaoService.importar_lances, compara com a "
+        "gravação lance a lance, percorre o registro na ordem (item, seq) conferindo o resumo dos itens e mede a "
+        "busca do líder pelo índice (itemLeilao, -valorLance, seq). Os dados são desfeitos ao final."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lances', type=int, default=1000000, help="Lances no registro (padrão: 1000000).")
+        parser.add_argument('--itens', type=int, default=1000, help="Itens disputados (padrão: 1000).")
+        parser.add_argument('--lote', type=int, default=LANCES_POR_LOTE, help=f"Lances por lote (padrão: {LANCES_POR_LOTE}).")
+        parser.add_argument('--amostra', type=int, default=5000, help="Lances gravados um a um, para comparação (padrão: 5000).")
+        parser.add_argument('--repeticoes', type=int, default=200, help="Buscas do líder medidas (padrão: 200).")
+
+    def handle(self, *args, **options):
+        falhas = []
+        try:
+            with transaction.atomic():
+                itens, participantes = self._popular(options['itens'])
+                self._importar(itens, participantes, options['lances'], options['lote'], options['amostra'])
+                falhas = self._reproduzir()
+                self._medir_lider(itens, options['repeticoes'])
+                raise _Rollback()
+        except _Rollback:
+            pass
+        if falhas:
+            raise CommandError(f"{len(falhas)} item(ns) com resumo diferente do registro: {', '.join(falhas[:10])}")
+        self.stdout.write(self.style.SUCCESS("Resumo dos itens confere com o registro de lances."))
+
+    def _popular(self, total_itens):
+        leilao = Leilao.objects.create(
+            dataInicio=date.today(), dataTermino=date.today(), horaInicio=hora(0), horaTermino=hora(23, 59)
+        )
+        participantes = Participante.objects.bulk_create([
+            Participante(nome=f"Participante {i}", email=f"benchmark_lances_{i}@leilao.test") for i in range(100)
+        ])
+        # Um item a mais recebe a amostra gravada lance a lance
+        itens = ItemLeilao.objects.bulk_create([
+            ItemLeilao(titulo=f"Item {i:05d}", descricao="Item de teste", lanceMinimo=10, leilao=leilao)
+            for i in range(total_itens + 1)
+        ])
+        return itens, participantes
+
+    @staticmethod
+    def _registro(itens, participantes, total):
+        """Registro de lances crescentes por item, um por milissegundo, como viria de um log."""
+        aleatorio = random.Random(42)
+        maiores = {item.id: 10 for item in itens}
+        inicio = datetime.now(fuso.utc)
+        for i in range(total):
+            item_id = aleatorio.choice(itens).id
+            maiores[item_id] += aleatorio.randint(1, 50)
+            yield {
+                'item': item_id,
+                'participante': aleatorio.choice(participantes).id,
+                'valor': maiores[item_id],
+                'momento': inicio + timedelta(milliseconds=i),
+            }
+
+    def _importar(self, itens, participantes, total, lote, amostra):
+        item_amostra, itens = itens[-1], itens[:-1]
+        self.stdout.write(f"Importando {total} lances em {len(itens)} itens (lotes de {lote})...")
+        inicio = time.perf_counter()
+        gravados = LeilaoService.importar_lances(self._registro(itens, participantes, total), lote)
+        duracao = time.perf_counter() - inicio
+        self.stdout.write(f"{'Em lote':<14} {gravados:>9} lances em {duracao:>8.2f} s ({gravados / duracao:>9.0f}/s)")
+
+        inicio = time.perf_counter()
+        for seq, registro in enumerate(self._registro([item_amostra], participantes, amostra), start=1):
+            Lance.objects.create(
+                itemLeilao_id=registro['item'], participante_id=registro['participante'],
+                valorLance=registro['valor'], momento=registro['momento'], seq=seq,
+            )
+        duracao = time.perf_counter() - inicio
+        self.stdout.write(
+            f"{'Um a um':<14} {amostra:>9} lances em {duracao:>8.2f} s ({amostra / duracao:>9.0f}/s); "
+            f"{total} levariam cerca de {total / amostra * duracao:.0f} s"
+        )
+        LeilaoService.recalcular_resumo_lances(ItemLeilao.objects.filter(id=item_amostra.id))
+
+    def _reproduzir(self):
+        """Percorre o registro na ordem (item, seq), recalcula maior lance e líder e compara com o resumo gravado."""
+        inicio = time.perf_counter()
+        estado = {}
+        lances = (
+            Lance.objects.order_by('itemLeilao', 'seq')
+            .values_list('itemLeilao', 'valorLance', 'participante')
+            .iterator(chunk_size=10000)
+        )
+        total = 0
+        for item_id, valor, participante_id in lances:
+            total += 1
+            quantidade, maior, lider = estado.get(item_id, (0, None, None))
+            if maior is None or valor > maior:
+                maior, lider = valor, participante_id
+            estado[item_id] = (quantidade + 1, maior, lider)
+        duracao = time.perf_counter() - inicio
+        self.stdout.write(f"{'Reprodução':<14} {total:>9} lances em {duracao:>8.2f} s ({total / duracao:>9.0f}/s)")
+
+        gravados = ItemLeilao.objects.filter(id__in=estado).values_list('id', 'totalLances', 'maiorLance', 'participanteLider')
+        return [str(item_id) for item_id, *resumo in gravados if tuple(resumo) != estado[item_id]]
+
+    def _medir_lider(self, itens, repeticoes):
+        aleatorio = random.Random(7)
+        tempos = []
+        for _ in range(repeticoes):
+            item = aleatorio.choice(itens)
+            inicio = time.perf_counter()
+            Lance.objects.filter(itemLeilao=item).order_by('-valorLance', 'seq').values_list('participante', flat=True).first()
+            tempos.append((time.perf_counter() - inicio) * 1000)
+        tempos.sort()
+        p95 = tempos[math.ceil(len(tempos) * 0.95) - 1]
+        self.stdout.write(f"Líder de um item pelo índice: média {statistics.mean(tempos):.3f} ms, p95 {p95:.3f} ms")
+        self.stdout.write(Lance.objects.filter(itemLeilao=itens[0]).order_by('-valorLance', 'seq')[:1].explain())
@@ -0,0 +1,45 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from leilao.services import LeilaoService, LEILOES_POR_ENCERRAMENTO
+
+
+class Command(BaseCommand):
+    help = (
+        "Encerra os leilões vencidos: marca como arrematados os itens com lances (o vencedor é o participante "
+        "líder) e o leilão como encerrado, em UPDATEs por lote. Pode ser agendado (cron) ou ficar em execução "
+        "com --continuo; várias instâncias simultâneas não encerram o mesmo leilão duas vezes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--lote', type=int, default=LEILOES_POR_ENCERRAMENTO,
+            help=f"Leilões encerrados por transação (padrão: {LEILOES_POR_ENCERRAMENTO})."
+        )
+        parser.add_argument('--continuo', action='store_true', help="Continua verificando até ser interrompido.")
+        parser.add_argument('--intervalo', type=int, default=30, help="Segundos entre verificações com --continuo (padrão: 30).")
+
+    def handle(self, *args, **options):
+        while True:
+            self._encerrar_vencidos(options['lote'])
+            if not options['continuo']:
+                break
+            time.sleep(options['intervalo'])
+
+    def _encerrar_vencidos(self, lote):
+        total_leiloes = total_itens = 0
+        inicio = time.perf_counter()
+        while True:
+            leiloes, itens = LeilaoService.encerrar_leiloes(lote=lote)
+            if not leiloes:
+                break
+            total_leiloes += leiloes
+            total_itens += itens
+        if total_leiloes:
+            self.stdout.write(
+                f"{total_leiloes} leilão(ões) encerrado(s), {total_itens} item(ns) arrematado(s) "
+                f"em {(time.perf_counter() - inicio) * 1000:.0f} ms."
+            )
+        else:
+            self.stdout.write("Nenhum leilão a encerrar.")
@@ -0,0 +1,70 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from leilao.models import ItemLeilao
+from leilao.services import LeilaoService
+
+TAMANHO_LOTE = 1000
+CAMPOS = ['totalLances', 'maiorLance', 'participanteLider']
+
+
+class Command(BaseCommand):
+    help = (
+        "Confere o resumo dos lances gravado nos itens (totalLances, maiorLance, participanteLider) "
+        "com o recalculado a partir da tabela de lances, informa as divergências e regrava os itens "
+        "divergentes com UPDATEs em lote."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--leilao', type=int, help="Confere apenas os itens deste leilão.")
+        parser.add_argument(
+            '--verificar', action='store_true',
+            help="Apenas informa as divergências, sem corrigir (termina com erro se houver alguma)."
+        )
+        parser.add_argument('--exemplos', type=int, default=10, help="Divergências detalhadas na saída (padrão: 10).")
+
+    def handle(self, *args, **options):
+        itens = ItemLeilao.objects.all()
+        if options['leilao'] is not None:
+            itens = itens.filter(leilao_id=options['leilao'])
+
+        total, divergentes = self._divergencias(itens, options['exemplos'])
+        self.stdout.write(f"{total} itens conferidos, {len(divergentes)} com resumo divergente.")
+        if not divergentes:
+            self.stdout.write(self.style.SUCCESS("Resumo dos lances consistente."))
+            return
+        if options['verificar']:
+            raise CommandError(f"{len(divergentes)} item(ns) com resumo dos lances divergente.")
+
+        corrigidos = 0
+        for inicio in range(0, len(divergentes), TAMANHO_LOTE):
+            with transaction.atomic():
+                corrigidos += LeilaoService.recalcular_resumo_lances(
+                    ItemLeilao.objects.filter(id__in=divergentes[inicio:inicio + TAMANHO_LOTE])
+                )
+        self.stdout.write(self.style.SUCCESS(f"{corrigidos} item(ns) corrigido(s)."))
+
+    def _divergencias(self, itens, exemplos):
+        """Compara, numa única consulta percorrida em lotes, os campos gravados com os recalculados."""
+        calculados = {f'{campo}_calculado': expressao for campo, expressao in LeilaoService.resumo_lances().items()}
+        linhas = (
+            itens.annotate(**calculados).order_by('id')
+            .values_list('id', *CAMPOS, *calculados)
+            .iterator(chunk_size=TAMANHO_LOTE)
+        )
+        total = 0
+        divergentes = []
+        for item_id, *valores in linhas:
+            total += 1
+            gravados, recalculados = valores[:len(CAMPOS)], valores[len(CAMPOS):]
+            if gravados == recalculados:
+                continue
+            divergentes.append(item_id)
+            if len(divergentes) <= exemplos:
+                diferencas = ', '.join(
+                    f'{campo}: {gravado} -> {recalculado}'
+                    for campo, gravado, recalculado in zip(CAMPOS, gravados, recalculados)
+                    if gravado != recalculado
+                )
+                self.stdout.write(self.style.WARNING(f"Item {item_id}: {diferencas}"))
+        return total, divergentes
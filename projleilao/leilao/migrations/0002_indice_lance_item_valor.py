@@ -0,0 +1,19 @@
+# Generated by Django 5.2 on 2026-10-18 14:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("leilao", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="lance",
+            index=models.Index(
+                fields=["itemLeilao", "-valorLance"], name="lance_item_valor_idx"
+            ),
+        ),
+    ]
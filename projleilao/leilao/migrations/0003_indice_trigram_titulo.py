@@ -0,0 +1,32 @@
+from django.db import migrations
+
+
+def criar_indice_titulo(apps, schema_editor):
+    """
+    Índice GIN trigram para a busca de itens por título (apenas PostgreSQL).
+    O __icontains do Django gera UPPER("titulo"::text) LIKE UPPER(%s), por isso o índice é sobre a mesma expressão.
+    """
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS "leilao_itemleilao_titulo_trgm_idx" '
+        'ON "leilao_itemleilao" USING gin (UPPER("titulo"::text) gin_trgm_ops)'
+    )
+
+
+def remover_indice_titulo(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS "leilao_itemleilao_titulo_trgm_idx"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("leilao", "0002_indice_lance_item_valor"),
+    ]
+
+    operations = [
+        migrations.RunPython(criar_indice_titulo, remover_indice_titulo),
+    ]
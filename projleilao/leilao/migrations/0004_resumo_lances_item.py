@@ -0,0 +1,59 @@
+# Generated by Django 5.2 on 2026-10-18 14:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Max, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def preencher_resumo_lances(apps, schema_editor):
+    """Preenche os campos de resumo de todos os itens com um único UPDATE."""
+    ItemLeilao = apps.get_model("leilao", "ItemLeilao")
+    Lance = apps.get_model("leilao", "Lance")
+    lances = Lance.objects.filter(itemLeilao=OuterRef("pk")).order_by()
+    ItemLeilao.objects.using(schema_editor.connection.alias).update(
+        totalLances=Coalesce(
+            Subquery(lances.values("itemLeilao").annotate(n=Count("id")).values("n")),
+            Value(0),
+        ),
+        maiorLance=Subquery(
+            lances.values("itemLeilao").annotate(m=Max("valorLance")).values("m")
+        ),
+        participanteLider=Subquery(
+            lances.order_by("-valorLance", "id").values("participante")[:1]
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("leilao", "0003_indice_trigram_titulo"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="itemleilao",
+            name="maiorLance",
+            field=models.DecimalField(
+                blank=True, decimal_places=2, max_digits=10, null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="itemleilao",
+            name="participanteLider",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="itensLiderados",
+                to="leilao.participante",
+            ),
+        ),
+        migrations.AddField(
+            model_name="itemleilao",
+            name="totalLances",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(preencher_resumo_lances, migrations.RunPython.noop),
+    ]
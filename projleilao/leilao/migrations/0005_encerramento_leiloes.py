@@ -0,0 +1,59 @@
+# Generated by Django 5.2 on 2026-10-18 15:02
+
+from datetime import datetime
+
+from django.db import migrations, models
+from django.utils import timezone
+
+TAMANHO_LOTE = 1000
+
+
+def preencher_termino(apps, schema_editor):
+    """Preenche termino dos leilões existentes, em lotes percorridos pela chave primária."""
+    Leilao = apps.get_model("leilao", "Leilao")
+    leiloes = Leilao.objects.using(schema_editor.connection.alias)
+    fuso = timezone.get_current_timezone()
+    ultimo_id = 0
+    while True:
+        lote = list(
+            leiloes.filter(id__gt=ultimo_id)
+            .order_by("id")
+            .only("id", "dataTermino", "horaTermino")[:TAMANHO_LOTE]
+        )
+        if not lote:
+            break
+        for leilao in lote:
+            leilao.termino = datetime.combine(
+                leilao.dataTermino, leilao.horaTermino, tzinfo=fuso
+            )
+        leiloes.bulk_update(lote, ["termino"])
+        ultimo_id = lote[-1].id
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("leilao", "0004_resumo_lances_item"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="leilao",
+            name="encerrado",
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.AddField(
+            model_name="leilao",
+            name="termino",
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(preencher_termino, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="leilao",
+            index=models.Index(
+                condition=models.Q(("encerrado", False)),
+                fields=["termino"],
+                name="leilao_a_encerrar_idx",
+            ),
+        ),
+    ]
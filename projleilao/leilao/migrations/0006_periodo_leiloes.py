@@ -0,0 +1,69 @@
+from datetime import datetime
+
+from django.db import migrations, models, transaction
+from django.utils import timezone
+
+TAMANHO_LOTE = 1000
+
+
+def preencher_periodo(apps, schema_editor):
+    """
+    Preenche inicio (e termino, se faltar) dos leilões existentes, em lotes percorridos pela
+    chave primária. Cada lote é gravado na sua própria transação, para não bloquear a tabela
+    durante todo o preenchimento.
+    """
+    Leilao = apps.get_model("leilao", "Leilao")
+    alias = schema_editor.connection.alias
+    pendentes = Leilao.objects.using(alias).filter(
+        models.Q(inicio__isnull=True) | models.Q(termino__isnull=True)
+    )
+    fuso = timezone.get_current_timezone()
+    ultimo_id = 0
+    while True:
+        with transaction.atomic(using=alias):
+            lote = list(
+                pendentes.filter(id__gt=ultimo_id).order_by("id")[:TAMANHO_LOTE]
+            )
+            if not lote:
+                break
+            for leilao in lote:
+                leilao.inicio = datetime.combine(
+                    leilao.dataInicio, leilao.horaInicio, tzinfo=fuso
+                )
+                leilao.termino = datetime.combine(
+                    leilao.dataTermino, leilao.horaTermino, tzinfo=fuso
+                )
+            Leilao.objects.using(alias).bulk_update(lote, ["inicio", "termino"])
+        ultimo_id = lote[-1].id
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ("leilao", "0005_encerramento_leiloes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="leilao",
+            name="inicio",
+            field=models.DateTimeField(editable=False, null=True),
+        ),
+        migrations.RunPython(preencher_periodo, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="leilao",
+            name="inicio",
+            field=models.DateTimeField(editable=False),
+        ),
+        migrations.AlterField(
+            model_name="leilao",
+            name="termino",
+            field=models.DateTimeField(editable=False),
+        ),
+        migrations.AddIndex(
+            model_name="leilao",
+            index=models.Index(fields=["termino", "inicio"], name="leilao_periodo_idx"),
+        ),
+    ]
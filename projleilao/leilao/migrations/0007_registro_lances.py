@@ -0,0 +1,106 @@
+from datetime import datetime, timedelta
+
+import django.utils.timezone
+from django.db import migrations, models, transaction
+from django.utils import timezone
+
+ITENS_POR_LOTE = 500
+
+
+def preencher_registro(apps, schema_editor):
+    """
+    Numera (seq) os lances de cada item pela ordem de gravação (id) e preenche momento.
+    horaLance não guardava a data: usa-se a data de início do leilão, ou o dia seguinte se a
+    hora for anterior ao início (o melhor que se pode reconstruir). Processa os itens em lotes,
+    cada um na sua própria transação.
+    """
+    ItemLeilao = apps.get_model("leilao", "ItemLeilao")
+    Lance = apps.get_model("leilao", "Lance")
+    alias = schema_editor.connection.alias
+    fuso = timezone.get_current_timezone()
+    ultimo_item = 0
+    while True:
+        with transaction.atomic(using=alias):
+            itens = list(
+                ItemLeilao.objects.using(alias)
+                .filter(id__gt=ultimo_item)
+                .order_by("id")
+                .values_list("id", "leilao__inicio")[:ITENS_POR_LOTE]
+            )
+            if not itens:
+                break
+            inicios = dict(itens)
+            lances = list(
+                Lance.objects.using(alias)
+                .filter(itemLeilao_id__in=inicios)
+                .order_by("itemLeilao_id", "id")
+                .only("id", "itemLeilao_id", "horaLance")
+            )
+            seq = {}
+            for lance in lances:
+                inicio = inicios[lance.itemLeilao_id].astimezone(fuso)
+                momento = datetime.combine(inicio.date(), lance.horaLance, tzinfo=fuso)
+                if momento < inicio:
+                    momento += timedelta(days=1)
+                lance.momento = momento
+                lance.seq = seq[lance.itemLeilao_id] = (
+                    seq.get(lance.itemLeilao_id, 0) + 1
+                )
+            Lance.objects.using(alias).bulk_update(
+                lances, ["momento", "seq"], batch_size=1000
+            )
+        ultimo_item = itens[-1][0]
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ("leilao", "0006_periodo_leiloes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="lance",
+            name="momento",
+            field=models.DateTimeField(null=True),
+        ),
+        migrations.AddField(
+            model_name="lance",
+            name="seq",
+            field=models.PositiveIntegerField(null=True),
+        ),
+        migrations.RunPython(preencher_registro, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name="lance",
+            name="horaLance",
+        ),
+        migrations.AlterField(
+            model_name="lance",
+            name="momento",
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AlterField(
+            model_name="lance",
+            name="seq",
+            field=models.PositiveIntegerField(),
+        ),
+        migrations.RemoveIndex(
+            model_name="lance",
+            name="lance_item_valor_idx",
+        ),
+        migrations.AddIndex(
+            model_name="lance",
+            index=models.Index(
+                fields=["itemLeilao", "-valorLance", "seq"],
+                name="lance_item_valor_seq_idx",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="lance",
+            constraint=models.UniqueConstraint(
+                fields=("itemLeilao", "seq"), name="lance_item_seq_unico"
+            ),
+        ),
+    ]
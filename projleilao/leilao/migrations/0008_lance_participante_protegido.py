@@ -0,0 +1,23 @@
+# Generated by Django 5.2 on 2026-10-18 15:58
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("leilao", "0007_registro_lances"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="lance",
+            name="participante",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="lances",
+                to="leilao.participante",
+            ),
+        ),
+    ]
@@ -1,4 +1,8 @@
+from datetime import datetime
+
+from django.core.exceptions import PermissionDenied
 from django.db import models
+from django.utils import timezone
 
 # Create your models here.
 
@@ -10,14 +14,64 @@ class Participante(models.Model):
     def __str__(self):
         return self.nome
 
+class LeilaoQuerySet(models.QuerySet):
+    """
+    Consultas pela janela do leilão feitas sobre inicio/termino (um campo cada), que o índice
+    (termino, inicio) atende; com data e hora separadas, "em andamento agora" exigiria comparar
+    quatro colunas com OR.
+    """
+
+    def ativos(self, momento=None):
+        """Leilões em andamento no momento informado (padrão: agora)."""
+        momento = momento or timezone.now()
+        return self.filter(encerrado=False, inicio__lte=momento, termino__gte=momento)
+
+    def encerrados(self, momento=None):
+        """Leilões cujo término já passou (inclui os já processados por encerrar_leiloes)."""
+        return self.filter(termino__lt=momento or timezone.now())
+
 class Leilao(models.Model):
     dataInicio=models.DateField()
     dataTermino=models.DateField()
     horaInicio=models.TimeField()
     horaTermino=models.TimeField()
+    # Data e hora de início e de término num único campo cada, preenchidos em save(), para as consultas por período
+    inicio=models.DateTimeField(editable=False)
+    termino=models.DateTimeField(editable=False)
+    encerrado=models.BooleanField(default=False, editable=False)
+
+    objects = LeilaoQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Leilões vencidos ainda não encerrados (LeilaoService.encerrar_leiloes); os encerrados ficam fora do índice
+            models.Index(fields=['termino'], condition=models.Q(encerrado=False), name='leilao_a_encerrar_idx'),
+            # Leilões ativos e encerrados (LeilaoQuerySet), ordenados pelo término
+            models.Index(fields=['termino', 'inicio'], name='leilao_periodo_idx'),
+        ]
 
     def __str__(self):
         return f'{self.id}'
+    def save(self, *args, **kwargs):
+        self.inicio = self.combinar(self.dataInicio, self.horaInicio)
+        self.termino = self.combinar(self.dataTermino, self.horaTermino)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            update_fields = set(update_fields)
+            if update_fields & {'dataInicio', 'horaInicio'}:
+                update_fields.add('inicio')
+            if update_fields & {'dataTermino', 'horaTermino'}:
+                update_fields.add('termino')
+            kwargs['update_fields'] = update_fields
+        super().save(*args, **kwargs)
+    @staticmethod
+    def combinar(data, hora):
+        """Data e hora do leilão (no fuso atual) como um datetime com fuso."""
+        return datetime.combine(data, hora, tzinfo=timezone.get_current_timezone())
+    def em_andamento(self, momento=None):
+        """Indica se o leilão aceita lances no momento informado (padrão: agora)."""
+        momento = momento or timezone.now()
+        return not self.encerrado and self.inicio <= momento <= self.termino
 
 class ItemLeilao(models.Model):
     titulo= models.CharField(max_length=100)
@@ -25,13 +79,58 @@ class ItemLeilao(models.Model):
     lanceMinimo= models.DecimalField(max_digits=10, decimal_places=2)
     arrematado=models.BooleanField(default=False)
     leilao= models.ForeignKey(Leilao, on_delete=models.CASCADE, related_name='itensLeilao')
+    # Resumo dos lances, mantido por LeilaoService.dar_lance (e conferido pelo comando reconciliar_lances).
+    # No encerramento do leilão, o item com lances é marcado como arrematado e participanteLider é o vencedor.
+    maiorLance= models.DecimalField(max_digits=10, decimal_places=2, blank=True, null=True)
+    totalLances= models.PositiveIntegerField(default=0)
+    participanteLider= models.ForeignKey(Participante, on_delete=models.SET_NULL, blank=True, null=True, related_name='itensLiderados')
     def __str__(self):
         return f'Leilão: {self.leilao.id}-{self.titulo}'
 
+class LanceImutavel(PermissionDenied):
+    """Lançada ao tentar alterar ou excluir um lance registrado (uma view que a deixe escapar responde 403)."""
+
+class LanceQuerySet(models.QuerySet):
+    """
+    Lances não são alterados nem excluídos em massa (o registro é apenas inserido). A exclusão em
+    cascata do item não passa por aqui: o Collector apaga os lances pelo _base_manager.
+    """
+
+    def update(self, **kwargs):
+        raise LanceImutavel("O registro de lances não pode ser alterado.")
+
+    def delete(self):
+        raise LanceImutavel("O registro de lances não pode ser excluído.")
+
 class Lance(models.Model):
+    """
+    Registro de lances: cada lance é apenas inserido, nunca alterado nem excluído (save() de um
+    lance existente, delete() e os equivalentes em massa lançam LanceImutavel; o participante com
+    lances não pode ser excluído). Os lances só saem junto com o item: a exclusão do item (ou do
+    leilão) continua apagando seus lances em cascata. seq numera os lances de
+    cada item na ordem em que foram aceitos (1, 2, ...) e desempata lances de mesmo valor.
+    """
     valorLance = models.DecimalField(max_digits=10, decimal_places=2)
-    horaLance=models.TimeField(auto_now_add=True)
-    participante= models.ForeignKey(Participante, on_delete=models.CASCADE, related_name='lances')
+    momento=models.DateTimeField(default=timezone.now)
+    seq=models.PositiveIntegerField()
+    participante= models.ForeignKey(Participante, on_delete=models.PROTECT, related_name='lances')
     itemLeilao= models.ForeignKey(ItemLeilao, on_delete=models.CASCADE, related_name='lances')
+
+    objects = LanceQuerySet.as_manager()
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise LanceImutavel("O registro de lances não pode ser alterado.")
+        super().save(*args, **kwargs)
+    def delete(self, *args, **kwargs):
+        raise LanceImutavel("O registro de lances não pode ser excluído.")
     def __str__(self):
-        return f"Lance de {self.participante.nome} no item {self.itemLeilao.titulo} - R$ {self.valorLance}"
\ No newline at end of file
+        return f"Lance de {self.participante.nome} no item {self.itemLeilao.titulo} - R$ {self.valorLance}"
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['itemLeilao', 'seq'], name='lance_item_seq_unico'),
+        ]
+        indexes = [
+            # Maior lance e líder de cada item (LeilaoService.resumo_lances) lidos direto do índice
+            models.Index(fields=['itemLeilao', '-valorLance', 'seq'], name='lance_item_valor_seq_idx'),
+        ]
\ No newline at end of file
@@ -1,12 +1,241 @@
-from .models import Leilao,ItemLeilao
+from datetime import timedelta
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.db import connection, transaction
+from django.db.models import Count, F, Max, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from .eventos import central_lances
+from .models import Leilao,ItemLeilao,Lance,Participante
+
+ITENS_POR_PAGINA = 50
+LEILOES_POR_PAGINA = 50
+EVENTOS_REENVIADOS = 100
+LEILOES_POR_ENCERRAMENTO = 500
+LANCES_POR_LOTE = 5000
+# Um lance validado pouco antes do término ainda pode estar sendo gravado: o encerramento espera esse intervalo
+TOLERANCIA_ENCERRAMENTO = timedelta(seconds=5)
+
 class LeilaoService:
     @staticmethod
-    def listar_leiloes():
-        return Leilao.objects.all()
+    def listar_leiloes(situacao=None,pagina=1,por_pagina=LEILOES_POR_PAGINA):
+        """
+        Retorna (leilões da página, há próxima página), com uma única consulta atendida pelo índice de período.
+        situacao: 'ativos' (os que terminam primeiro vêm antes), 'encerrados' ou None para todos
+        (os que terminaram por último vêm antes).
+        """
+        if situacao=='ativos':
+            leiloes=Leilao.objects.ativos().order_by('termino','id')
+        elif situacao=='encerrados':
+            leiloes=Leilao.objects.encerrados().order_by('-termino','-inicio','-id')
+        else:
+            leiloes=Leilao.objects.order_by('-termino','-inicio','-id')
+        inicio=(pagina-1)*por_pagina
+        leiloes=list(leiloes[inicio:inicio+por_pagina+1])
+        return leiloes[:por_pagina],len(leiloes)>por_pagina
+    @staticmethod
+    def resumo_lances():
+        """
+        Expressões que recalculam, a partir da tabela de lances, os campos de resumo do item
+        (totalLances, maiorLance e participanteLider; em caso de empate, lidera o lance de menor seq).
+        Servem para update() ou, com outros nomes, para annotate().
+        """
+        lances=Lance.objects.filter(itemLeilao=OuterRef('pk')).order_by()
+        return {
+            'totalLances':Coalesce(Subquery(lances.values('itemLeilao').annotate(n=Count('id')).values('n')),0),
+            'maiorLance':Subquery(lances.values('itemLeilao').annotate(m=Max('valorLance')).values('m')),
+            'participanteLider':Subquery(lances.order_by('-valorLance','seq').values('participante')[:1]),
+        }
+    @staticmethod
+    def recalcular_resumo_lances(itens=None):
+        """Regrava o resumo dos lances dos itens (todos, se omitidos) com um único UPDATE. Retorna o total de itens."""
+        itens=ItemLeilao.objects.all() if itens is None else itens
+        return itens.update(**LeilaoService.resumo_lances())
     @staticmethod
     def listar_itensLeilao(leilao_id,titulo=None):
+        """Itens do leilão (com o resumo dos lances e o líder), filtrados pelo título. Não consulta o Leilao."""
+        itensLeilao=ItemLeilao.objects.filter(leilao_id=leilao_id)
         if titulo:
-            leilao=Leilao.objects.get(id=leilao_id)
-            #itensLeilao=ItemLeilao.objects.filter(leilao__id=leilao_id,titulo__icontains=titulo)
-            return leilao.itensLeilao.filter(titulo__icontains=titulo)
-        return Leilao.objects.get(id=leilao_id).itensLeilao.all()
\ No newline at end of file
+            # No PostgreSQL o icontains usa o índice trigram de titulo (migração 0003)
+            itensLeilao=itensLeilao.filter(titulo__icontains=titulo)
+        return itensLeilao.select_related('participanteLider').order_by('id')
+    @staticmethod
+    def paginar_itensLeilao(leilao_id,titulo=None,pagina=1,por_pagina=ITENS_POR_PAGINA):
+        """
+        Retorna (itens da página, há próxima página) com uma única consulta: busca-se um item além
+        da página para saber se há próxima, sem o COUNT(*) do Paginator.
+        Lança Leilao.DoesNotExist se o leilão não existir (verificado só quando a página vem vazia).
+        """
+        inicio=(pagina-1)*por_pagina
+        itens=list(LeilaoService.listar_itensLeilao(leilao_id,titulo)[inicio:inicio+por_pagina+1])
+        if not itens and not Leilao.objects.filter(id=leilao_id).exists():
+            raise Leilao.DoesNotExist(f"Leilão {leilao_id} não encontrado.")
+        return itens[:por_pagina], len(itens)>por_pagina
+
+    @staticmethod
+    def importar_lances(registros,lote=LANCES_POR_LOTE):
+        """
+        Grava lances em lote (bulk_create de `lote` lances por transação), para reproduzir um registro
+        de lances vindo de outra origem. `registros` é um iterável de dicionários com item, participante,
+        valor e momento (opcional), na ordem em que os lances foram aceitos; seq continua a numeração
+        de cada item. Os lances são histórico e não são validados; os itens importados não devem receber
+        lances ao mesmo tempo (a restrição única (item, seq) recusaria a importação).
+        Ao final, o resumo dos itens afetados é recalculado. Retorna o número de lances gravados.
+        """
+        registros=iter(registros)
+        ultimo_seq={}
+        total=0
+        agora=timezone.now()
+        while bloco:=list(islice(registros,lote)):
+            novos={registro['item'] for registro in bloco}-ultimo_seq.keys()
+            if novos:
+                ultimo_seq.update(dict.fromkeys(novos,0))
+                ultimo_seq.update(
+                    Lance.objects.filter(itemLeilao_id__in=novos).order_by()
+                    .values('itemLeilao').annotate(ultimo=Max('seq')).values_list('itemLeilao','ultimo')
+                )
+            lances=[]
+            for registro in bloco:
+                ultimo_seq[registro['item']]+=1
+                lances.append(Lance(
+                    itemLeilao_id=registro['item'],
+                    participante_id=registro['participante'],
+                    valorLance=registro['valor'],
+                    momento=registro.get('momento',agora),
+                    seq=ultimo_seq[registro['item']],
+                ))
+            with transaction.atomic():
+                Lance.objects.bulk_create(lances)
+            total+=len(lances)
+        itens=list(ultimo_seq)
+        for inicio in range(0,len(itens),lote):
+            LeilaoService.recalcular_resumo_lances(ItemLeilao.objects.filter(id__in=itens[inicio:inicio+lote]))
+        return total
+    @staticmethod
+    def encerrar_leiloes(momento=None,lote=LEILOES_POR_ENCERRAMENTO):
+        """
+        Encerra até `lote` leilões vencidos (termino anterior a `momento`, padrão agora, menos a tolerância):
+        os itens com lances passam a arrematados (o vencedor é participanteLider) e o leilão a encerrado.
+        São dois UPDATEs sobre o lote inteiro, sem carregar os itens. Retorna (leilões encerrados, itens arrematados).
+        Pode ser repetido e executado por vários processos ao mesmo tempo: só são alterados itens ainda não
+        arrematados e leilões ainda não encerrados, e no PostgreSQL cada processo pega um lote diferente
+        (SKIP LOCKED).
+        """
+        limite=(momento or timezone.now())-TOLERANCIA_ENCERRAMENTO
+        with transaction.atomic():
+            vencidos=Leilao.objects.filter(encerrado=False,termino__lte=limite).order_by('termino')
+            if connection.features.has_select_for_update_skip_locked:
+                vencidos=vencidos.select_for_update(skip_locked=True)
+            ids=list(vencidos.values_list('id',flat=True)[:lote])
+            if not ids:
+                return 0,0
+            arrematados=ItemLeilao.objects.filter(
+                leilao_id__in=ids,arrematado=False,participanteLider__isnull=False
+            ).update(arrematado=True)
+            encerrados=Leilao.objects.filter(id__in=ids,encerrado=False).update(encerrado=True)
+        return encerrados,arrematados
+    @staticmethod
+    def dar_lance(item_id,participante_id,valor):
+        """
+        Registra um lance. Regras:
+        - o item existe, não foi arrematado e o leilão está em andamento
+        - o valor é de pelo menos lanceMinimo e maior que o maior lance atual
+        As regras são conferidas sem bloqueio, pelo resumo do item (maiorLance). O lance só é gravado
+        se um UPDATE condicional ainda encontrar o item não arrematado e com maiorLance menor que o
+        valor; o UPDATE e a inserção do lance ficam na mesma transação. Um lance que deixou de ser o
+        maior nesse intervalo é recusado com ValidationError.
+        Após o commit, o lance é publicado na central de eventos (leilao.eventos).
+        """
+        valor=LeilaoService._valor_lance(valor)
+        try:
+            item=ItemLeilao.objects.select_related('leilao').get(id=item_id)
+        except ItemLeilao.DoesNotExist:
+            raise ValidationError("Item não encontrado.")
+        if item.arrematado:
+            raise ValidationError("Este item já foi arrematado.")
+        if not item.leilao.em_andamento():
+            raise ValidationError("O leilão deste item não está em andamento.")
+        if valor<item.lanceMinimo:
+            raise ValidationError(f"O lance deve ser de pelo menos R$ {item.lanceMinimo}.")
+        # O maior lance só cresce: um lance que já não o supera é recusado sem escrever no banco
+        LeilaoService._validar_maior_lance(item.maiorLance,valor)
+        try:
+            participante_id=int(participante_id)
+        except (TypeError, ValueError):
+            raise ValidationError("Participante não encontrado.")
+        nome_participante=Participante.objects.filter(id=participante_id).values_list('nome',flat=True).first()
+        if nome_participante is None:
+            raise ValidationError("Participante não encontrado.")
+        with transaction.atomic():
+            supera=Q(maiorLance__isnull=True)|Q(maiorLance__lt=valor)
+            atualizados=ItemLeilao.objects.filter(supera,id=item_id,arrematado=False).update(
+                maiorLance=valor,
+                totalLances=F('totalLances')+1,
+                participanteLider_id=participante_id,
+            )
+            if not atualizados:
+                # Outro lance (ou o arremate) foi gravado depois da leitura do item
+                item.refresh_from_db(fields=['maiorLance','arrematado'])
+                if item.arrematado:
+                    raise ValidationError("Este item já foi arrematado.")
+                LeilaoService._validar_maior_lance(item.maiorLance,valor)
+                raise ValidationError("O lance não pôde ser registrado. Tente novamente.")
+            # Lidos com a linha do item ainda bloqueada pelo UPDATE. seq continua do maior já gravado, como em
+            # importar_lances, e não de totalLances, que a reconciliação recalcula pela contagem dos lances
+            item.totalLances,ultimo_seq=ItemLeilao.objects.filter(id=item_id).annotate(
+                ultimo_seq=Max('lances__seq')
+            ).values_list('totalLances','ultimo_seq').get()
+            lance=Lance.objects.create(
+                valorLance=valor,participante_id=participante_id,itemLeilao=item,seq=(ultimo_seq or 0)+1
+            )
+            evento=LeilaoService.evento_lance(lance,item.leilao_id,item.totalLances,nome_participante)
+            transaction.on_commit(lambda: central_lances.publicar(evento))
+        return lance
+    @staticmethod
+    def evento_lance(lance,leilao_id,total_lances,nome_participante):
+        """Dados enviados a quem acompanha o item ou o leilão (fluxo de eventos) quando um lance é registrado."""
+        return {
+            'id':lance.id,
+            'item':lance.itemLeilao_id,
+            'leilao':leilao_id,
+            'valor':f'{lance.valorLance:.2f}',
+            'participante':nome_participante,
+            'totalLances':total_lances,
+        }
+    @staticmethod
+    def lances_desde(ultimo_id,item_id=None,leilao_id=None,limite=EVENTOS_REENVIADOS):
+        """
+        Eventos dos lances gravados depois de ultimo_id, do mais antigo ao mais recente, para o cliente
+        que reconecta ao fluxo com Last-Event-ID. O total de lances enviado é o atual do item.
+        """
+        lances=Lance.objects.filter(id__gt=ultimo_id).select_related('participante','itemLeilao').order_by('id')
+        if item_id is not None:
+            lances=lances.filter(itemLeilao_id=item_id)
+        if leilao_id is not None:
+            lances=lances.filter(itemLeilao__leilao_id=leilao_id)
+        return [
+            LeilaoService.evento_lance(lance,lance.itemLeilao.leilao_id,lance.itemLeilao.totalLances,lance.participante.nome)
+            for lance in lances[:limite]
+        ]
+    @staticmethod
+    def _valor_lance(valor):
+        """
+        Converte o valor recebido em Decimal com duas casas, dentro dos limites de Lance.valorLance
+        (max_digits e decimal_places). NaN, infinito e valores largos demais para a coluna são recusados
+        com ValidationError: gravados, quebrariam a leitura do item e de todos os lances seguintes.
+        """
+        try:
+            valor=Decimal(str(valor).strip())
+            if not valor.is_finite():
+                raise ValidationError("Valor de lance inválido.")
+            valor=valor.quantize(Decimal('0.01'))
+        except (InvalidOperation, ValueError):
+            raise ValidationError("Valor de lance inválido.")
+        Lance._meta.get_field('valorLance').run_validators(valor)
+        return valor
+    @staticmethod
+    def _validar_maior_lance(maior,valor):
+        if maior is not None and valor<=maior:
+            raise ValidationError(f"O lance deve ser maior que o lance atual de R$ {maior:.2f}.")
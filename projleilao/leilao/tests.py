@@ -1,3 +1,431 @@
-from django.test import TestCase
+import asyncio
+import json
+import random
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+from io import StringIO
 
-# Create your tests here.
+from django.contrib import admin
+from django.core.exceptions import ValidationError
+from django.core.management import CommandError, call_command
+from asgiref.sync import sync_to_async
+from django.db import connection, transaction
+from django.db.migrations.executor import MigrationExecutor
+from django.db.models import ProtectedError
+from django.test import RequestFactory, TestCase, TransactionTestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import ItemLeilao, Lance, LanceImutavel, Leilao, Participante
+from .services import ITENS_POR_PAGINA, LeilaoService
+
+
+def criar_leilao(inicio, termino):
+    inicio, termino = timezone.localtime(inicio), timezone.localtime(termino)
+    return Leilao.objects.create(
+        dataInicio=inicio.date(), horaInicio=inicio.time(), dataTermino=termino.date(), horaTermino=termino.time()
+    )
+
+
+def criar_leilao_em_andamento(duracao=timedelta(days=1)):
+    agora = timezone.now()
+    return criar_leilao(agora - timedelta(days=1), agora + duracao)
+
+
+class DarLanceTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.leilao = criar_leilao_em_andamento()
+        cls.item = ItemLeilao.objects.create(
+            titulo='Relógio', descricao='Relógio de bolso', lanceMinimo=Decimal('10.00'), leilao=cls.leilao
+        )
+        cls.participante = Participante.objects.create(nome='Ana', email='ana@example.com')
+
+    def _lance(self, valor):
+        return self.client.post(
+            reverse('leilao:dar_lance', args=[self.item.id]), {'participante': self.participante.id, 'valor': valor}
+        )
+
+    def test_valores_invalidos_sao_recusados(self):
+        for valor in ['NaN', 'sNaN', 'Infinity', '-inf', 'abc', '', '123456789012.55', '100000000']:
+            with self.subTest(valor=valor):
+                self.assertEqual(self._lance(valor).status_code, 400)
+        self.assertFalse(Lance.objects.exists())
+        # O item continua legível e aceitando lances
+        self.assertEqual(self._lance('15').status_code, 201)
+        resposta = self.client.get(reverse('leilao:listar_itens', args=[self.leilao.id]))
+        self.assertEqual(resposta.status_code, 200)
+
+    def test_valor_com_mais_de_duas_casas(self):
+        resposta = self._lance('20000.123456')
+        self.assertEqual(resposta.status_code, 201)
+        self.assertEqual(resposta.json()['valor'], '20000.12')
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.maiorLance, Decimal('20000.12'))
+
+
+class EventosTests(TestCase):
+    """Fluxo SSE: os lances chegam a quem acompanha o item depois do commit, e só depois dele."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.item = ItemLeilao.objects.create(
+            titulo='Espelho', descricao='Espelho veneziano', lanceMinimo=Decimal('10.00'), leilao=criar_leilao_em_andamento()
+        )
+        cls.ana = Participante.objects.create(nome='Ana', email='ana@example.com')
+
+    def _dar_lance(self, valor, desfazer=False):
+        with self.captureOnCommitCallbacks(execute=True) as publicacoes:
+            try:
+                with transaction.atomic():
+                    lance = LeilaoService.dar_lance(self.item.id, self.ana.id, valor)
+                    if desfazer:
+                        raise RuntimeError
+            except RuntimeError:
+                lance = None
+        return lance, publicacoes
+
+    async def _abrir_fluxo(self):
+        response = await self.async_client.get(reverse('leilao:eventos_item', args=[self.item.id]))
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        fluxo = response.streaming_content
+        # O primeiro trecho só é enviado com a assinatura já registrada
+        self.assertEqual(await anext(fluxo), b'retry: 3000\n\n')
+        return fluxo
+
+    async def _proximo_evento(self, fluxo):
+        trecho = (await asyncio.wait_for(anext(fluxo), 5)).decode()
+        self.assertIn('event: lance\n', trecho)
+        return json.loads(trecho.split('data: ', 1)[1])
+
+    async def test_lance_publicado_apos_commit(self):
+        fluxo = await self._abrir_fluxo()
+        lance, _ = await sync_to_async(self._dar_lance)('15')
+        evento = await self._proximo_evento(fluxo)
+        self.assertEqual(
+            evento,
+            {
+                'id': lance.id, 'item': self.item.id, 'leilao': self.item.leilao_id,
+                'valor': '15.00', 'participante': 'Ana', 'totalLances': 1,
+            },
+        )
+        await fluxo.aclose()
+
+    async def test_lance_desfeito_nao_e_publicado(self):
+        fluxo = await self._abrir_fluxo()
+        lance, publicacoes = await sync_to_async(self._dar_lance)('15', desfazer=True)
+        self.assertIsNone(lance)
+        self.assertEqual(publicacoes, [])
+        # O próximo evento do fluxo é o do lance confirmado depois, não o do lance desfeito
+        lance, _ = await sync_to_async(self._dar_lance)('12')
+        evento = await self._proximo_evento(fluxo)
+        self.assertEqual((evento['id'], evento['valor'], evento['totalLances']), (lance.id, '12.00', 1))
+        await fluxo.aclose()
+
+    def test_fluxo_requer_asgi(self):
+        self.assertEqual(self.client.get(reverse('leilao:eventos_item', args=[self.item.id])).status_code, 501)
+        self.assertEqual(self.client.get(reverse('leilao:eventos_item', args=[0])).status_code, 404)
+
+
+class ListarItensViewTests(TestCase):
+    """A listagem de itens traz o resumo dos lances e o líder numa consulta só, em qualquer página."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.leilao = criar_leilao_em_andamento()
+        cls.itens = ItemLeilao.objects.bulk_create(
+            ItemLeilao(titulo=f'Item {i:02d}', descricao='Lote', lanceMinimo=Decimal('10.00'), leilao=cls.leilao)
+            for i in range(ITENS_POR_PAGINA + 10)
+        )
+        ana, bia = [Participante.objects.create(nome=nome, email=f'{nome.lower()}@example.com') for nome in ['Ana', 'Bia']]
+        for item, participante, valor in [(0, ana, '15'), (0, bia, '20'), (1, ana, '12')]:
+            LeilaoService.dar_lance(cls.itens[item].id, participante.id, valor)
+
+    def _listar(self, consultas, leilao_id=None, **parametros):
+        with self.assertNumQueries(consultas):
+            return self.client.get(reverse('leilao:listar_itens', args=[leilao_id or self.leilao.id]), parametros)
+
+    def test_resumo_dos_lances(self):
+        resposta = self._listar(1)
+        self.assertEqual(resposta.status_code, 200)
+        itens = resposta.context['itensLeilao']
+        self.assertEqual(len(itens), ITENS_POR_PAGINA)
+        self.assertTrue(resposta.context['tem_proxima'])
+        resumos = [(item.totalLances, item.maiorLance, getattr(item.participanteLider, 'nome', None)) for item in itens[:3]]
+        self.assertEqual(resumos, [(2, Decimal('20.00'), 'Bia'), (1, Decimal('12.00'), 'Ana'), (0, None, None)])
+
+    def test_paginas(self):
+        resposta = self._listar(1, pagina=2)
+        self.assertEqual(len(resposta.context['itensLeilao']), 10)
+        self.assertFalse(resposta.context['tem_proxima'])
+        # Página vazia: uma consulta a mais confirma que o leilão existe
+        resposta = self._listar(2, pagina=3)
+        self.assertEqual((resposta.status_code, resposta.context['itensLeilao']), (200, []))
+
+    def test_busca_por_titulo(self):
+        resposta = self._listar(1, titulo='item 0')
+        self.assertEqual([item.titulo for item in resposta.context['itensLeilao']], [f'Item 0{i}' for i in range(10)])
+
+    def test_leilao_inexistente(self):
+        self.assertEqual(self._listar(2, leilao_id=self.leilao.id + 1).status_code, 404)
+
+
+class ResumoLancesTests(TestCase):
+    """O resumo do item (maiorLance, totalLances, participanteLider) acompanha os lances aceitos."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.item = ItemLeilao.objects.create(
+            titulo='Tapete', descricao='Tapete persa', lanceMinimo=Decimal('10.00'), leilao=criar_leilao_em_andamento()
+        )
+        cls.ana, cls.bia = [
+            Participante.objects.create(nome=nome, email=f'{nome.lower()}@example.com') for nome in ['Ana', 'Bia']
+        ]
+
+    def _resumo(self):
+        self.item.refresh_from_db()
+        return self.item.maiorLance, self.item.totalLances, self.item.participanteLider_id
+
+    def test_resumo_segue_os_lances_aceitos(self):
+        self.assertEqual(self._resumo(), (None, 0, None))
+        LeilaoService.dar_lance(self.item.id, self.ana.id, '15')
+        LeilaoService.dar_lance(self.item.id, self.bia.id, '20')
+        # Recusados: abaixo do mínimo, igual ao maior e menor que o maior
+        for valor in ('5', '20', '18'):
+            with self.subTest(valor=valor), self.assertRaises(ValidationError):
+                LeilaoService.dar_lance(self.item.id, self.ana.id, valor)
+        self.assertEqual(self._resumo(), (Decimal('20.00'), 2, self.bia.id))
+
+    def _reconciliar(self, *argumentos):
+        saida = StringIO()
+        call_command('reconciliar_lances', *argumentos, stdout=saida)
+        return saida.getvalue()
+
+    def test_reconciliar_corrige_divergencias(self):
+        LeilaoService.dar_lance(self.item.id, self.ana.id, '15')
+        LeilaoService.dar_lance(self.item.id, self.bia.id, '20')
+        self.assertIn('consistente', self._reconciliar('--verificar'))
+        ItemLeilao.objects.filter(id=self.item.id).update(maiorLance=Decimal('99'), totalLances=7, participanteLider=self.ana)
+        with self.assertRaises(CommandError):
+            self._reconciliar('--verificar')
+        self.assertEqual(self._resumo(), (Decimal('99.00'), 7, self.ana.id))
+        self.assertIn('1 item(ns) corrigido(s)', self._reconciliar())
+        self.assertEqual(self._resumo(), (Decimal('20.00'), 2, self.bia.id))
+
+    def test_resumo_somente_leitura_no_admin(self):
+        campos = admin.site._registry[ItemLeilao].get_readonly_fields(RequestFactory().get('/'), self.item)
+        self.assertTrue({'maiorLance', 'totalLances', 'participanteLider'} <= set(campos))
+
+
+class RegistroLancesTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.item = ItemLeilao.objects.create(
+            titulo='Vaso', descricao='Vaso de porcelana', lanceMinimo=Decimal('1.00'), leilao=criar_leilao_em_andamento()
+        )
+        cls.participantes = [
+            Participante.objects.create(nome=nome, email=f'{nome.lower()}@example.com') for nome in ['Ana', 'Bia']
+        ]
+
+    def test_seq_continua_do_maior_gravado(self):
+        LeilaoService.importar_lances(
+            {'item': self.item.id, 'participante': self.participantes[i % 2].id, 'valor': Decimal(10 + i)}
+            for i in range(3)
+        )
+        # Resumo desatualizado (totalLances menor que o maior seq) não faz o lance repetir um seq
+        ItemLeilao.objects.filter(id=self.item.id).update(totalLances=1)
+        lance = LeilaoService.dar_lance(self.item.id, self.participantes[0].id, '20')
+        self.assertEqual(lance.seq, 4)
+        self.assertEqual(list(self.item.lances.order_by('seq').values_list('seq', flat=True)), [1, 2, 3, 4])
+
+    def test_lances_nao_sao_alterados_nem_excluidos(self):
+        lance = LeilaoService.dar_lance(self.item.id, self.participantes[0].id, '5')
+        lance.valorLance = Decimal('50')
+        with self.assertRaises(LanceImutavel):
+            lance.save()
+        with self.assertRaises(LanceImutavel):
+            lance.delete()
+        with self.assertRaises(LanceImutavel):
+            Lance.objects.filter(id=lance.id).update(valorLance=Decimal('50'))
+        with self.assertRaises(LanceImutavel):
+            Lance.objects.filter(id=lance.id).delete()
+        with self.assertRaises(ProtectedError):
+            self.participantes[0].delete()
+        self.assertEqual(Lance.objects.get(id=lance.id).valorLance, Decimal('5.00'))
+
+    def test_lances_saem_com_o_item(self):
+        LeilaoService.dar_lance(self.item.id, self.participantes[0].id, '5')
+        self.item.delete()
+        self.assertFalse(Lance.objects.exists())
+
+
+class EncerramentoTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.ana = Participante.objects.create(nome='Ana', email='ana@example.com')
+        # Dois leilões em andamento: um termina em uma hora, o outro amanhã
+        cls.proximo, cls.amanha = criar_leilao_em_andamento(timedelta(hours=1)), criar_leilao_em_andamento()
+        cls.com_lance, cls.sem_lance, cls.outro = [
+            ItemLeilao.objects.create(titulo=titulo, descricao=titulo, lanceMinimo=Decimal('10.00'), leilao=leilao)
+            for titulo, leilao in [('Vaso', cls.proximo), ('Quadro', cls.proximo), ('Mesa', cls.amanha)]
+        ]
+        for item in (cls.com_lance, cls.outro):
+            LeilaoService.dar_lance(item.id, cls.ana.id, '15')
+
+    def _estado(self):
+        for objeto in (self.proximo, self.amanha, self.com_lance, self.sem_lance, self.outro):
+            objeto.refresh_from_db()
+        return [self.proximo.encerrado, self.amanha.encerrado] + [
+            item.arrematado for item in (self.com_lance, self.sem_lance, self.outro)
+        ]
+
+    def test_so_encerra_vencidos(self):
+        self.assertEqual(LeilaoService.encerrar_leiloes(), (0, 0))
+        # Dentro da tolerância após o término, o leilão ainda espera os lances em gravação
+        self.assertEqual(LeilaoService.encerrar_leiloes(self.proximo.termino + timedelta(seconds=3)), (0, 0))
+        self.assertEqual(LeilaoService.encerrar_leiloes(self.proximo.termino + timedelta(minutes=1)), (1, 1))
+        self.assertEqual(self._estado(), [True, False, True, False, False])
+        self.assertEqual(self.com_lance.participanteLider, self.ana)
+
+    def test_segunda_execucao_nao_altera_nada(self):
+        depois = self.amanha.termino + timedelta(minutes=1)
+        self.assertEqual(LeilaoService.encerrar_leiloes(depois), (2, 2))
+        self.assertEqual(LeilaoService.encerrar_leiloes(depois), (0, 0))
+        self.assertEqual(self._estado(), [True, True, True, False, True])
+
+    def test_lote(self):
+        depois = self.amanha.termino + timedelta(minutes=1)
+        # O lote pega primeiro o leilão de término mais antigo
+        self.assertEqual(LeilaoService.encerrar_leiloes(depois, lote=1), (1, 1))
+        self.assertEqual(self._estado(), [True, False, True, False, False])
+        self.assertEqual(LeilaoService.encerrar_leiloes(depois, lote=1), (1, 1))
+
+    def test_comando(self):
+        saida = StringIO()
+        call_command('encerrar_leiloes', stdout=saida)
+        self.assertEqual(saida.getvalue(), "Nenhum leilão a encerrar.\n")
+        self.assertEqual(self._estado(), [False] * 5)
+
+
+class PeriodoLeilaoTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        fuso = timezone.get_current_timezone()
+        cls.inicio = datetime(2030, 5, 10, 14, 30, tzinfo=fuso)
+        cls.termino = datetime(2030, 5, 12, 18, 0, tzinfo=fuso)
+        cls.leilao = criar_leilao(cls.inicio, cls.termino)
+
+    def test_inicio_e_termino_preenchidos(self):
+        self.leilao.refresh_from_db()
+        self.assertEqual((self.leilao.inicio, self.leilao.termino), (self.inicio, self.termino))
+        self.leilao.horaTermino = time(20, 0)
+        self.leilao.save(update_fields=['horaTermino'])
+        self.leilao.refresh_from_db()
+        self.assertEqual(self.leilao.termino, self.termino.replace(hour=20))
+
+    def test_limites_da_janela(self):
+        instante = timedelta(microseconds=1)
+        casos = [
+            (self.inicio - instante, False, False),
+            (self.inicio, True, False),
+            (self.termino, True, False),
+            (self.termino + instante, False, True),
+        ]
+        for momento, ativo, encerrado in casos:
+            with self.subTest(momento=momento):
+                self.assertEqual(Leilao.objects.ativos(momento).filter(id=self.leilao.id).exists(), ativo)
+                self.assertEqual(self.leilao.em_andamento(momento), ativo)
+                self.assertEqual(Leilao.objects.encerrados(momento).filter(id=self.leilao.id).exists(), encerrado)
+
+    def test_encerrado_nao_esta_ativo(self):
+        Leilao.objects.filter(id=self.leilao.id).update(encerrado=True)
+        self.assertFalse(Leilao.objects.ativos(self.inicio).exists())
+
+
+class PeriodoLeilaoMigracaoTests(TransactionTestCase):
+    """0006_periodo_leiloes preenche inicio e termino dos leilões gravados antes dos novos campos."""
+
+    anterior = [('leilao', '0005_encerramento_leiloes')]
+    posterior = [('leilao', '0006_periodo_leiloes')]
+
+    def _migrar(self, destino):
+        executor = MigrationExecutor(connection)
+        executor.migrate(destino)
+        return executor.loader.project_state(destino).apps
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes('leilao'))
+
+    def test_preenche_periodo(self):
+        Antigo = self._migrar(self.anterior).get_model('leilao', 'Leilao')
+        Antigo.objects.bulk_create(
+            Antigo(
+                dataInicio=f'2030-05-{dia:02}', horaInicio='09:00', dataTermino=f'2030-05-{dia + 1:02}', horaTermino='17:30'
+            )
+            for dia in range(1, 4)
+        )
+        self.assertEqual(Antigo.objects.filter(termino__isnull=True).count(), 3)
+        Novo = self._migrar(self.posterior).get_model('leilao', 'Leilao')
+        fuso = timezone.get_current_timezone()
+        self.assertEqual(
+            list(Novo.objects.order_by('id').values_list('inicio', 'termino')),
+            [
+                (datetime(2030, 5, dia, 9, 0, tzinfo=fuso), datetime(2030, 5, dia + 1, 17, 30, tzinfo=fuso))
+                for dia in range(1, 4)
+            ],
+        )
+
+
+class LancesSimultaneosTests(TransactionTestCase):
+    """
+    Lances simultâneos num mesmo item, cada thread com sua conexão: o maior lance enviado vence, os
+    aceitos são crescentes e numerados sem lacunas, e o resumo do item confere com o registro.
+    """
+
+    LANCES = 300
+
+    def setUp(self):
+        if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+            self.skipTest("O SQLite em memória não aceita uma conexão por thread")
+        self.item = ItemLeilao.objects.create(
+            titulo='Quadro', descricao='Quadro a óleo', lanceMinimo=Decimal('100.00'), leilao=criar_leilao_em_andamento()
+        )
+        self.participantes = [
+            Participante.objects.create(nome=f'Participante {i}', email=f'participante{i}@example.com') for i in range(10)
+        ]
+
+    def _disparar(self, valores):
+        def tentar(numero, valor):
+            try:
+                LeilaoService.dar_lance(self.item.id, self.participantes[numero % len(self.participantes)].id, valor)
+                return True
+            except ValidationError:
+                return False
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            aceitos = list(executor.map(tentar, range(len(valores)), valores)).count(True)
+
+        registro = list(self.item.lances.order_by('seq').values_list('seq', 'valorLance', 'participante'))
+        self.assertEqual(len(registro), aceitos)
+        self.assertEqual([seq for seq, _, _ in registro], list(range(1, aceitos + 1)))
+        gravados = [valor for _, valor, _ in registro]
+        self.assertEqual(gravados, sorted(set(gravados)))
+        self.assertEqual(gravados[-1], max(valores))
+        self.item.refresh_from_db()
+        self.assertEqual(
+            (self.item.maiorLance, self.item.totalLances, self.item.participanteLider_id),
+            (max(valores), aceitos, registro[-1][2]),
+        )
+
+    def test_valores_em_ordem_aleatoria(self):
+        valores = [Decimal(100 + i) for i in range(self.LANCES)]
+        random.Random(42).shuffle(valores)
+        self._disparar(valores)
+
+    def test_valores_crescentes(self):
+        # Quase todos os lances disputam a linha do item
+        self._disparar([Decimal(100 + i) for i in range(self.LANCES)])
@@ -4,5 +4,8 @@ app_name = "leilao"
 urlpatterns = [
     path("", views.index, name="index"),
     path("leiloes/<int:leilao_id>/itens", views.listar_itensLeilao, name="listar_itens"),
+    path("leiloes/<int:leilao_id>/eventos", views.eventos_leilao, name="eventos_leilao"),
+    path("itens/<int:item_id>/lances", views.dar_lance, name="dar_lance"),
+    path("itens/<int:item_id>/eventos", views.eventos_item, name="eventos_item"),
     #path("gatos/listar", views.listar_gatos, name="listar_gatos" ),
 ]
\ No newline at end of file
@@ -1,13 +1,117 @@
+import json
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ValidationError
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
 from django.shortcuts import render
+from django.views.decorators.http import require_GET, require_POST
+from .eventos import central_lances
+from .models import Leilao, ItemLeilao
 from .services import LeilaoService
+from comum.orcamento_consultas import orcamento_consultas
 # Create your views here.
 
+RECONEXAO_EVENTOS_MS = 3000  # Espera do navegador antes de reconectar ao fluxo de eventos
+INTERVALO_COMENTARIO = 15  # Segundos sem eventos até um comentário que mantém a conexão aberta em proxies
+
+SITUACOES_LEILAO={'ativos':'Em andamento','encerrados':'Encerrados','todos':'Todos'}
+
+@orcamento_consultas(1)
 def index(request):
-    leiloes=LeilaoService.listar_leiloes()
-    contexto={'leiloes':leiloes}
+    situacao=request.GET.get('situacao','ativos')
+    if situacao not in SITUACOES_LEILAO:
+        situacao='ativos'
+    pagina=_pagina(request)
+    leiloes,tem_proxima=LeilaoService.listar_leiloes(None if situacao=='todos' else situacao,pagina)
+    contexto={
+        'leiloes':leiloes,
+        'situacao':situacao,
+        'situacoes':SITUACOES_LEILAO,
+        'pagina':pagina,
+        'tem_proxima':tem_proxima,
+    }
     return render(request, 'leilao/index.html',context=contexto)
+
+def _pagina(request):
+    try:
+        return max(int(request.GET.get('pagina',1)),1)
+    except ValueError:
+        return 1
+@orcamento_consultas(2)  # Itens com o resumo dos lances e o líder (+ verificação do leilão se a página vier vazia)
 def listar_itensLeilao(request,leilao_id):
-    titulo=request.GET.get('titulo',None)
-    itensLeilao=LeilaoService.listar_itensLeilao(leilao_id,titulo)
-    contexto={'itensLeilao':itensLeilao,'leilao_id':leilao_id}
-    return render(request, 'leilao/itens.html',context=contexto)
\ No newline at end of file
+    titulo=request.GET.get('titulo','')
+    pagina=_pagina(request)
+    try:
+        itensLeilao,tem_proxima=LeilaoService.paginar_itensLeilao(leilao_id,titulo,pagina)
+    except Leilao.DoesNotExist:
+        raise Http404("Leilão não encontrado.")
+    contexto={
+        'itensLeilao':itensLeilao,
+        'leilao_id':leilao_id,
+        'titulo':titulo,
+        'pagina':pagina,
+        'tem_proxima':tem_proxima,
+    }
+    return render(request, 'leilao/itens.html',context=contexto)
+
+@require_POST
+def dar_lance(request,item_id):
+    """Recebe participante e valor por POST e responde em JSON (201 com o lance ou 400 com o motivo)."""
+    try:
+        lance=LeilaoService.dar_lance(item_id,request.POST.get('participante'),request.POST.get('valor'))
+    except ValidationError as e:
+        return JsonResponse({'erro':' '.join(e.messages)},status=400)
+    return JsonResponse({
+        'id':lance.id,
+        'item':item_id,
+        'participante':lance.participante_id,
+        'valor':str(lance.valorLance),
+    },status=201)
+
+@require_GET
+async def eventos_leilao(request,leilao_id):
+    """Fluxo SSE com os lances de todos os itens do leilão."""
+    if not await Leilao.objects.filter(id=leilao_id).aexists():
+        raise Http404("Leilão não encontrado.")
+    return _resposta_eventos(request,'leilao',leilao_id)
+
+@require_GET
+async def eventos_item(request,item_id):
+    """Fluxo SSE com os lances de um item."""
+    if not await ItemLeilao.objects.filter(id=item_id).aexists():
+        raise Http404("Item não encontrado.")
+    return _resposta_eventos(request,'item',item_id)
+
+def _resposta_eventos(request,tipo,identificador):
+    if not isinstance(request,ASGIRequest):
+        # Sob WSGI cada conexão aberta prenderia uma thread do servidor; a página continua funcionando sem o fluxo
+        return HttpResponse("O fluxo de eventos requer um servidor ASGI.",status=501)
+    try:
+        ultimo_id=int(request.headers.get('Last-Event-ID',''))
+    except ValueError:
+        ultimo_id=None
+    response=StreamingHttpResponse(_fluxo_eventos(tipo,identificador,ultimo_id),content_type='text/event-stream')
+    response['Cache-Control']='no-cache'
+    response['X-Accel-Buffering']='no'  # nginx: entrega cada evento sem acumular
+    return response
+
+async def _fluxo_eventos(tipo,identificador,ultimo_id):
+    async with central_lances.assinar(tipo,identificador) as assinatura:
+        yield f'retry: {RECONEXAO_EVENTOS_MS}\n\n'
+        if ultimo_id is not None:
+            # Reconexão: reenvia os lances perdidos. A assinatura já está ativa, então nada se perde entre
+            # a consulta e o fluxo; os eventos repetidos são ignorados pelo id.
+            perdidos=await sync_to_async(LeilaoService.lances_desde)(ultimo_id,**{f'{tipo}_id':identificador})
+            for evento in perdidos:
+                ultimo_id=evento['id']
+                yield _formatar_evento(evento)
+        while True:
+            evento=await assinatura.proximo(INTERVALO_COMENTARIO)
+            if evento is None:
+                yield ': ping\n\n'
+            elif ultimo_id is None or evento['id']>ultimo_id:
+                yield _formatar_evento(evento)
+
+def _formatar_evento(evento):
+    return f"id: {evento['id']}\nevent: lance\ndata: {json.dumps(evento)}\n\n"
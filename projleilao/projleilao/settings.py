@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
 from pathlib import Path
+import os
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -50,6 +51,14 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# Orçamento de consultas e detector de N+1 (opt-in): ORCAMENTO_CONSULTAS=1 no ambiente (comum.orcamento_consultas)
+if os.environ.get("ORCAMENTO_CONSULTAS") == "1":
+    MIDDLEWARE.append("comum.orcamento_consultas.OrcamentoConsultasMiddleware")
+
+# Fluxo de lances em tempo real (leilao.eventos): requer servidor ASGI, ex.: uvicorn projleilao.asgi:application
+LEILAO_EVENTOS_REDIS_URL = os.environ.get("LEILAO_EVENTOS_REDIS_URL")  # Vários processos: redis://localhost:6379/0
+LEILAO_EVENTOS_FILA = 100  # Eventos pendentes por conexão antes de descartar os mais antigos
+
 ROOT_URLCONF = "projleilao.urls"
 
 TEMPLATES = [
@@ -77,6 +86,10 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        # BEGIN IMMEDIATE: lances simultâneos esperam a vez (até o timeout) em vez de falhar com "database is locked"
+        "OPTIONS": {"transaction_mode": "IMMEDIATE", "timeout": 20},
+        # Em arquivo, não em memória: os testes de lances simultâneos abrem uma conexão por thread
+        "TEST": {"NAME": BASE_DIR / "test_db.sqlite3"},
     }
 }
 
@@ -1,3 +1,13 @@
 from django.contrib import admin
+from .models import Enquete, Alternativa
 
 # Register your models here.
+
+class AlternativaInline(admin.TabularInline):
+    model = Alternativa
+    extra = 0
+
+@admin.register(Enquete)
+class EnqueteAdmin(admin.ModelAdmin):
+    list_display = ('pergunta', 'fragmentos')
+    inlines = [AlternativaInline]
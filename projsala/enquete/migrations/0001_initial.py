@@ -0,0 +1,95 @@
+# Generated by Django 5.2 on 2026-10-18 15:11
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="Enquete",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("pergunta", models.CharField(max_length=200)),
+                ("fragmentos", models.PositiveSmallIntegerField(default=1)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="Alternativa",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("texto", models.CharField(max_length=100)),
+                ("ordem", models.PositiveSmallIntegerField()),
+                (
+                    "enquete",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="alternativas",
+                        to="enquete.enquete",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["ordem"],
+            },
+        ),
+        migrations.CreateModel(
+            name="ContadorVotos",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("fragmento", models.PositiveSmallIntegerField(default=0)),
+                ("votos", models.PositiveIntegerField(default=0)),
+                (
+                    "alternativa",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="contadores",
+                        to="enquete.alternativa",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("alternativa", "fragmento"),
+                        name="contador_alternativa_fragmento_unico",
+                    )
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="alternativa",
+            constraint=models.UniqueConstraint(
+                fields=("enquete", "ordem"), name="alternativa_enquete_ordem_unica"
+            ),
+        ),
+    ]
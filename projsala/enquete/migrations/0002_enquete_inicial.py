@@ -0,0 +1,36 @@
+from django.db import migrations
+
+PERGUNTA = "Quanto é 2+2?"
+ALTERNATIVAS = ["4", "5", "6", "7"]
+
+
+def criar_enquete(apps, schema_editor):
+    """Cria a enquete que antes ficava fixa em enquete/views.py."""
+    Enquete = apps.get_model("enquete", "Enquete")
+    Alternativa = apps.get_model("enquete", "Alternativa")
+    alias = schema_editor.connection.alias
+    enquete = Enquete.objects.using(alias).create(pergunta=PERGUNTA)
+    Alternativa.objects.using(alias).bulk_create(
+        [
+            Alternativa(enquete=enquete, texto=texto, ordem=ordem)
+            for ordem, texto in enumerate(ALTERNATIVAS, start=1)
+        ]
+    )
+
+
+def remover_enquete(apps, schema_editor):
+    Enquete = apps.get_model("enquete", "Enquete")
+    Enquete.objects.using(schema_editor.connection.alias).filter(
+        pergunta=PERGUNTA
+    ).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("enquete", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RunPython(criar_enquete, remover_enquete),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2 on 2026-10-18 15:59
+
+import django.core.validators
+from django.db import migrations, models
+
+
+def corrigir_fragmentos(apps, schema_editor):
+    """Enquetes gravadas com 0 fragmentos passam a ter 1, para que a restrição possa ser criada."""
+    Enquete = apps.get_model("enquete", "Enquete")
+    Enquete.objects.filter(fragmentos__lt=1).update(fragmentos=1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("enquete", "0002_enquete_inicial"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="enquete",
+            name="fragmentos",
+            field=models.PositiveSmallIntegerField(
+                default=1, validators=[django.core.validators.MinValueValidator(1)]
+            ),
+        ),
+        migrations.RunPython(corrigir_fragmentos, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="enquete",
+            constraint=models.CheckConstraint(
+                condition=models.Q(("fragmentos__gte", 1)),
+                name="enquete_fragmentos_positivo",
+            ),
+        ),
+    ]
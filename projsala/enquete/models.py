@@ -1,3 +1,44 @@
+from django.core.validators import MinValueValidator
 from django.db import models
 
 # Create your models here.
+
+class Enquete(models.Model):
+    pergunta = models.CharField(max_length=200)
+    # Com mais de um fragmento, os votos de cada alternativa se dividem em várias linhas de ContadorVotos,
+    # e votos simultâneos na mesma alternativa raramente disputam a mesma linha (enquetes muito votadas)
+    fragmentos = models.PositiveSmallIntegerField(default=1, validators=[MinValueValidator(1)])
+
+    class Meta:
+        constraints = [
+            # EnqueteService.votar sorteia um fragmento entre 0 e fragmentos - 1
+            models.CheckConstraint(condition=models.Q(fragmentos__gte=1), name='enquete_fragmentos_positivo'),
+        ]
+
+    def __str__(self):
+        return self.pergunta
+
+class Alternativa(models.Model):
+    enquete = models.ForeignKey(Enquete, on_delete=models.CASCADE, related_name='alternativas')
+    texto = models.CharField(max_length=100)
+    ordem = models.PositiveSmallIntegerField()
+
+    class Meta:
+        ordering = ['ordem']
+        constraints = [
+            models.UniqueConstraint(fields=['enquete', 'ordem'], name='alternativa_enquete_ordem_unica'),
+        ]
+
+    def __str__(self):
+        return self.texto
+
+class ContadorVotos(models.Model):
+    """Votos de uma alternativa, ou parte deles quando a enquete tem mais de um fragmento."""
+    alternativa = models.ForeignKey(Alternativa, on_delete=models.CASCADE, related_name='contadores')
+    fragmento = models.PositiveSmallIntegerField(default=0)
+    votos = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['alternativa', 'fragmento'], name='contador_alternativa_fragmento_unico'),
+        ]
@@ -0,0 +1,65 @@
+import random
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import F, Sum
+from django.db.models.functions import Coalesce
+
+from .models import Enquete, Alternativa, ContadorVotos
+
+CACHE_RESULTADO = 5  # Segundos em que o resultado de uma enquete é servido do cache
+
+
+class EnqueteService:
+    @staticmethod
+    def enquete_atual(com_alternativas=True):
+        """A enquete mais recente (com as alternativas já carregadas, se pedido), ou None se não houver enquete."""
+        enquetes = Enquete.objects.order_by('-id')
+        if com_alternativas:
+            enquetes = enquetes.prefetch_related('alternativas')
+        return enquetes.first()
+
+    @staticmethod
+    def votar(enquete, ordem):
+        """
+        Registra um voto na alternativa de número `ordem` (1, 2, ...) da enquete.
+        O incremento é feito pelo banco (UPDATE ... SET votos = votos + 1), sem ler o valor antes,
+        de modo que votos simultâneos, de threads ou de processos diferentes, não se perdem.
+        Lança Alternativa.DoesNotExist se a enquete não tiver essa alternativa.
+        """
+        alternativa_id = Alternativa.objects.filter(enquete=enquete, ordem=ordem).values_list('id', flat=True).first()
+        if alternativa_id is None:
+            raise Alternativa.DoesNotExist(f"A enquete {enquete.id} não tem a alternativa {ordem}.")
+        fragmento = random.randrange(enquete.fragmentos)
+        contador = ContadorVotos.objects.filter(alternativa_id=alternativa_id, fragmento=fragmento)
+        if not contador.update(votos=F('votos') + 1):
+            # Primeiro voto neste fragmento: cria o contador. Se outro voto o criou ao mesmo tempo, incrementa
+            try:
+                with transaction.atomic():
+                    ContadorVotos.objects.create(alternativa_id=alternativa_id, fragmento=fragmento, votos=1)
+            except IntegrityError:
+                contador.update(votos=F('votos') + 1)
+
+    @staticmethod
+    def resultado(enquete_id):
+        """
+        Lista de (alternativa, votos) da enquete, somando os fragmentos. O resultado fica em cache por
+        ENQUETE_CACHE_RESULTADO segundos e não é invalidado a cada voto: numa enquete muito votada,
+        a soma é feita uma vez por intervalo, e o resultado exibido atrasa no máximo esse tempo.
+        """
+        chave = EnqueteService._chave_resultado(enquete_id)
+        resultado = cache.get(chave)
+        if resultado is None:
+            resultado = list(
+                Alternativa.objects.filter(enquete_id=enquete_id)
+                .annotate(total=Coalesce(Sum('contadores__votos'), 0))
+                .order_by('ordem')
+                .values_list('texto', 'total')
+            )
+            cache.set(chave, resultado, getattr(settings, 'ENQUETE_CACHE_RESULTADO', CACHE_RESULTADO))
+        return resultado
+
+    @staticmethod
+    def _chave_resultado(enquete_id):
+        return f'enquete:{enquete_id}:resultado'
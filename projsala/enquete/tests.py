@@ -1,3 +1,108 @@
-from django.test import TestCase
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 
-# Create your tests here.
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from .models import Alternativa, ContadorVotos, Enquete
+from .services import EnqueteService
+
+
+def criar_enquete(fragmentos=1):
+    enquete = Enquete.objects.create(pergunta="Linguagem favorita?", fragmentos=fragmentos)
+    Alternativa.objects.bulk_create(
+        Alternativa(enquete=enquete, texto=texto, ordem=ordem) for ordem, texto in enumerate(['Python', 'Go', 'C'], 1)
+    )
+    return enquete
+
+
+@override_settings(
+    MIDDLEWARE=[*settings.MIDDLEWARE, 'comum.orcamento_consultas.OrcamentoConsultasMiddleware'],
+    ORCAMENTO_CONSULTAS_FALHAR=True,
+    ENQUETE_CACHE_RESULTADO=60,
+)
+class VotarTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.enquete = criar_enquete()
+
+    def setUp(self):
+        cache.clear()
+
+    def _votar(self, opcao):
+        with self.assertLogs('consultas', 'INFO'):
+            return self.client.get(reverse('enquete:votar'), {'opcao': opcao})
+
+    def _resultado(self):
+        with self.assertLogs('consultas', 'INFO'):
+            resposta = self.client.get(reverse('enquete:resultado'))
+        return resposta, list(resposta.context['resultado'])
+
+    def test_voto_leva_ao_resultado(self):
+        self.assertRedirects(self._votar(1), reverse('enquete:resultado'), fetch_redirect_response=False)
+        resposta, resultado = self._resultado()
+        self.assertEqual(resultado, [('Python', 1), ('Go', 0), ('C', 0)])
+        self.assertEqual(resposta['X-Consultas'], '2')
+
+    def test_resultado_servido_do_cache(self):
+        self._votar(1)
+        self._resultado()
+        # Os votos seguintes não invalidam o cache: o resultado só é somado de novo depois do intervalo
+        self._votar(2)
+        resposta, resultado = self._resultado()
+        self.assertEqual(resposta['X-Consultas'], '1')
+        self.assertEqual(resultado, [('Python', 1), ('Go', 0), ('C', 0)])
+        cache.clear()
+        self.assertEqual(self._resultado()[1], [('Python', 1), ('Go', 1), ('C', 0)])
+
+    def test_opcao_inexistente(self):
+        self.assertRedirects(self._votar(9), reverse('enquete:index'), fetch_redirect_response=False)
+        self.assertFalse(ContadorVotos.objects.exists())
+
+
+class FragmentosTests(TestCase):
+    def test_ao_menos_um_fragmento(self):
+        with self.assertRaises(ValidationError):
+            Enquete(pergunta="Sem fragmentos?", fragmentos=0).full_clean()
+        with self.assertRaises(IntegrityError):
+            Enquete.objects.create(pergunta="Sem fragmentos?", fragmentos=0)
+
+
+class VotosSimultaneosTests(TransactionTestCase):
+    """Votos de várias threads, cada uma com sua conexão: todo voto confirmado ao votante é contado."""
+
+    VOTOS = 400
+
+    def setUp(self):
+        if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+            self.skipTest("O SQLite em memória não aceita uma conexão por thread")
+        cache.clear()
+
+    def _disparar(self, enquete):
+        def votar(ordem):
+            try:
+                EnqueteService.votar(enquete, ordem)
+                return ordem
+            finally:
+                connection.close()
+
+        # A maioria dos votos vai para a mesma alternativa, como numa enquete disputada
+        votos = [1 if i % 10 < 7 else i % 3 + 1 for i in range(self.VOTOS)]
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            confirmados = Counter(executor.map(votar, votos))
+        self.assertEqual(sum(confirmados.values()), self.VOTOS)
+        self.assertEqual(
+            [votos for _, votos in EnqueteService.resultado(enquete.id)], [confirmados[ordem] for ordem in (1, 2, 3)]
+        )
+
+    def test_um_fragmento(self):
+        self._disparar(criar_enquete())
+
+    def test_varios_fragmentos(self):
+        enquete = criar_enquete(fragmentos=8)
+        self._disparar(enquete)
+        self.assertGreater(ContadorVotos.objects.filter(alternativa__enquete=enquete, alternativa__ordem=1).count(), 1)
@@ -4,5 +4,6 @@ app_name='enquete'
 urlpatterns=[
     path('',views.index,name='index'),
     path('votar/', views.votar, name='votar'),
+    path('resultado/', views.resultado, name='resultado'),
     #path("calcular/", views.calcular_imc, name = "soma"),
 ]
\ No newline at end of file
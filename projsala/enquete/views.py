@@ -1,19 +1,36 @@
-from django.shortcuts import render
+from django.http import Http404
+from django.shortcuts import render, redirect
+from comum.orcamento_consultas import orcamento_consultas
+from .models import Alternativa
+from .services import EnqueteService
 
 # Create your views here.
-pergunta="Quanto é 2+2?"
-alternativas=["4","5","6","7"]
-votos=[0,0,0,0]
+@orcamento_consultas(2)  # Enquete + alternativas
 def index(request):
-    contexto={'pergunta':pergunta,"alternativas":alternativas,}
+    enquete=EnqueteService.enquete_atual()
+    if enquete is None:
+        raise Http404("Nenhuma enquete cadastrada.")
+    contexto={'pergunta':enquete.pergunta,"alternativas":enquete.alternativas.all(),}
     return render(request, 'enquete/index.html',contexto)
+@orcamento_consultas(6)  # Enquete + alternativa + incremento (+ criação do contador no seu savepoint)
 def votar(request):
-    opcao=int(request.GET.get('opcao'))
-    global votos
-    votos[opcao-1]+=1
-    resultado=zip(alternativas,votos)
+    enquete=EnqueteService.enquete_atual(com_alternativas=False)
+    if enquete is None:
+        raise Http404("Nenhuma enquete cadastrada.")
+    try:
+        EnqueteService.votar(enquete,int(request.GET.get('opcao')))
+    except (TypeError, ValueError, Alternativa.DoesNotExist):
+        # Nenhuma opção marcada ou opção inexistente: volta para a enquete
+        return redirect('enquete:index')
+    # O resultado tem endereço próprio: recarregar a página não repete o voto
+    return redirect('enquete:resultado')
+@orcamento_consultas(2)  # Enquete + resultado (quando não está no cache)
+def resultado(request):
+    enquete=EnqueteService.enquete_atual(com_alternativas=False)
+    if enquete is None:
+        raise Http404("Nenhuma enquete cadastrada.")
     contexto = {
-        'resultado': resultado,
-        'pergunta': pergunta,
+        'resultado': EnqueteService.resultado(enquete.id),
+        'pergunta': enquete.pergunta,
     }
     return render(request, 'enquete/resultado.html', contexto)
@@ -1,3 +1,35 @@
 from django.contrib import admin
+from .models import Paciente, IMC, ResumoIMC
 
 # Register your models here.
+
+@admin.register(Paciente)
+class PacienteAdmin(admin.ModelAdmin):
+    list_display = ('nome', 'codigo')
+    search_fields = ('nome', 'codigo')
+
+@admin.register(IMC)
+class IMCAdmin(admin.ModelAdmin):
+    # Registradas por IMCService.registrar_medicoes, que mantém os resumos: só consulta e exclusão (descontada dos resumos)
+    list_display = ('paciente', 'data', 'imc', 'classificacao')
+    list_select_related = ('paciente',)
+    raw_id_fields = ('paciente',)
+    date_hierarchy = 'data'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+@admin.register(ResumoIMC)
+class ResumoIMCAdmin(admin.ModelAdmin):
+    # Mantidos por IMCService.registrar_medicoes: só para consulta
+    list_display = ('periodo', 'inicio', 'classificacao', 'quantidade', 'soma_imc')
+    list_filter = ('periodo', 'classificacao')
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
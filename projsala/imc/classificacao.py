@@ -0,0 +1,160 @@
+"""
+Classificação do IMC por faixas, com busca binária sobre os limites (bisect no valor isolado,
+np.searchsorted nos arrays), em vez de uma cadeia de if/elif com os limites no código.
+
+Uma tabela de faixas é uma sequência crescente de limites e um rótulo para cada faixa
+(len(limites) + 1 rótulos). Um valor igual a um limite pertence à faixa de cima: com os
+limites da OMS, 25,0 já é Sobrepeso e 24,99 ainda é Peso normal, sem intervalos descobertos.
+
+- Faixas: limites fixos (adultos). ADULTO usa as quatro classificações de sempre; ADULTO_OMS
+  divide a obesidade nos graus I, II e III. IMC_FAIXAS nas configurações escolhe a tabela usada
+  por IMCService ('adulto' ou 'adulto_oms').
+- FaixasPercentis: limites que variam com sexo e idade (crianças e adolescentes), lidos de uma
+  tabela de percentis de IMC por idade, como as do CDC (FaixasPercentis.de_csv).
+"""
+import bisect
+import csv
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+try:
+    import numpy as np
+except ImportError:  # Só a classificação de arrays depende do numpy
+    np = None
+
+DADOS_INVALIDOS = 'Dados inválidos'
+
+
+def _exigir_numpy():
+    if np is None:
+        raise ImproperlyConfigured("A classificação de IMC em lote requer o pacote numpy (pip install numpy).")
+
+
+def _validar_limites(limites, rotulos):
+    if len(rotulos) != len(limites) + 1:
+        raise ValueError(f"São necessários {len(limites) + 1} rótulos para {len(limites)} limites.")
+    if any(anterior >= limite for anterior, limite in zip(limites, limites[1:])):
+        raise ValueError("Os limites das faixas precisam ser estritamente crescentes.")
+
+
+class Faixas:
+    """Faixas de limites fixos: classificar(valor) para um IMC e classificar_lote(valores) para arrays."""
+
+    def __init__(self, limites, rotulos):
+        self.limites = tuple(float(limite) for limite in limites)
+        self.rotulos = tuple(rotulos)
+        _validar_limites(self.limites, self.rotulos)
+        # Rótulos indexados pela faixa, com DADOS_INVALIDOS na última posição (valores NaN)
+        self._rotulos_lote = np.array(self.rotulos + (DADOS_INVALIDOS,), dtype=object) if np is not None else None
+
+    def indice(self, valor):
+        """Número da faixa do valor (0 para a primeira)."""
+        return bisect.bisect_right(self.limites, valor)
+
+    def classificar(self, valor):
+        if valor != valor:  # NaN
+            return DADOS_INVALIDOS
+        return self.rotulos[bisect.bisect_right(self.limites, valor)]
+
+    def classificar_lote(self, valores):
+        """Classifica um array de IMCs; NaN recebe DADOS_INVALIDOS. Retorna um array numpy de rótulos."""
+        _exigir_numpy()
+        valores = np.asarray(valores, dtype=np.float64)
+        # side='right' equivale ao bisect_right de classificar: o limite pertence à faixa de cima
+        indices = np.searchsorted(self.limites, valores, side='right')
+        indices[np.isnan(valores)] = len(self.rotulos)
+        return self._rotulos_lote[indices]
+
+
+class FaixasPercentis:
+    """
+    Faixas cujos limites dependem de sexo ('M' ou 'F') e idade em meses: `tabela` é
+    {sexo: [(idade, (limite, ...)), ...]}, com os limites (IMC nos percentis de corte) de cada idade.
+    Vale a linha da maior idade que não passa da idade informada (a última vale por um mês);
+    idades fora da tabela, sexos desconhecidos e IMCs NaN recebem DADOS_INVALIDOS.
+    """
+
+    # Cortes usuais para 2 a 20 anos: abaixo do P5, do P5 ao P85, do P85 ao P95 e a partir do P95
+    PERCENTIS = (5, 85, 95)
+    ROTULOS = ('Abaixo do peso', 'Peso normal', 'Sobrepeso', 'Obesidade')
+    SEXOS = {'1': 'M', '2': 'F', 'M': 'M', 'F': 'F'}
+
+    def __init__(self, tabela, rotulos=ROTULOS):
+        self.rotulos = tuple(rotulos)
+        self._idades, self._limites = {}, {}
+        for sexo, linhas in tabela.items():
+            linhas = sorted(linhas)
+            idades = [float(idade) for idade, _ in linhas]
+            if len(set(idades)) != len(idades):
+                raise ValueError(f"Idade repetida na tabela do sexo {sexo}.")
+            for _, limites in linhas:
+                _validar_limites(tuple(limites), self.rotulos)
+            self._idades[sexo] = idades
+            self._limites[sexo] = [tuple(float(limite) for limite in limites) for _, limites in linhas]
+
+    @classmethod
+    def de_csv(cls, caminho, percentis=PERCENTIS, rotulos=ROTULOS):
+        """
+        Lê uma tabela de IMC por idade no formato do CDC (bmiagerev.csv): colunas Sex (1 = masculino,
+        2 = feminino), Agemos (idade em meses) e P5, P85, P95... (o IMC em cada percentil).
+        """
+        tabela = {}
+        with open(caminho, newline='', encoding='utf-8-sig') as arquivo:
+            for linha in csv.DictReader(arquivo):
+                sexo = cls.SEXOS.get(linha['Sex'].strip())
+                if sexo is None:  # O arquivo do CDC repete o cabeçalho no meio
+                    continue
+                limites = tuple(float(linha[f'P{percentil}']) for percentil in percentis)
+                tabela.setdefault(sexo, []).append((float(linha['Agemos']), limites))
+        return cls(tabela, rotulos)
+
+    @classmethod
+    def _sexo(cls, sexo):
+        return cls.SEXOS.get(str(sexo).strip().upper(), sexo)
+
+    def _linha(self, sexo, idade_meses):
+        sexo = self._sexo(sexo)
+        idades = self._idades.get(sexo)
+        if idades is None or not idades[0] <= idade_meses < idades[-1] + 1:
+            return None
+        return self._limites[sexo][bisect.bisect_right(idades, idade_meses) - 1]
+
+    def classificar(self, valor, sexo, idade_meses):
+        limites = self._linha(sexo, idade_meses)
+        if limites is None or valor != valor:
+            return DADOS_INVALIDOS
+        return self.rotulos[bisect.bisect_right(limites, valor)]
+
+    def classificar_lote(self, valores, sexos, idades_meses):
+        """Classifica arrays de IMC, sexo e idade em meses (do mesmo tamanho). Retorna um array numpy de rótulos."""
+        _exigir_numpy()
+        valores = np.asarray(valores, dtype=np.float64)
+        idades_meses = np.asarray(idades_meses, dtype=np.float64)
+        sexos = np.array([self._sexo(sexo) for sexo in sexos], dtype=object)
+        indices = np.full(valores.shape, len(self.rotulos))
+        for sexo, idades in self._idades.items():
+            idades = np.asarray(idades)
+            limites = np.asarray(self._limites[sexo])
+            linhas = np.searchsorted(idades, idades_meses, side='right') - 1
+            validos = (sexos == sexo) & (linhas >= 0) & (idades_meses < idades[-1] + 1) & ~np.isnan(valores)
+            # Faixa = quantos limites da linha da idade o valor alcança (o mesmo que o bisect_right de classificar)
+            indices[validos] = (valores[validos, None] >= limites[linhas[validos]]).sum(axis=1)
+        return np.array(self.rotulos + (DADOS_INVALIDOS,), dtype=object)[indices]
+
+
+ADULTO = Faixas((18.5, 25, 30), ('Abaixo do peso', 'Peso normal', 'Sobrepeso', 'Obesidade'))
+ADULTO_OMS = Faixas(
+    (18.5, 25, 30, 35, 40),
+    ('Abaixo do peso', 'Peso normal', 'Sobrepeso', 'Obesidade grau I', 'Obesidade grau II', 'Obesidade grau III'),
+)
+TABELAS = {'adulto': ADULTO, 'adulto_oms': ADULTO_OMS}
+
+
+def faixas_configuradas():
+    """Tabela escolhida em IMC_FAIXAS (padrão: 'adulto')."""
+    nome = getattr(settings, 'IMC_FAIXAS', 'adulto')
+    try:
+        return TABELAS[nome]
+    except KeyError:
+        raise ImproperlyConfigured(f"IMC_FAIXAS deve ser um de {', '.join(TABELAS)} (recebido: {nome!r}).")
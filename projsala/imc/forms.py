@@ -0,0 +1,14 @@
+from django import forms
+
+
+class MedidasIMCForm(forms.Form):
+    """Validação das medidas recebidas pela API de IMC (imc:calcular_imc_api)."""
+
+    altura = forms.FloatField(min_value=0.3, max_value=3.0, label='Altura (m)')
+    peso = forms.FloatField(min_value=1, max_value=700, label='Peso (kg)')
+
+
+class MedicaoIMCForm(MedidasIMCForm):
+    """Medidas de uma medição a gravar (imc:registrar_medicao_api), com o código do paciente (Paciente.codigo)."""
+
+    paciente = forms.CharField(max_length=50, label='Paciente')
@@ -0,0 +1,58 @@
+import random
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from imc.classificacao import TABELAS
+
+
+class Command(BaseCommand):
+    help = (
+        "Mede a classificação por faixas (imc.classificacao): um valor isolado com bisect contra a cadeia "
+        "de if/elif que ela substituiu, e um lote com classificar_lote contra um laço com classificar. "
+        "As propriedades das faixas são conferidas pelos testes (imc.tests.ClassificacaoTests)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--valores', type=int, default=1000000, help="Valores do lote medido (padrão: 1000000).")
+
+    def handle(self, *args, **options):
+        self._medir(TABELAS['adulto_oms'], options['valores'])
+
+    def _medir(self, faixas, total):
+        aleatorio = random.Random(7)
+        valores = [aleatorio.uniform(12, 50) for _ in range(total)]
+
+        def cadeia(imc):
+            # A cadeia de if/elif que a busca binária substituiu, com os mesmos limites
+            if imc < 18.5:
+                return 'Abaixo do peso'
+            elif imc < 25:
+                return 'Peso normal'
+            elif imc < 30:
+                return 'Sobrepeso'
+            elif imc < 35:
+                return 'Obesidade grau I'
+            elif imc < 40:
+                return 'Obesidade grau II'
+            return 'Obesidade grau III'
+
+        amostra = valores[:100000]
+        for nome, classificar in (("if/elif", cadeia), ("bisect", faixas.classificar)):
+            inicio = time.perf_counter()
+            for valor in amostra:
+                classificar(valor)
+            duracao = time.perf_counter() - inicio
+            self.stdout.write(f"Valor isolado ({nome:<7}) {duracao / len(amostra) * 1e9:>8.0f} ns por valor")
+
+        inicio = time.perf_counter()
+        for valor in valores:
+            faixas.classificar(valor)
+        duracao_laco = time.perf_counter() - inicio
+        array = np.asarray(valores)
+        inicio = time.perf_counter()
+        faixas.classificar_lote(array)
+        duracao_lote = time.perf_counter() - inicio
+        self.stdout.write(f"Lote de {total}: laço com classificar {duracao_laco:.3f} s, classificar_lote {duracao_lote:.3f} s "
+                          f"({duracao_laco / duracao_lote:.0f}x)")
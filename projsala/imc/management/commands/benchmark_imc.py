@@ -0,0 +1,89 @@
+import random
+import tempfile
+import time
+import tracemalloc
+from functools import partial
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+
+from imc.services import IMCService, TAMANHO_LOTE
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara o cálculo de IMC linha a linha (IMCService.calcular_imc) com o cálculo vetorizado "
+        "(IMCService.calcular_imc_lote), confere que os resultados coincidem e mede o caminho completo "
+        "de uma planilha CSV (leitura, cálculo e geração da resposta), com o arquivo inteiro na memória "
+        "e lido por partes (IMCService.processar_csv)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--linhas', type=int, default=1000000, help="Linhas da planilha (padrão: 1000000).")
+
+    def handle(self, *args, **options):
+        total = options['linhas']
+        aleatorio = random.Random(42)
+        alturas = [round(aleatorio.uniform(1.40, 2.05), 2) for _ in range(total)]
+        pesos = [round(aleatorio.uniform(35, 160), 1) for _ in range(total)]
+        servico = IMCService()
+
+        inicio = time.perf_counter()
+        escalar = [servico.calcular_imc(altura, peso) for altura, peso in zip(alturas, pesos)]
+        duracao_escalar = time.perf_counter() - inicio
+        self._linha("Linha a linha", total, duracao_escalar)
+
+        inicio = time.perf_counter()
+        imc, classificacoes = servico.calcular_imc_lote(alturas, pesos)
+        duracao_lote = time.perf_counter() - inicio
+        self._linha("Vetorizado", total, duracao_lote)
+        self.stdout.write(f"Vetorizado é {duracao_escalar / duracao_lote:.0f}x mais rápido (incluindo a conversão das listas)")
+        arrays = np.asarray(alturas), np.asarray(pesos)
+        inicio = time.perf_counter()
+        servico.calcular_imc_lote(*arrays)
+        duracao_arrays = time.perf_counter() - inicio
+        self._linha("Só o cálculo", total, duracao_arrays)
+        self.stdout.write(f"A partir de arrays, como vêm de ler_csv: {duracao_escalar / duracao_arrays:.0f}x mais rápido")
+
+        diferentes = sum(
+            resultado['classificacao'] != classificacao
+            for resultado, classificacao in zip(escalar, classificacoes.tolist())
+        )
+        if diferentes or not np.allclose([resultado['imc'] for resultado in escalar], imc):
+            raise CommandError(f"O cálculo vetorizado difere do linha a linha ({diferentes} classificação(ões)).")
+
+        planilha = 'altura;peso\n' + ''.join(
+            f"{str(altura).replace('.', ',')};{str(peso).replace('.', ',')}\n" for altura, peso in zip(alturas, pesos)
+        )
+        with tempfile.TemporaryFile() as arquivo:
+            arquivo.write(planilha.encode())
+            del planilha
+            self._comparar_leitura(servico, arquivo, total)
+        self.stdout.write(self.style.SUCCESS("Cálculo vetorizado confere com o linha a linha."))
+
+    def _comparar_leitura(self, servico, arquivo, total):
+        """Planilha inteira na memória (ler_csv + gerar_csv) contra leitura por partes (processar_csv)."""
+        def inteira():
+            arquivo.seek(0)
+            return servico.gerar_csv(*servico.ler_csv(arquivo.read().decode()))
+
+        def por_partes():
+            arquivo.seek(0)
+            return servico.processar_csv(iter(partial(arquivo.read, TAMANHO_LOTE), b''))
+
+        self.stdout.write(f"Planilha de {arquivo.tell() / 2**20:.1f} MiB, lida do disco:")
+        for nome, processar in (("CSV inteiro", inteira), ("CSV em partes", por_partes)):
+            inicio = time.perf_counter()
+            tamanho = sum(len(bloco) for bloco in processar())
+            duracao = time.perf_counter() - inicio
+            # O pico de memória é medido numa segunda execução, pois o tracemalloc deixa o processamento mais lento
+            tracemalloc.start()
+            for _ in processar():
+                pass
+            pico = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            self._linha(nome, total, duracao)
+            self.stdout.write(f"{'':<14} pico de memória {pico / 2**20:.1f} MiB, resposta de {tamanho / 2**20:.1f} MiB")
+
+    def _linha(self, nome, total, duracao):
+        self.stdout.write(f"{nome:<14} {total:>9} linhas em {duracao:>7.3f} s ({total / duracao:>12.0f}/s)")
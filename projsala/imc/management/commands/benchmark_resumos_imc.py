@@ -0,0 +1,114 @@
+import math
+import random
+import statistics
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Avg, Count
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from imc.models import IMC, Paciente, ResumoIMC
+from imc.services import IMCService, MEDICOES_POR_LOTE
+
+
+class _Rollback(Exception):
+    """Usada para desfazer os dados de teste ao final do benchmark."""
+
+
+class Command(BaseCommand):
+    help = (
+        "Grava medições de IMC em lote com IMCService.registrar_medicoes (padrão: um milhão, em dois anos), "
+        "confere os resumos mantidos na inserção com os recalculados e compara o painel mensal lido dos "
+        "resumos com a agregação das medições. Mede também o histórico de um paciente. Os dados são desfeitos ao final."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--medicoes', type=int, default=1000000, help="Medições gravadas (padrão: 1000000).")
+        parser.add_argument('--pacientes', type=int, default=10000, help="Pacientes (padrão: 10000).")
+        parser.add_argument('--lote', type=int, default=MEDICOES_POR_LOTE, help=f"Medições por lote (padrão: {MEDICOES_POR_LOTE}).")
+        parser.add_argument('--repeticoes', type=int, default=20, help="Execuções medidas de cada consulta (padrão: 20).")
+
+    def handle(self, *args, **options):
+        falhas = []
+        try:
+            with transaction.atomic():
+                pacientes = Paciente.objects.bulk_create([
+                    Paciente(nome=f"Paciente {i}", codigo=f"benchmark-{i}") for i in range(options['pacientes'])
+                ])
+                servico = IMCService()
+                self._registrar(servico, pacientes, options['medicoes'], options['lote'])
+                falhas = self._conferir(servico)
+                self._medir_painel(servico, options['repeticoes'])
+                self._medir_historico(servico, pacientes, options['repeticoes'])
+                raise _Rollback()
+        except _Rollback:
+            pass
+        if falhas:
+            raise CommandError(f"{len(falhas)} resumo(s) diferente(s) do recalculado: {', '.join(falhas[:10])}")
+        self.stdout.write(self.style.SUCCESS("Resumos mantidos na inserção conferem com as medições."))
+
+    def _registrar(self, servico, pacientes, total, lote):
+        aleatorio = random.Random(42)
+        fim = timezone.now()
+        segundos = int(timedelta(days=730).total_seconds())
+        registros = (
+            {
+                'paciente': aleatorio.choice(pacientes).id,
+                'altura': round(aleatorio.uniform(1.40, 2.05), 2),
+                'peso': round(aleatorio.uniform(35, 160), 1),
+                'data': fim - timedelta(seconds=aleatorio.randrange(segundos)),
+            }
+            for _ in range(total)
+        )
+        inicio = time.perf_counter()
+        gravadas, ignoradas = servico.registrar_medicoes(registros, lote)
+        duracao = time.perf_counter() - inicio
+        self.stdout.write(
+            f"{gravadas} medições gravadas em {duracao:.2f} s ({gravadas / duracao:.0f}/s), {ignoradas} ignorada(s); "
+            f"{ResumoIMC.objects.count()} resumos"
+        )
+
+    @staticmethod
+    def _conferir(servico):
+        calculados = servico.resumos_calculados()
+        gravados = {
+            (periodo, inicio, classificacao): (quantidade, soma_imc)
+            for periodo, inicio, classificacao, quantidade, soma_imc in ResumoIMC.objects.values_list(
+                'periodo', 'inicio', 'classificacao', 'quantidade', 'soma_imc'
+            )
+        }
+        return [
+            f"{chave[0]} {chave[1]} {chave[2]}" for chave in calculados.keys() | gravados.keys()
+            if chave not in gravados or chave not in calculados
+            or gravados[chave][0] != calculados[chave][0]
+            or not math.isclose(gravados[chave][1], calculados[chave][1], rel_tol=1e-9)
+        ]
+
+    def _medir_painel(self, servico, repeticoes):
+        """Painel mensal (média e distribuição) a partir dos resumos contra a agregação das medições."""
+        def das_medicoes():
+            return list(
+                IMC.objects.annotate(mes=TruncMonth('data')).values('mes', 'classificacao')
+                .annotate(quantidade=Count('id'), media=Avg('imc')).order_by('mes', 'classificacao')
+            )
+
+        for nome, consulta in (("Painel (resumos)", lambda: servico.resumo(ResumoIMC.MES)), ("Painel (medições)", das_medicoes)):
+            self._medir(nome, consulta, repeticoes)
+
+    def _medir_historico(self, servico, pacientes, repeticoes):
+        aleatorio = random.Random(7)
+        self._medir("Histórico", lambda: list(servico.historico(aleatorio.choice(pacientes))), repeticoes * 10)
+        self.stdout.write(servico.historico(pacientes[0]).explain())
+
+    def _medir(self, nome, consulta, repeticoes):
+        tempos = []
+        for _ in range(repeticoes):
+            inicio = time.perf_counter()
+            consulta()
+            tempos.append((time.perf_counter() - inicio) * 1000)
+        tempos.sort()
+        p95 = tempos[math.ceil(len(tempos) * 0.95) - 1]
+        self.stdout.write(f"{nome:<18} média {statistics.mean(tempos):>9.3f} ms, p95 {p95:>9.3f} ms")
@@ -0,0 +1,140 @@
+import asyncio
+import importlib.util
+import json
+import math
+import random
+import secrets
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+try:
+    import httpx
+except ImportError:  # Opcional: só o teste de carga usa
+    httpx = None
+
+
+class Command(BaseCommand):
+    help = (
+        "Teste de carga do cálculo de IMC: dispara requisições simultâneas (conexões keep-alive do httpx, "
+        "pip install httpx) contra a API JSON assíncrona (imc:calcular_imc_api) e contra o caminho síncrono "
+        "atual (formulário HTML, imc:calcular_imc), e informa requisições por segundo e latências. Sem --url, "
+        "sobe o projeto no uvicorn (pip install uvicorn) numa porta livre e o encerra ao final."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', help="Servidor já em execução (ex.: http://127.0.0.1:8000); padrão: sobe o uvicorn.")
+        parser.add_argument('--requisicoes', type=int, default=5000, help="Requisições por caminho (padrão: 5000).")
+        parser.add_argument('--concorrencia', type=int, default=50, help="Conexões simultâneas (padrão: 50).")
+        parser.add_argument('--workers', type=int, default=1, help="Processos do uvicorn (padrão: 1).")
+        parser.add_argument('--token', default='', help="Token da API, se IMC_API_TOKENS estiver configurado.")
+
+    def handle(self, *args, **options):
+        if httpx is None:
+            raise CommandError("O teste de carga usa o cliente httpx: pip install httpx.")
+        servidor = None
+        url = options['url']
+        if url is None:
+            servidor, url = self._subir_uvicorn(options['workers'])
+        try:
+            self.stdout.write(
+                f"{url}: {options['requisicoes']} requisições por caminho, {options['concorrencia']} conexões simultâneas"
+            )
+            resultados = {}
+            for nome, montar in (("API assíncrona", self._api(options['token'])), ("Formulário síncrono", self._formulario())):
+                # Aquecimento (importações, conexões), fora da medição
+                asyncio.run(self._carga(url, montar, min(200, options['requisicoes']), options['concorrencia']))
+                resultados[nome] = asyncio.run(self._carga(url, montar, options['requisicoes'], options['concorrencia']))
+        finally:
+            if servidor is not None:
+                servidor.terminate()
+                servidor.wait(10)
+
+        for nome, (duracao, latencias, erros) in resultados.items():
+            latencias.sort()
+            p95 = latencias[math.ceil(len(latencias) * 0.95) - 1] if latencias else 0
+            self.stdout.write(
+                f"{nome:<20} {len(latencias) / duracao:>8.0f} req/s, latência média {statistics.mean(latencias or [0]):>7.2f} ms, "
+                f"p95 {p95:>7.2f} ms, erros {erros}"
+            )
+        if any(erros for _, _, erros in resultados.values()):
+            raise CommandError("Houve respostas com erro: confira o token (--token) e os logs do servidor.")
+
+    def _subir_uvicorn(self, workers):
+        if importlib.util.find_spec('uvicorn') is None:
+            raise CommandError("O teste de carga sobe o projeto no uvicorn: pip install uvicorn (ou informe --url).")
+        with socket.socket() as livre:
+            livre.bind(('127.0.0.1', 0))
+            porta = livre.getsockname()[1]
+        servidor = subprocess.Popen(
+            [sys.executable, '-m', 'uvicorn', 'projsala.asgi:application', '--host', '127.0.0.1', '--port', str(porta),
+             '--workers', str(workers), '--log-level', 'warning', '--no-access-log'],
+            cwd=settings.BASE_DIR,
+        )
+        limite = time.monotonic() + 30
+        while time.monotonic() < limite:
+            if servidor.poll() is not None:
+                raise CommandError("O uvicorn terminou ao iniciar; veja a saída acima.")
+            try:
+                socket.create_connection(('127.0.0.1', porta), timeout=1).close()
+                return servidor, f'http://127.0.0.1:{porta}'
+            except OSError:
+                time.sleep(0.2)
+        servidor.terminate()
+        raise CommandError("O uvicorn não aceitou conexões em 30 s.")
+
+    @staticmethod
+    def _medidas(aleatorio):
+        return round(aleatorio.uniform(1.40, 2.05), 2), round(aleatorio.uniform(35, 160), 1)
+
+    def _api(self, token):
+        cabecalhos = {'Content-Type': 'application/json'}
+        if token:
+            cabecalhos['Authorization'] = f'Bearer {token}'
+
+        def montar(aleatorio):
+            altura, peso = self._medidas(aleatorio)
+            return '/imc/api/calcular/', cabecalhos, json.dumps({'altura': altura, 'peso': peso}).encode()
+        return montar
+
+    def _formulario(self):
+        # O formulário exige CSRF: um segredo qualquer no cookie, repetido no cabeçalho, como faria o navegador
+        segredo = secrets.token_hex(16)
+        cabecalhos = {
+            'Content-Type': 'application/x-www-form-urlencoded',
+            'Cookie': f'csrftoken={segredo}',
+            'X-CSRFToken': segredo,
+        }
+
+        def montar(aleatorio):
+            altura, peso = self._medidas(aleatorio)
+            return '/imc/processar/', cabecalhos, urlencode({'altura': altura, 'peso': peso}).encode()
+        return montar
+
+    async def _carga(self, url, montar, total, concorrencia):
+        """Executa `total` requisições POST em `concorrencia` conexões. Retorna (duração, latências em ms, erros)."""
+        restantes = iter(range(total))
+        latencias, erros = [], 0
+        limites = httpx.Limits(max_connections=concorrencia, max_keepalive_connections=concorrencia)
+
+        async with httpx.AsyncClient(base_url=url, limits=limites, timeout=30) as cliente:
+            async def conexao(numero):
+                nonlocal erros
+                aleatorio = random.Random(numero)
+                for _ in restantes:
+                    caminho, cabecalhos, corpo = montar(aleatorio)
+                    inicio = time.perf_counter()
+                    resposta = await cliente.post(caminho, headers=cabecalhos, content=corpo)
+                    latencias.append((time.perf_counter() - inicio) * 1000)
+                    if resposta.status_code != 200:
+                        erros += 1
+
+            inicio = time.perf_counter()
+            await asyncio.gather(*(conexao(numero) for numero in range(concorrencia)))
+            return time.perf_counter() - inicio, latencias, erros
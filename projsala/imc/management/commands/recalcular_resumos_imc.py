@@ -0,0 +1,63 @@
+import math
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from imc.models import ResumoIMC
+from imc.services import IMCService
+
+
+class Command(BaseCommand):
+    help = (
+        "Confere os resumos de IMC (ResumoIMC) com os recalculados a partir das medições, informa as "
+        "divergências e, se houver alguma, refaz os resumos do período."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--desde', type=date.fromisoformat,
+            help="Confere apenas a partir do mês desta data (AAAA-MM-DD); padrão: todas as medições."
+        )
+        parser.add_argument(
+            '--verificar', action='store_true',
+            help="Apenas informa as divergências, sem corrigir (termina com erro se houver alguma)."
+        )
+        parser.add_argument('--exemplos', type=int, default=10, help="Divergências detalhadas na saída (padrão: 10).")
+
+    def handle(self, *args, **options):
+        servico = IMCService()
+        calculados = servico.resumos_calculados(options['desde'])
+        gravados = ResumoIMC.objects.all()
+        if options['desde'] is not None:
+            gravados = gravados.filter(inicio__gte=options['desde'].replace(day=1))
+        gravados = {
+            (periodo, inicio, classificacao): (quantidade, soma_imc)
+            for periodo, inicio, classificacao, quantidade, soma_imc in gravados.values_list(
+                'periodo', 'inicio', 'classificacao', 'quantidade', 'soma_imc'
+            )
+        }
+
+        divergentes = [
+            chave for chave in sorted(calculados.keys() | gravados.keys())
+            if not self._iguais(gravados.get(chave), calculados.get(chave))
+        ]
+        for periodo, inicio, classificacao in divergentes[:options['exemplos']]:
+            chave = (periodo, inicio, classificacao)
+            self.stdout.write(self.style.WARNING(
+                f"{periodo} {inicio} {classificacao}: {gravados.get(chave)} -> {calculados.get(chave)}"
+            ))
+        self.stdout.write(f"{len(calculados.keys() | gravados.keys())} resumos conferidos, {len(divergentes)} divergente(s).")
+        if not divergentes:
+            self.stdout.write(self.style.SUCCESS("Resumos de IMC consistentes."))
+            return
+        if options['verificar']:
+            raise CommandError(f"{len(divergentes)} resumo(s) de IMC divergente(s).")
+        gravados = servico.recalcular_resumos(options['desde'])
+        self.stdout.write(self.style.SUCCESS(f"Resumos refeitos: {gravados} gravado(s)."))
+
+    @staticmethod
+    def _iguais(gravado, calculado):
+        # soma_imc acumula as medições em ordens diferentes: compara com tolerância
+        if gravado is None or calculado is None:
+            return gravado == calculado
+        return gravado[0] == calculado[0] and math.isclose(gravado[1], calculado[1], rel_tol=1e-9)
@@ -0,0 +1,103 @@
+# Generated by Django 5.2 on 2026-10-18 15:34
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="Paciente",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("nome", models.CharField(max_length=100)),
+                ("codigo", models.CharField(max_length=50, unique=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="ResumoIMC",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "periodo",
+                    models.CharField(
+                        choices=[("D", "Dia"), ("M", "Mês")], max_length=1
+                    ),
+                ),
+                ("inicio", models.DateField()),
+                ("classificacao", models.CharField(max_length=30)),
+                ("quantidade", models.PositiveIntegerField(default=0)),
+                ("soma_imc", models.FloatField(default=0)),
+            ],
+            options={
+                "verbose_name": "resumo de IMC",
+                "verbose_name_plural": "resumos de IMC",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("periodo", "inicio", "classificacao"),
+                        name="resumo_imc_unico",
+                    )
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="IMC",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("data", models.DateTimeField(default=django.utils.timezone.now)),
+                ("altura", models.FloatField()),
+                ("peso", models.FloatField()),
+                ("imc", models.FloatField()),
+                ("classificacao", models.CharField(max_length=30)),
+                (
+                    "paciente",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="medicoes",
+                        to="imc.paciente",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "IMC",
+                "verbose_name_plural": "IMCs",
+                "indexes": [
+                    models.Index(
+                        fields=["paciente", "data"], name="imc_paciente_data_idx"
+                    ),
+                    models.Index(fields=["data"], name="imc_data_idx"),
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2 on 2026-10-18 16:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("imc", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="imc",
+            name="paciente",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="medicoes",
+                to="imc.paciente",
+            ),
+        ),
+    ]
@@ -1,3 +1,101 @@
-from django.db import models
+from django.core.exceptions import PermissionDenied
+from django.db import models, transaction
+from django.utils import timezone
 
 # Create your models here.
+
+class Paciente(models.Model):
+    nome = models.CharField(max_length=100)
+    # Identificação do paciente nas planilhas da clínica
+    codigo = models.CharField(max_length=50, unique=True)
+
+    def __str__(self):
+        return self.nome
+
+class MedicaoImutavel(PermissionDenied):
+    """Lançada ao tentar alterar uma medição registrada (uma view que a deixe escapar responde 403)."""
+
+class IMCQuerySet(models.QuerySet):
+    """
+    Medições não são alteradas (MedicaoImutavel), e excluí-las também as desconta dos resumos
+    (ResumoIMC): os resumos só ficam corretos se toda alteração nas medições passar por eles.
+    Não há exclusão em cascata que contorne delete(): o paciente com medições é protegido.
+    """
+
+    EXCLUSOES_POR_LOTE = 5000
+
+    def update(self, **kwargs):
+        raise MedicaoImutavel("Medições não são alteradas: exclua a medição e registre a correta.")
+
+    def delete(self):
+        from .services import IMCService  # services importa os modelos
+
+        with transaction.atomic(using=self.db):
+            # Bloqueia as medições: exclusões simultâneas não descontam a mesma medição duas vezes
+            ids = list(self.select_for_update().values_list('pk', flat=True))
+            for inicio in range(0, len(ids), self.EXCLUSOES_POR_LOTE):
+                lote = self.model.objects.filter(pk__in=ids[inicio:inicio + self.EXCLUSOES_POR_LOTE])
+                IMCService.descontar_resumos(lote)
+                super(IMCQuerySet, lote).delete()
+        return len(ids), {self.model._meta.label: len(ids)}
+
+class IMC(models.Model):
+    """Uma medição: cada registro é apenas inserido (ou excluído), e os resumos (ResumoIMC) acompanham."""
+    # Sem índice próprio: o índice (paciente, data) atende também as buscas só por paciente.
+    # PROTECT: a exclusão em cascata não passaria por IMCQuerySet.delete e deixaria as medições nos resumos
+    paciente = models.ForeignKey(Paciente, on_delete=models.PROTECT, related_name='medicoes', db_index=False)
+    data = models.DateTimeField(default=timezone.now)
+    altura = models.FloatField()
+    peso = models.FloatField()
+    imc = models.FloatField()
+    classificacao = models.CharField(max_length=30)
+
+    objects = IMCQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = 'IMC'
+        verbose_name_plural = 'IMCs'
+        indexes = [
+            # Histórico de um paciente, em ordem de data (IMCService.historico)
+            models.Index(fields=['paciente', 'data'], name='imc_paciente_data_idx'),
+            # Medições de um período, para recalcular os resumos (comando recalcular_resumos_imc)
+            models.Index(fields=['data'], name='imc_data_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.paciente} em {self.data:%d/%m/%Y}: {self.imc:.2f} ({self.classificacao})'
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise MedicaoImutavel("Medições não são alteradas: exclua a medição e registre a correta.")
+        super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        return IMC.objects.filter(pk=self.pk).delete()
+
+class ResumoIMC(models.Model):
+    """
+    Totais das medições de um dia ou de um mês para uma classificação, mantidos por
+    IMCService.registrar_medicoes a cada inserção e por IMCQuerySet.delete a cada exclusão. A média do período é a soma de soma_imc
+    dividida pela soma de quantidade das classificações; a distribuição é a quantidade de cada uma.
+    """
+    DIA = 'D'
+    MES = 'M'
+    PERIODOS = [(DIA, 'Dia'), (MES, 'Mês')]
+
+    periodo = models.CharField(max_length=1, choices=PERIODOS)
+    # Primeiro dia do período (no fuso atual)
+    inicio = models.DateField()
+    classificacao = models.CharField(max_length=30)
+    quantidade = models.PositiveIntegerField(default=0)
+    soma_imc = models.FloatField(default=0)
+
+    class Meta:
+        verbose_name = 'resumo de IMC'
+        verbose_name_plural = 'resumos de IMC'
+        constraints = [
+            models.UniqueConstraint(fields=['periodo', 'inicio', 'classificacao'], name='resumo_imc_unico'),
+        ]
+
+    def __str__(self):
+        return f'{self.get_periodo_display()} {self.inicio:%d/%m/%Y} - {self.classificacao}: {self.quantidade}'
@@ -1,18 +1,439 @@
+import codecs
+import csv
+import io
+import itertools
+import json
+import warnings
+from collections import defaultdict
+from datetime import datetime, time
+
+from django.core.exceptions import ImproperlyConfigured, ValidationError
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate, TruncMonth
+from django.utils import timezone
+
+from .classificacao import DADOS_INVALIDOS, faixas_configuradas
+from .models import IMC, ResumoIMC
+
+try:
+    import numpy as np
+except ImportError:  # Só o cálculo em lote depende do numpy
+    np = None
+
+LINHAS_POR_BLOCO = 10000  # Linhas formatadas de cada vez na resposta do cálculo em lote
+TAMANHO_LOTE = 2**20  # Bytes de CSV lidos, calculados e respondidos de cada vez por processar_csv
+MEDICOES_POR_LOTE = 5000
+
+
+def _exigir_numpy():
+    if np is None:
+        raise ImproperlyConfigured("O cálculo de IMC em lote requer o pacote numpy (pip install numpy).")
+
+
 class IMCService:
+    def __init__(self, faixas=None):
+        # Tabela de classificação (imc.classificacao.Faixas); padrão: a escolhida em IMC_FAIXAS
+        self.faixas = faixas or faixas_configuradas()
+
     def calcular_imc(self,altura,peso):
         imc= peso/(altura*altura)
-        if imc < 18.5:
-            classificacao = 'Abaixo do peso'
-        elif imc < 24.9:
-            classificacao = 'Peso normal'
-        elif imc < 29.9:
-            classificacao = 'Sobrepeso'
-        else:
-            classificacao = 'Obesidade'
+        classificacao = self.faixas.classificar(imc)
         dicionario_imc= {
             'imc': imc,
             'classificacao': classificacao,
             'altura': altura,
             'peso': peso,
         }
-        return dicionario_imc
\ No newline at end of file
+        return dicionario_imc
+
+    def calcular_imc_lote(self, alturas, pesos):
+        """
+        Versão vetorizada de calcular_imc: recebe sequências (ou arrays) de alturas e pesos e retorna
+        (imc, classificacoes), dois arrays numpy do mesmo tamanho. Linhas com altura ou peso ausente,
+        não numérico ou não positivo, ou cujo IMC não é finito, têm IMC NaN e classificação DADOS_INVALIDOS.
+        """
+        _exigir_numpy()
+        alturas = np.asarray(alturas, dtype=np.float64)
+        pesos = np.asarray(pesos, dtype=np.float64)
+        if alturas.shape != pesos.shape:
+            raise ValidationError("Alturas e pesos precisam ter a mesma quantidade de valores.")
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            imc = pesos / (alturas * alturas)
+        # O IMC também precisa ser finito: alturas muito pequenas (1e-200) dão quadrado 0 e IMC infinito
+        validos = np.isfinite(alturas) & np.isfinite(pesos) & (alturas > 0) & (pesos > 0) & np.isfinite(imc)
+        imc = np.where(validos, imc, np.nan)
+        return imc, self.faixas.classificar_lote(imc)
+
+    def ler_csv(self, texto):
+        """
+        Lê as colunas altura e peso de um CSV com cabeçalho (separado por vírgula ou ponto e vírgula,
+        aceitando vírgula decimal) e retorna (alturas, pesos) como arrays numpy.
+        """
+        _exigir_numpy()
+        cabecalho, _, linhas = texto.partition('\n')
+        return self._ler_linhas(linhas, *self._ler_cabecalho(cabecalho))
+
+    def processar_csv(self, blocos, formato='csv'):
+        """
+        Versão em streaming de ler_csv + gerar_csv (ou gerar_json): `blocos` é um iterável de bytes em
+        UTF-8 (os pedaços de um arquivo enviado, por exemplo), lido aos poucos, TAMANHO_LOTE bytes de
+        cada vez. Cada lote é convertido, calculado e formatado antes do próximo ser lido, de modo que
+        a memória usada não depende do tamanho do arquivo. O cabeçalho é lido e validado já nesta
+        chamada (ValidationError antes de a resposta começar); retorna o iterador de blocos de texto.
+        """
+        _exigir_numpy()
+        textos = self._textos(blocos)
+        cabecalho, _, linhas = next(textos, '').partition('\n')
+        separador, colunas = self._ler_cabecalho(cabecalho)
+        lotes = (
+            (alturas, pesos, *self.calcular_imc_lote(alturas, pesos))
+            for alturas, pesos in (
+                self._ler_linhas(texto, separador, colunas) for texto in itertools.chain([linhas], textos)
+            )
+        )
+        return self._blocos_json(lotes) if formato == 'json' else self._blocos_csv(lotes)
+
+    @classmethod
+    def _textos(cls, blocos):
+        """Decodifica os blocos de bytes e os reagrupa em textos de ~TAMANHO_LOTE bytes terminados em fim de registro."""
+        # Bytes inválidos viram \ufffd: o valor da linha fica inválido, sem interromper uma resposta já iniciada
+        decodificador = codecs.getincrementaldecoder('utf-8-sig')(errors='replace')
+        pendente, tamanho = [], 0
+        for bloco in blocos:
+            pendente.append(decodificador.decode(bloco))
+            tamanho += len(bloco)
+            if tamanho >= TAMANHO_LOTE:
+                texto = ''.join(pendente)
+                corte = cls._fim_registro(texto) + 1
+                if corte:
+                    yield texto[:corte]
+                    pendente, tamanho = [texto[corte:]], len(texto) - corte
+        texto = ''.join(pendente) + decodificador.decode(b'', final=True)
+        if texto:
+            yield texto
+
+    @staticmethod
+    def _fim_registro(texto):
+        """
+        Posição do último fim de linha de `texto` fora de aspas (-1 se não houver), onde o CSV pode ser
+        cortado sem partir um campo entre aspas com quebras de linha. `texto` começa num início de registro:
+        o fim de linha está fora de aspas quando há um número par de aspas antes dele ("" conta duas vezes).
+        """
+        aspas, fim = texto.count('"'), len(texto)
+        corte = texto.rfind('\n')
+        while corte >= 0:
+            aspas -= texto.count('"', corte, fim)
+            if aspas % 2 == 0:
+                break
+            fim, corte = corte, texto.rfind('\n', 0, corte)
+        return corte
+
+    @staticmethod
+    def _ler_cabecalho(linha):
+        """Retorna (separador, (coluna da altura, coluna do peso)) a partir da linha de cabeçalho."""
+        separador = ';' if ';' in linha else ','
+        cabecalho = [coluna.strip().lower() for coluna in next(csv.reader([linha], delimiter=separador), [])]
+        if 'altura' not in cabecalho or 'peso' not in cabecalho:
+            raise ValidationError("O CSV precisa de um cabeçalho com as colunas altura e peso.")
+        return separador, (cabecalho.index('altura'), cabecalho.index('peso'))
+
+    def _ler_linhas(self, texto, separador, colunas):
+        """Lê (alturas, pesos) das linhas de dados de um CSV, sem o cabeçalho."""
+        if separador == ';':
+            # Com ponto e vírgula separando as colunas, a vírgula só pode ser decimal
+            texto = texto.replace(',', '.')
+        try:
+            # Caminho rápido: o texto inteiro é lido pelo numpy, sem passar linha a linha pelo Python
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore', UserWarning)  # Texto sem nenhuma linha de dados
+                valores = np.loadtxt(
+                    io.StringIO(texto), delimiter=separador, usecols=colunas,
+                    dtype=np.float64, ndmin=2, comments=None, quotechar='"', encoding=None,
+                )
+            return valores[:, 0], valores[:, 1]
+        except ValueError:
+            pass
+        # Há valores vazios, não numéricos ou com vírgula decimal entre aspas: lê com o módulo csv
+        alturas, pesos = [], []
+        for linha in csv.reader(io.StringIO(texto), delimiter=separador):
+            if not any(valor.strip() for valor in linha):
+                continue
+            alturas.append(linha[colunas[0]] if colunas[0] < len(linha) else '')
+            pesos.append(linha[colunas[1]] if colunas[1] < len(linha) else '')
+        return self._numeros(alturas), self._numeros(pesos)
+
+    def ler_json(self, texto):
+        """
+        Lê alturas e pesos de um JSON: uma lista de objetos ({"altura": 1.75, "peso": 70}) ou um objeto
+        com as listas {"altura": [...], "peso": [...]}. Retorna (alturas, pesos) como arrays numpy.
+        """
+        try:
+            dados = json.loads(texto)
+        except ValueError:
+            raise ValidationError("JSON inválido.")
+        if isinstance(dados, dict) and isinstance(dados.get('altura'), list) and isinstance(dados.get('peso'), list):
+            alturas, pesos = dados['altura'], dados['peso']
+        elif isinstance(dados, list) and all(isinstance(registro, dict) for registro in dados):
+            alturas = [registro.get('altura') for registro in dados]
+            pesos = [registro.get('peso') for registro in dados]
+        else:
+            raise ValidationError('Envie uma lista de {"altura": ..., "peso": ...} ou {"altura": [...], "peso": [...]}.')
+        # Listas ou objetos no lugar de um valor mudariam a forma dos arrays ([[1.75]] vira uma matriz)
+        if any(isinstance(valor, (list, dict)) for valor in itertools.chain(alturas, pesos)):
+            raise ValidationError("Cada altura e cada peso precisa ser um número, um texto ou null.")
+        return self._numeros(alturas), self._numeros(pesos)
+
+    def gerar_csv(self, alturas, pesos):
+        """
+        Calcula o lote e retorna um iterador com o CSV de resultado (altura,peso,imc,classificacao) em
+        blocos de texto. O cálculo é feito antes, de modo que erros surgem aqui e não no meio da resposta.
+        """
+        alturas, pesos = self._numeros(alturas), self._numeros(pesos)
+        return self._blocos_csv([(alturas, pesos, *self.calcular_imc_lote(alturas, pesos))])
+
+    def gerar_json(self, alturas, pesos):
+        """Como gerar_csv, mas os blocos formam uma lista JSON de {altura, peso, imc, classificacao}."""
+        alturas, pesos = self._numeros(alturas), self._numeros(pesos)
+        return self._blocos_json([(alturas, pesos, *self.calcular_imc_lote(alturas, pesos))])
+
+    def registrar_medicoes(self, registros, lote=MEDICOES_POR_LOTE):
+        """
+        Grava medições em lote: `registros` é um iterável de dicionários com paciente (id), altura, peso
+        e data (opcional, padrão agora). A cada `lote` medições, calcula o IMC com calcular_imc_lote e,
+        numa única transação, grava as medições (bulk_create) e soma o lote aos resumos (ResumoIMC) dos
+        dias e meses envolvidos. Medições com altura ou peso inválido não são gravadas.
+        Retorna (medições gravadas, medições ignoradas).
+        """
+        registros = iter(registros)
+        gravadas = ignoradas = 0
+        agora = timezone.now()
+        while bloco := list(itertools.islice(registros, lote)):
+            alturas = self._numeros([registro['altura'] for registro in bloco])
+            pesos = self._numeros([registro['peso'] for registro in bloco])
+            imc, classificacoes = self.calcular_imc_lote(alturas, pesos)
+            medicoes = []
+            somas = defaultdict(lambda: [0, 0.0])
+            for registro, altura, peso, valor, classificacao in zip(
+                bloco, alturas.tolist(), pesos.tolist(), imc.tolist(), classificacoes.tolist()
+            ):
+                if valor != valor:  # NaN: altura ou peso inválido
+                    ignoradas += 1
+                    continue
+                data = registro.get('data') or agora
+                medicoes.append(IMC(
+                    paciente_id=registro['paciente'], data=data, altura=altura, peso=peso,
+                    imc=valor, classificacao=classificacao,
+                ))
+                dia = timezone.localdate(data)
+                for chave in ((ResumoIMC.DIA, dia, classificacao), (ResumoIMC.MES, dia.replace(day=1), classificacao)):
+                    somas[chave][0] += 1
+                    somas[chave][1] += valor
+            with transaction.atomic():
+                IMC.objects.bulk_create(medicoes)
+                self._somar_resumos(somas)
+            gravadas += len(medicoes)
+        return gravadas, ignoradas
+
+    @classmethod
+    def _somar_resumos(cls, somas):
+        """
+        Soma {(periodo, inicio, classificacao): [quantidade, soma_imc]} aos resumos, criando os que faltam.
+        Um lote de medições espalhadas por meses toca milhares de resumos: no SQLite e no PostgreSQL todos
+        são somados por um único INSERT ... ON CONFLICT DO UPDATE (executemany), que, como o UPDATE com F(),
+        soma no banco e não perde acréscimos de importações simultâneas.
+        """
+        if not connection.features.supports_update_conflicts_with_target:
+            cls._somar_resumos_um_a_um(somas)
+            return
+        tabela = connection.ops.quote_name(ResumoIMC._meta.db_table)
+        quantidade, soma_imc = connection.ops.quote_name('quantidade'), connection.ops.quote_name('soma_imc')
+        colunas = ', '.join(connection.ops.quote_name(coluna) for coluna in ('periodo', 'inicio', 'classificacao'))
+        sql = (
+            f'INSERT INTO {tabela} ({colunas}, {quantidade}, {soma_imc}) VALUES (%s, %s, %s, %s, %s) '
+            f'ON CONFLICT ({colunas}) DO UPDATE SET {quantidade} = {tabela}.{quantidade} + EXCLUDED.{quantidade}, '
+            f'{soma_imc} = {tabela}.{soma_imc} + EXCLUDED.{soma_imc}'
+        )
+        # Sempre na mesma ordem: importações simultâneas bloqueiam as mesmas linhas na mesma sequência, sem deadlock
+        with connection.cursor() as cursor:
+            cursor.executemany(sql, [
+                (periodo, connection.ops.adapt_datefield_value(inicio), classificacao, quantidade, soma_imc)
+                for (periodo, inicio, classificacao), (quantidade, soma_imc) in sorted(somas.items())
+            ])
+
+    @staticmethod
+    def _somar_resumos_um_a_um(somas):
+        """Soma cada resumo com UPDATE ... SET quantidade = quantidade + n, criando os que faltam (demais bancos)."""
+        for (periodo, inicio, classificacao), (quantidade, soma_imc) in sorted(somas.items()):
+            resumo = ResumoIMC.objects.filter(periodo=periodo, inicio=inicio, classificacao=classificacao)
+            acrescimo = {'quantidade': F('quantidade') + quantidade, 'soma_imc': F('soma_imc') + soma_imc}
+            if not resumo.update(**acrescimo):
+                # Primeira medição do período nesta classificação. Se outra importação o criou ao mesmo tempo, soma
+                try:
+                    with transaction.atomic():
+                        ResumoIMC.objects.create(
+                            periodo=periodo, inicio=inicio, classificacao=classificacao,
+                            quantidade=quantidade, soma_imc=soma_imc,
+                        )
+                except IntegrityError:
+                    resumo.update(**acrescimo)
+
+    @classmethod
+    def descontar_resumos(cls, medicoes):
+        """
+        Desconta dos resumos as medições do queryset, ainda gravadas (IMCQuerySet.delete as exclui logo
+        depois, na mesma transação), e remove os resumos que ficam sem medições.
+        """
+        tabela = connection.ops.quote_name(ResumoIMC._meta.db_table)
+        quantidade, soma_imc = connection.ops.quote_name('quantidade'), connection.ops.quote_name('soma_imc')
+        chave = ' AND '.join(f'{connection.ops.quote_name(coluna)} = %s' for coluna in ('periodo', 'inicio', 'classificacao'))
+        # Só UPDATE: os resumos das medições já existem, e o INSERT ... ON CONFLICT de _somar_resumos
+        # esbarraria na restrição quantidade >= 0 com uma quantidade negativa
+        sql = f'UPDATE {tabela} SET {quantidade} = {quantidade} - %s, {soma_imc} = {soma_imc} - %s WHERE {chave}'
+        with connection.cursor() as cursor:
+            cursor.executemany(sql, [
+                (total, soma, periodo, connection.ops.adapt_datefield_value(inicio), classificacao)
+                for (periodo, inicio, classificacao), (total, soma) in sorted(cls._totais(medicoes).items())
+            ])
+        ResumoIMC.objects.filter(quantidade=0).delete()
+
+    def resumo(self, periodo=ResumoIMC.MES, inicio=None, fim=None):
+        """
+        Média do IMC e distribuição das classificações por dia (ResumoIMC.DIA) ou mês (ResumoIMC.MES),
+        lidas só dos resumos, sem percorrer as medições. inicio e fim (datas, inclusive) limitam os períodos.
+        Retorna uma lista de {inicio, quantidade, media, distribuicao: {classificacao: quantidade}}.
+        """
+        resumos = ResumoIMC.objects.filter(periodo=periodo)
+        if inicio is not None:
+            resumos = resumos.filter(inicio__gte=inicio)
+        if fim is not None:
+            resumos = resumos.filter(inicio__lte=fim)
+        periodos = {}
+        for inicio_periodo, classificacao, quantidade, soma_imc in resumos.order_by('inicio', 'classificacao').values_list(
+            'inicio', 'classificacao', 'quantidade', 'soma_imc'
+        ):
+            dados = periodos.setdefault(inicio_periodo, {'inicio': inicio_periodo, 'quantidade': 0, 'soma': 0.0, 'distribuicao': {}})
+            dados['quantidade'] += quantidade
+            dados['soma'] += soma_imc
+            dados['distribuicao'][classificacao] = quantidade
+        for dados in periodos.values():
+            dados['media'] = dados.pop('soma') / dados['quantidade'] if dados['quantidade'] else None
+        return list(periodos.values())
+
+    def historico(self, paciente, inicio=None, fim=None):
+        """Medições de um paciente em ordem de data, pelo índice (paciente, data); inicio e fim são datetimes."""
+        medicoes = IMC.objects.filter(paciente=paciente)
+        if inicio is not None:
+            medicoes = medicoes.filter(data__gte=inicio)
+        if fim is not None:
+            medicoes = medicoes.filter(data__lt=fim)
+        return medicoes.order_by('data')
+
+    def resumos_calculados(self, desde=None):
+        """
+        Resumos recalculados a partir das medições (GROUP BY no banco), a partir do mês de `desde`
+        (uma data; None para todos): {(periodo, inicio, classificacao): (quantidade, soma_imc)}.
+        """
+        medicoes = IMC.objects.all()
+        if desde is not None:
+            medicoes = medicoes.filter(data__gte=self._inicio_mes(desde))
+        return self._totais(medicoes)
+
+    @staticmethod
+    def _totais(medicoes):
+        """Totais das medições por dia e por mês (GROUP BY no banco): {(periodo, inicio, classificacao): (quantidade, soma_imc)}."""
+        medicoes = medicoes.order_by()
+        calculados = {}
+        for periodo, truncar in ((ResumoIMC.DIA, TruncDate('data')), (ResumoIMC.MES, TruncMonth('data'))):
+            for inicio, classificacao, quantidade, soma_imc in (
+                medicoes.annotate(inicio_periodo=truncar).values('inicio_periodo', 'classificacao')
+                .annotate(quantidade=Count('id'), soma_imc=Sum('imc'))
+                .values_list('inicio_periodo', 'classificacao', 'quantidade', 'soma_imc')
+            ):
+                if periodo == ResumoIMC.MES:
+                    inicio = timezone.localtime(inicio).date() if timezone.is_aware(inicio) else inicio.date()
+                calculados[(periodo, inicio, classificacao)] = (quantidade, soma_imc)
+        return calculados
+
+    def recalcular_resumos(self, desde=None):
+        """
+        Refaz os resumos a partir das medições, do mês de `desde` em diante (None para todos), substituindo
+        os gravados, para corrigir divergências (comando recalcular_resumos_imc). Não deve ser executado
+        durante importações. Retorna o número de resumos gravados.
+        """
+        calculados = self.resumos_calculados(desde)
+        resumos = ResumoIMC.objects.all()
+        if desde is not None:
+            resumos = resumos.filter(inicio__gte=self._inicio_mes(desde).date())
+        with transaction.atomic():
+            resumos.delete()
+            ResumoIMC.objects.bulk_create([
+                ResumoIMC(periodo=periodo, inicio=inicio, classificacao=classificacao, quantidade=quantidade, soma_imc=soma_imc)
+                for (periodo, inicio, classificacao), (quantidade, soma_imc) in calculados.items()
+            ], batch_size=MEDICOES_POR_LOTE)
+        return len(calculados)
+
+    @staticmethod
+    def _inicio_mes(dia):
+        """Primeiro instante (no fuso atual) do mês da data `dia`."""
+        return timezone.make_aware(datetime.combine(dia.replace(day=1), time()))
+
+    @staticmethod
+    def _fatias(lotes):
+        """Divide os lotes calculados (alturas, pesos, imc, classificacoes) em listas de até LINHAS_POR_BLOCO linhas."""
+        for lote in lotes:
+            for inicio in range(0, len(lote[0]), LINHAS_POR_BLOCO):
+                yield zip(*(valores[inicio:inicio + LINHAS_POR_BLOCO].tolist() for valores in lote))
+
+    def _blocos_csv(self, lotes):
+        yield 'altura,peso,imc,classificacao\n'
+        for linhas in self._fatias(lotes):
+            yield ''.join(
+                f'{altura},{peso},{valor:.2f},{classificacao}\n' if valor == valor
+                else f'{self._texto(altura)},{self._texto(peso)},,{classificacao}\n'
+                for altura, peso, valor, classificacao in linhas
+            )
+
+    def _blocos_json(self, lotes):
+        separador = '\n'
+        yield '['
+        for linhas in self._fatias(lotes):
+            yield separador + ',\n'.join(
+                json.dumps({
+                    'altura': self._numero_json(altura),
+                    'peso': self._numero_json(peso),
+                    'imc': self._numero_json(valor),
+                    'classificacao': classificacao,
+                }, ensure_ascii=False)
+                for altura, peso, valor, classificacao in linhas
+            )
+            separador = ',\n'
+        yield '\n]\n'
+
+    @staticmethod
+    def _numeros(valores):
+        """Converte os valores para float64; os que não são números viram NaN."""
+        _exigir_numpy()
+        if isinstance(valores, np.ndarray) and valores.dtype == np.float64:
+            return valores
+        try:
+            # Caminho rápido: a conversão inteira é feita pelo numpy
+            if len(valores) and isinstance(valores[0], str):
+                return np.char.replace(np.asarray(valores, dtype=str), ',', '.').astype(np.float64)
+            return np.asarray(valores, dtype=np.float64)
+        except (TypeError, ValueError):
+            numeros = np.empty(len(valores), dtype=np.float64)
+            for i, valor in enumerate(valores):
+                try:
+                    numeros[i] = float(valor.replace(',', '.') if isinstance(valor, str) else valor)
+                except (TypeError, ValueError):
+                    numeros[i] = np.nan
+            return numeros
+
+    @staticmethod
+    def _texto(valor):
+        return '' if valor != valor else str(valor)  # NaN (valor ausente ou inválido) fica vazio
+
+    @staticmethod
+    def _numero_json(valor):
+        return None if valor != valor or valor in (float('inf'), float('-inf')) else valor
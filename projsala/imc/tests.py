@@ -1,3 +1,294 @@
-from django.test import TestCase
+import json
+import math
+import random
+from datetime import datetime
+from unittest import mock
+
+from django.contrib import admin
+from django.db.models import ProtectedError
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from . import services
+from .classificacao import DADOS_INVALIDOS, TABELAS, Faixas, FaixasPercentis
+from .models import IMC, MedicaoImutavel, Paciente, ResumoIMC
 
 # Create your tests here.
+
+
+class CalcularIMCLoteViewTests(TestCase):
+    def _json(self, dados):
+        return self.client.post(reverse('imc:calcular_imc_lote'), json.dumps(dados), content_type='application/json')
+
+    def test_lista_de_registros(self):
+        resposta = self._json([{'altura': 2, 'peso': 80}, {'altura': '1,5', 'peso': None}])
+        self.assertEqual(resposta.status_code, 200)
+        resultado = json.loads(b''.join(resposta.streaming_content))
+        self.assertEqual([linha['imc'] for linha in resultado], [20.0, None])
+
+    def test_valores_que_nao_sao_escalares(self):
+        for dados in (
+            {'altura': [[1.75]], 'peso': [[70]]},
+            {'altura': [1.75, [1.80]], 'peso': [70, 80]},
+            [{'altura': {'valor': 1.75}, 'peso': 70}],
+            [{'altura': 1.75, 'peso': [70, 71]}],
+        ):
+            with self.subTest(dados=dados):
+                self.assertEqual(self._json(dados).status_code, 400)
+
+    @override_settings(IMC_LOTE_JSON_MAX_BYTES=1000)
+    def test_json_acima_do_limite(self):
+        registros = {'altura': [1.75] * 100, 'peso': [70] * 100}
+        self.assertEqual(self._json(registros).status_code, 413)
+        self.assertEqual(self._json({'altura': [1.75], 'peso': [70]}).status_code, 200)
+
+
+class ProcessarCSVTests(SimpleTestCase):
+    def _processar(self, texto, tamanho_bloco):
+        blocos = [texto[i:i + tamanho_bloco].encode() for i in range(0, len(texto), tamanho_bloco)]
+        return ''.join(services.IMCService().processar_csv(blocos)).splitlines()
+
+    def test_campo_entre_aspas_com_quebra_de_linha(self):
+        # Observações com quebras de linha e aspas escapadas ("") entre os registros
+        texto = 'altura,peso,obs\n' + ''.join(
+            f'2,{80 + i},"retorno ""{i}""\nem jejum\n"\n' if i % 3 else f'2,{80 + i},sem obs\n' for i in range(40)
+        )
+        imc_service = services.IMCService()
+        esperado = [
+            '2.0,{altura_peso},{imc:.2f},{classificacao}'.format(altura_peso=80.0 + i, **imc_service.calcular_imc(2.0, 80 + i))
+            for i in range(40)
+        ]
+        # Lotes pequenos: os cortes caem dentro dos campos entre aspas
+        for tamanho_lote in (7, 64, services.TAMANHO_LOTE):
+            with self.subTest(tamanho_lote=tamanho_lote), mock.patch.object(services, 'TAMANHO_LOTE', tamanho_lote):
+                self.assertEqual(self._processar(texto, 5)[1:], esperado)
+
+    def test_imc_infinito(self):
+        # 1e-200 ao quadrado vira 0: a divisão daria IMC infinito, que não é classificado
+        blocos = [b'altura,peso\n1e-200,70\n2,80\n']
+        imc_service = services.IMCService()
+        self.assertEqual(
+            ''.join(imc_service.processar_csv(blocos)).splitlines()[1:],
+            ['1e-200,70.0,,Dados inválidos', '2.0,80.0,20.00,Peso normal'],
+        )
+        self.assertEqual(
+            [(linha['imc'], linha['classificacao']) for linha in json.loads(''.join(imc_service.processar_csv(blocos, 'json')))],
+            [(None, 'Dados inválidos'), (20.0, 'Peso normal')],
+        )
+
+
+class MedicoesTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.pacientes = [Paciente.objects.create(nome=nome, codigo=nome.lower()) for nome in ['Ana', 'Bia']]
+        cls.imc_service = services.IMCService()
+        cls.imc_service.registrar_medicoes(
+            {
+                'paciente': cls.pacientes[i % 2].id, 'altura': 1.70, 'peso': 50 + 5 * i,
+                'data': timezone.make_aware(datetime(2026, 1 + i % 3, 1 + i, 12)),
+            }
+            for i in range(12)
+        )
+
+    def _resumos(self):
+        return {
+            (periodo, inicio, classificacao): (quantidade, round(soma_imc, 9))
+            for periodo, inicio, classificacao, quantidade, soma_imc in ResumoIMC.objects.values_list(
+                'periodo', 'inicio', 'classificacao', 'quantidade', 'soma_imc'
+            )
+        }
+
+    def _conferir_resumos(self):
+        calculados = {
+            chave: (quantidade, round(soma_imc, 9))
+            for chave, (quantidade, soma_imc) in self.imc_service.resumos_calculados().items()
+        }
+        self.assertEqual(self._resumos(), calculados)
+
+    def test_exclusao_desconta_dos_resumos(self):
+        IMC.objects.filter(peso__gte=90).delete()
+        self.assertEqual(IMC.objects.count(), 8)
+        self._conferir_resumos()
+        IMC.objects.filter(paciente=self.pacientes[0]).first().delete()
+        self._conferir_resumos()
+        IMC.objects.all().delete()
+        # Sem medições, não sobra resumo zerado
+        self.assertFalse(ResumoIMC.objects.exists())
+
+    def test_paciente_com_medicoes(self):
+        with self.assertRaises(ProtectedError):
+            self.pacientes[0].delete()
+        self.pacientes[0].medicoes.all().delete()
+        self.pacientes[0].delete()
+        self.assertEqual(IMC.objects.count(), 6)
+        self._conferir_resumos()
+
+    def test_medicoes_nao_sao_alteradas(self):
+        medicao = IMC.objects.first()
+        medicao.peso = 200
+        with self.assertRaises(MedicaoImutavel):
+            medicao.save()
+        with self.assertRaises(MedicaoImutavel):
+            IMC.objects.update(peso=200)
+        self.assertFalse(IMC.objects.filter(peso=200).exists())
+        requisicao = RequestFactory().get('/')
+        self.assertFalse(admin.site._registry[IMC].has_add_permission(requisicao))
+        self.assertFalse(admin.site._registry[IMC].has_change_permission(requisicao, medicao))
+
+    def _gravar(self, dados, token=None):
+        cabecalhos = {'authorization': f'Bearer {token}'} if token else {}
+        return self.client.post(
+            reverse('imc:registrar_medicao_api'), dados, content_type='application/json', headers=cabecalhos
+        )
+
+    def test_gravacao_desativada_sem_tokens(self):
+        resposta = self._gravar({'altura': 2, 'peso': 80, 'paciente': 'bia'})
+        self.assertEqual(resposta.status_code, 403)
+        self.assertEqual(IMC.objects.count(), 12)
+
+    @override_settings(IMC_API_TOKENS=['segredo'])
+    def test_gravacao_exige_token(self):
+        for token in (None, 'outro', 'segred'):
+            with self.subTest(token=token):
+                self.assertEqual(self._gravar({'altura': 2, 'peso': 80, 'paciente': 'bia'}, token).status_code, 401)
+        self.assertEqual(IMC.objects.count(), 12)
+
+    @override_settings(IMC_API_TOKENS=['outro', 'segredo'])
+    def test_gravacao_com_token_valido(self):
+        resposta = self._gravar({'altura': 2, 'peso': 80, 'paciente': 'bia'}, 'segredo')
+        self.assertEqual(resposta.status_code, 201)
+        self.assertEqual(resposta.json()['imc'], 20.0)
+        medicao = self.pacientes[1].medicoes.latest('data')
+        self.assertEqual((medicao.altura, medicao.peso, medicao.imc), (2.0, 80.0, 20.0))
+        self.assertEqual(IMC.objects.count(), 13)
+        self._conferir_resumos()
+
+    @override_settings(IMC_API_TOKENS=['segredo'])
+    def test_gravacao_com_dados_invalidos(self):
+        for dados, campo in (
+            ({'altura': 2, 'peso': 80, 'paciente': 'outra'}, 'paciente'),
+            ({'altura': 2, 'peso': 80}, 'paciente'),
+            ({'altura': 20, 'peso': 80, 'paciente': 'bia'}, 'altura'),
+        ):
+            with self.subTest(dados=dados):
+                resposta = self._gravar(dados, 'segredo')
+                self.assertEqual(resposta.status_code, 400)
+                self.assertIn(campo, resposta.json()['erros'])
+        self.assertEqual(IMC.objects.count(), 12)
+
+
+class CalcularIMCApiTests(SimpleTestCase):
+    def _calcular(self, dados, **cabecalhos):
+        return self.client.post(reverse('imc:calcular_imc_api'), dados, content_type='application/json', headers=cabecalhos)
+
+    def test_aberta_sem_tokens(self):
+        resposta = self._calcular({'altura': 2, 'peso': 80})
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(resposta.json(), {'imc': 20.0, 'classificacao': 'Peso normal', 'altura': 2.0, 'peso': 80.0})
+
+    @override_settings(IMC_API_TOKENS=['segredo'])
+    def test_token(self):
+        for autorizacao in ('', 'Bearer', 'Bearer outro', 'Basic segredo', 'Bearer segredo2'):
+            with self.subTest(autorizacao=autorizacao):
+                self.assertEqual(self._calcular({'altura': 2, 'peso': 80}, authorization=autorizacao).status_code, 401)
+        self.assertEqual(self._calcular({'altura': 2, 'peso': 80}, authorization='bearer segredo').status_code, 200)
+
+    def test_medidas_invalidas(self):
+        for corpo in ('{"altura": 2}', '[1, 2]', 'nao é json', '{"altura": "NaN", "peso": 80}'):
+            with self.subTest(corpo=corpo):
+                self.assertEqual(self._calcular(corpo).status_code, 400)
+
+
+def referencia(limites, rotulos, valor):
+    """Busca linear, a definição das faixas: quantos limites o valor alcança."""
+    return rotulos[sum(valor >= limite for limite in limites)]
+
+
+class ClassificacaoTests(SimpleTestCase):
+    """Propriedades das faixas nas tabelas configuráveis e em tabelas aleatórias (sementes fixas)."""
+
+    TABELAS_ALEATORIAS = 200
+
+    def _tabelas(self):
+        aleatorio = random.Random(42)
+        yield from TABELAS.items()
+        for i in range(self.TABELAS_ALEATORIAS):
+            limites = sorted({
+                round(aleatorio.uniform(5, 60), aleatorio.choice([0, 1, 2, 6])) for _ in range(aleatorio.randint(1, 8))
+            })
+            yield f'aleatória {i}', Faixas(limites, [f'Faixa {j}' for j in range(len(limites) + 1)])
+
+    def test_limite_pertence_a_faixa_de_cima(self):
+        for nome, faixas in self._tabelas():
+            for i, limite in enumerate(faixas.limites):
+                with self.subTest(tabela=nome, limite=limite):
+                    self.assertEqual(faixas.classificar(limite), faixas.rotulos[i + 1])
+                    self.assertEqual(faixas.classificar(math.nextafter(limite, -math.inf)), faixas.rotulos[i])
+                    self.assertEqual(
+                        faixas.classificar_lote([limite, math.nextafter(limite, -math.inf)]).tolist(),
+                        [faixas.rotulos[i + 1], faixas.rotulos[i]],
+                    )
+
+    def _valores(self, faixas, aleatorio):
+        # Valores quaisquer, extremos e NaN, além dos vizinhos de cada limite
+        valores = [aleatorio.uniform(0, 80) for _ in range(500)] + [0.0, 1e6, -1.0, math.inf, -math.inf, math.nan]
+        for limite in faixas.limites:
+            valores += [limite, math.nextafter(limite, -math.inf), math.nextafter(limite, math.inf), limite - 0.05, limite + 0.05]
+        return valores
+
+    def test_faixa_nao_diminui_com_o_imc(self):
+        aleatorio = random.Random(7)
+        for nome, faixas in self._tabelas():
+            with self.subTest(tabela=nome):
+                indices = [faixas.indice(valor) for valor in sorted(valor for valor in self._valores(faixas, aleatorio) if valor == valor)]
+                self.assertEqual(indices, sorted(indices))
+
+    def test_isolado_lote_e_busca_linear(self):
+        aleatorio = random.Random(7)
+        for nome, faixas in self._tabelas():
+            with self.subTest(tabela=nome):
+                valores = self._valores(faixas, aleatorio)
+                esperado = [
+                    DADOS_INVALIDOS if valor != valor else referencia(faixas.limites, faixas.rotulos, valor)
+                    for valor in valores
+                ]
+                self.assertEqual([faixas.classificar(valor) for valor in valores], esperado)
+                self.assertEqual(faixas.classificar_lote(valores).tolist(), esperado)
+
+    def test_nan(self):
+        for nome, faixas in TABELAS.items():
+            with self.subTest(tabela=nome):
+                self.assertEqual(faixas.classificar(math.nan), DADOS_INVALIDOS)
+                self.assertEqual(faixas.classificar_lote([math.nan, 22.0]).tolist(), [DADOS_INVALIDOS, 'Peso normal'])
+
+    def test_percentis_isolado_lote_e_busca_linear(self):
+        aleatorio = random.Random(42)
+        for i in range(self.TABELAS_ALEATORIAS // 4):
+            tabela = {}
+            for sexo in ('M', 'F'):
+                idades = sorted(aleatorio.sample(range(24, 241), aleatorio.randint(1, 30)))
+                tabela[sexo] = [
+                    (idade, tuple(limite / 10 for limite in sorted(aleatorio.sample(range(120, 400), 3)))) for idade in idades
+                ]
+            faixas = FaixasPercentis(tabela)
+            casos = []
+            for _ in range(200):
+                sexo = aleatorio.choice(['M', 'F', 1, 2, 'X'])
+                idade = aleatorio.choice([aleatorio.uniform(0, 260), float(aleatorio.choice(tabela['M'])[0])])
+                casos.append((aleatorio.choice([aleatorio.uniform(10, 45), math.nan]), sexo, idade))
+            for sexo, linhas in tabela.items():
+                for idade, limites in linhas:
+                    casos += [(limite, sexo, idade) for limite in limites]
+                    casos += [(math.nextafter(limite, -math.inf), sexo, idade + 0.5) for limite in limites]
+            esperado = []
+            for valor, sexo, idade in casos:
+                linhas = tabela.get({1: 'M', 2: 'F'}.get(sexo, sexo), [])
+                anteriores = [limites for inicio, limites in linhas if inicio <= idade]
+                if valor != valor or not anteriores or idade >= linhas[-1][0] + 1:
+                    esperado.append(DADOS_INVALIDOS)
+                else:
+                    esperado.append(referencia(anteriores[-1], faixas.rotulos, valor))
+            with self.subTest(tabela=i):
+                self.assertEqual([faixas.classificar(*caso) for caso in casos], esperado)
+                self.assertEqual(faixas.classificar_lote(*zip(*casos)).tolist(), esperado)
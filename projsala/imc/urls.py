@@ -4,4 +4,8 @@ app_name = 'imc'
 urlpatterns=[
     path('',views.index,name='index'),
     path("processar/", views.calcular_imc_view, name = "calcular_imc"),
+    path("processar/lote/", views.calcular_imc_lote_view, name = "calcular_imc_lote"),
+    path("resumo/", views.resumo_imc_view, name = "resumo_imc"),
+    path("api/calcular/", views.calcular_imc_api, name = "calcular_imc_api"),
+    path("api/medicoes/", views.registrar_medicao_api, name = "registrar_medicao_api"),
 ]
\ No newline at end of file
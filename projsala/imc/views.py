@@ -1,6 +1,18 @@
+import hmac
+import json
+from datetime import date
+from functools import partial
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
 from django.shortcuts import render,redirect
-from django.http import HttpResponse
+from django.http import HttpResponse, HttpResponseBadRequest, JsonResponse, StreamingHttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+from comum.orcamento_consultas import orcamento_consultas
 from . import services
+from .forms import MedicaoIMCForm, MedidasIMCForm
+from .models import Paciente, ResumoIMC
 # Create your views here.
 
 def index(request):
@@ -18,4 +30,146 @@ def calcular_imc_view(request):
     peso = float(request.POST.get('peso'))
     imc_service=services.IMCService()
     contexto = imc_service.calcular_imc(altura, peso)
-    return render(request, 'resultado_imc.html', contexto)
\ No newline at end of file
+    return render(request, 'resultado_imc.html', contexto)
+
+LIMITE_JSON_LOTE = 10 * 2**20  # Bytes aceitos no JSON do cálculo em lote (IMC_LOTE_JSON_MAX_BYTES)
+
+# Só calcula, sem sessão nem dados gravados: pode ser chamada por scripts das clínicas sem o token CSRF
+@csrf_exempt
+@require_POST
+def calcular_imc_lote_view(request):
+    """
+    Calcula o IMC de uma planilha inteira. Aceita o arquivo no campo `arquivo` (multipart) ou no corpo
+    da requisição (text/csv ou application/json) e devolve o resultado no mesmo formato, em streaming;
+    ?formato=csv ou ?formato=json escolhe o formato da resposta. O CSV é lido, calculado e respondido
+    por partes (IMCService.processar_csv), sem carregar o arquivo inteiro na memória. O JSON precisa
+    ser lido inteiro: acima de IMC_LOTE_JSON_MAX_BYTES responde 413.
+    """
+    arquivo = request.FILES.get('arquivo')
+    if arquivo is not None:
+        # Acima de FILE_UPLOAD_MAX_MEMORY_SIZE o upload já foi gravado num arquivo temporário
+        blocos = arquivo.chunks(services.TAMANHO_LOTE)
+        formato = 'json' if arquivo.name.lower().endswith('.json') else 'csv'
+    else:
+        # request.read() em vez de request.body: lê o corpo aos poucos, sem o limite de DATA_UPLOAD_MAX_MEMORY_SIZE
+        blocos = iter(partial(request.read, services.TAMANHO_LOTE), b'')
+        formato = 'json' if request.content_type == 'application/json' else 'csv'
+    formato_resposta = request.GET.get('formato') if request.GET.get('formato') in ('csv', 'json') else formato
+    imc_service=services.IMCService()
+    try:
+        if formato == 'csv':
+            resultado = imc_service.processar_csv(blocos, formato_resposta)
+        else:
+            # O JSON é uma estrutura única: precisa ser lido inteiro antes do cálculo
+            corpo = _ler_ate(blocos, getattr(settings, 'IMC_LOTE_JSON_MAX_BYTES', LIMITE_JSON_LOTE))
+            if corpo is None:
+                return HttpResponse('O JSON excede o tamanho aceito; envie a planilha em CSV.', status=413)
+            alturas, pesos = imc_service.ler_json(corpo.decode('utf-8-sig'))
+            if formato_resposta == 'json':
+                resultado = imc_service.gerar_json(alturas, pesos)
+            else:
+                resultado = imc_service.gerar_csv(alturas, pesos)
+    except UnicodeDecodeError:
+        return HttpResponseBadRequest('O arquivo precisa estar em UTF-8.')
+    except ValidationError as erro:
+        return HttpResponseBadRequest(' '.join(erro.messages))
+    if formato_resposta == 'json':
+        return StreamingHttpResponse(resultado, content_type='application/json')
+    response = StreamingHttpResponse(resultado, content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = 'attachment; filename="imc.csv"'
+    return response
+
+def _ler_ate(blocos, limite):
+    """Junta os blocos de bytes, ou retorna None assim que passarem de `limite` bytes (sem ler o resto)."""
+    lidos, tamanho = [], 0
+    for bloco in blocos:
+        tamanho += len(bloco)
+        if tamanho > limite:
+            return None
+        lidos.append(bloco)
+    return b''.join(lidos)
+
+PERIODOS_RESUMO = {'dia': ResumoIMC.DIA, 'mes': ResumoIMC.MES}
+
+@require_GET
+@orcamento_consultas(1)  # Só os resumos, sem percorrer as medições
+def resumo_imc_view(request):
+    """
+    Média do IMC e distribuição das classificações por mês (ou por dia, com ?periodo=dia), para os painéis.
+    ?inicio=AAAA-MM-DD e ?fim=AAAA-MM-DD limitam os períodos.
+    """
+    periodo = PERIODOS_RESUMO.get(request.GET.get('periodo', 'mes'))
+    if periodo is None:
+        return HttpResponseBadRequest('periodo deve ser dia ou mes.')
+    try:
+        inicio = date.fromisoformat(request.GET['inicio']) if request.GET.get('inicio') else None
+        fim = date.fromisoformat(request.GET['fim']) if request.GET.get('fim') else None
+    except ValueError:
+        return HttpResponseBadRequest('inicio e fim devem estar no formato AAAA-MM-DD.')
+    imc_service=services.IMCService()
+    return JsonResponse({'resumos': imc_service.resumo(periodo, inicio, fim)})
+
+# Autenticada pelo token no cabeçalho, sem sessão nem cookie: o CSRF não se aplica
+@csrf_exempt
+@require_POST
+async def calcular_imc_api(request):
+    """
+    API JSON de IMC para integrações: recebe {"altura": 1.75, "peso": 70} e responde
+    {"imc", "classificacao", "altura", "peso"}. Medidas inválidas respondem 400 com {"erros": {campo: [...]}}.
+    Com IMC_API_TOKENS configurado, exige Authorization: Bearer <token> (401 sem um token válido).
+    View assíncrona: sob ASGI (uvicorn), não ocupa uma thread por requisição e não consulta o banco.
+    """
+    if settings.IMC_API_TOKENS and not _token_valido(request.headers.get('Authorization', '')):
+        return _token_recusado()
+    form, erro = _formulario_json(request, MedidasIMCForm)
+    if erro is not None:
+        return erro
+    imc_service=services.IMCService()
+    return JsonResponse(imc_service.calcular_imc(form.cleaned_data['altura'], form.cleaned_data['peso']))
+
+@csrf_exempt
+@require_POST
+def registrar_medicao_api(request):
+    """
+    Grava uma medição no histórico do paciente e nos resumos (IMCService.registrar_medicoes): recebe
+    {"paciente": "<código>", "altura": 1.75, "peso": 70} e responde 201 com o cálculo e o paciente.
+    Ao contrário de calcular_imc_api, nunca é aberta: sem IMC_API_TOKENS configurado a gravação fica
+    desativada (403), e sem um token válido responde 401.
+    """
+    if not settings.IMC_API_TOKENS:
+        return JsonResponse({'erros': {'__all__': ['Gravação de medições desativada: configure IMC_API_TOKENS.']}}, status=403)
+    if not _token_valido(request.headers.get('Authorization', '')):
+        return _token_recusado()
+    form, erro = _formulario_json(request, MedicaoIMCForm)
+    if erro is not None:
+        return erro
+    altura, peso, codigo = form.cleaned_data['altura'], form.cleaned_data['peso'], form.cleaned_data['paciente']
+    paciente_id = Paciente.objects.filter(codigo=codigo).values_list('id', flat=True).first()
+    if paciente_id is None:
+        return JsonResponse({'erros': {'paciente': ['Paciente não encontrado.']}}, status=400)
+    imc_service=services.IMCService()
+    imc_service.registrar_medicoes([{'paciente': paciente_id, 'altura': altura, 'peso': peso}])
+    return JsonResponse({**imc_service.calcular_imc(altura, peso), 'paciente': codigo}, status=201)
+
+def _formulario_json(request, classe):
+    """Valida o corpo JSON com o formulário: retorna (formulário válido, None) ou (None, resposta 400)."""
+    try:
+        dados = json.loads(request.body)
+    except ValueError:
+        return None, JsonResponse({'erros': {'__all__': ['O corpo precisa ser um JSON.']}}, status=400)
+    if not isinstance(dados, dict):
+        return None, JsonResponse({'erros': {'__all__': ['Envie um objeto {"altura": ..., "peso": ...}.']}}, status=400)
+    form = classe(dados)
+    if not form.is_valid():
+        return None, JsonResponse({'erros': form.errors}, status=400)
+    return form, None
+
+def _token_recusado():
+    return JsonResponse({'erros': {'__all__': ['Token ausente ou inválido.']}}, status=401)
+
+def _token_valido(autorizacao):
+    tipo, _, token = autorizacao.partition(' ')
+    # compare_digest: o tempo da comparação não revela quantos caracteres do token conferem
+    return tipo.lower() == 'bearer' and any(
+        hmac.compare_digest(token.encode(), valido.encode()) for valido in settings.IMC_API_TOKENS
+    )
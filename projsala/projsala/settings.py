@@ -51,6 +51,17 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# Orçamento de consultas e detector de N+1 (opt-in): ORCAMENTO_CONSULTAS=1 no ambiente (comum.orcamento_consultas)
+if os.environ.get("ORCAMENTO_CONSULTAS") == "1":
+    MIDDLEWARE.append("comum.orcamento_consultas.OrcamentoConsultasMiddleware")
+
+ENQUETE_CACHE_RESULTADO = 5  # Segundos em que o resultado de uma enquete é servido do cache
+IMC_FAIXAS = "adulto"  # Tabela de classificação do IMC (imc.classificacao): "adulto" ou "adulto_oms" (obesidade graus I a III)
+# Tokens aceitos pela API de IMC (Authorization: Bearer <token>), separados por vírgula. Sem tokens, o cálculo
+# (imc:calcular_imc_api) é aberto e a gravação de medições (imc:registrar_medicao_api) fica desativada
+IMC_API_TOKENS = [token for token in os.environ.get("IMC_API_TOKENS", "").split(",") if token]
+IMC_LOTE_JSON_MAX_BYTES = 10 * 2**20  # Maior JSON aceito pelo cálculo em lote (lido inteiro); acima, responde 413
+
 ROOT_URLCONF = "projsala.urls"
 
 TEMPLATES = [
@@ -78,6 +89,16 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        # BEGIN IMMEDIATE: votos simultâneos esperam a vez (até o timeout) em vez de falhar com "database is locked".
+        # WAL: leituras não esperam as gravações, e cada voto grava no log sem reescrever o arquivo do banco
+        "OPTIONS": {
+            "transaction_mode": "IMMEDIATE",
+            "timeout": 20,
+            "init_command": "PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL;",
+        },
+        # Banco de testes em arquivo: o padrão em memória não aceita várias conexões, e os testes
+        # de votos simultâneos (TransactionTestCase com threads) seriam ignorados
+        "TEST": {"NAME": BASE_DIR / "test_db.sqlite3"},
     }
 }
 